@@ -0,0 +1,467 @@
+"""
+Vectorised sales analytics
+Loads the sales and sale_items columns for a date window into compact NumPy
+arrays once, then derives every report metric for any period inside that
+window from the arrays instead of issuing one aggregate query per metric.
+"""
+import time
+import logging
+from datetime import datetime, timedelta
+import numpy as np
+
+logger = logging.getLogger(__name__)
+
+PERIOD_LABELS = {
+    "today": "Today",
+    "week": "This Week",
+    "month": "This Month",
+}
+
+SALE_DTYPE = np.dtype([
+    ("id", np.int64),
+    ("total", np.float64),
+    ("hour", np.int8),
+    ("day", np.int16),
+])
+
+ITEM_DTYPE = np.dtype([
+    ("sku", np.int32),
+    ("category", np.int16),
+    ("quantity", np.int32),
+    ("line_total", np.float64),
+    ("day", np.int16),
+])
+
+
+def period_range(period, now=None):
+    """Return (start, end) ISO date strings for a report period"""
+    now = now or datetime.now()
+    today = now.replace(hour=0, minute=0, second=0, microsecond=0)
+    if period == "today":
+        start = today
+    elif period == "week":
+        start = today - timedelta(days=6)
+    else:  # month
+        start = today.replace(day=1)
+    end = today + timedelta(days=1)
+    return start.strftime("%Y-%m-%d"), end.strftime("%Y-%m-%d")
+
+
+def _day_offset(start, date_str):
+    return (datetime.strptime(date_str, "%Y-%m-%d") - datetime.strptime(start, "%Y-%m-%d")).days
+
+
+class PeriodData:
+    """Columnar snapshot of the sales and line items in a date range"""
+
+    def __init__(self, start, end, sales, items, sku_labels, categories):
+        self.start = start
+        self.end = end
+        self.sales = sales
+        self.items = items
+        # Dictionary-encoded labels, indexed by the codes in the item arrays
+        self.sku_labels = sku_labels
+        self.categories = categories
+
+    @property
+    def transaction_count(self):
+        return len(self.sales)
+
+    @property
+    def item_count(self):
+        return len(self.items)
+
+    def slice(self, start, end):
+        """Sub-range of this snapshot, without touching the database"""
+        lo = _day_offset(self.start, start)
+        hi = _day_offset(self.start, end)
+        sales = self.sales[(self.sales["day"] >= lo) & (self.sales["day"] < hi)].copy()
+        items = self.items[(self.items["day"] >= lo) & (self.items["day"] < hi)].copy()
+        sales["day"] -= lo
+        items["day"] -= lo
+        return PeriodData(start, end, sales, items, self.sku_labels, self.categories)
+
+
+class SalesAnalytics:
+    """Compute report metrics from a single columnar load"""
+
+    CHUNK_SIZE = 50000
+    CACHE_SECONDS = 30
+
+    # Fractional days since the window start; day and hour are derived in NumPy
+    SALES_QUERY = '''
+        SELECT id, total_amount, julianday(created_at) - julianday(?)
+        FROM sales
+        WHERE created_at >= ? AND created_at < ?
+    '''
+
+    # Line items are range-scanned by sale id (ids grow with time, so the
+    # window's id range is tight) instead of joined back to sales. SKU and
+    # category are dictionary-encoded inside SQLite so only numbers cross
+    # into Python: the SKU code is the stock id, the category code comes
+    # from a small temp dictionary table.
+    ITEMS_QUERY = '''
+        SELECT si.sale_id,
+               COALESCE(si.stock_id, 0),
+               COALESCE(c.code, 0),
+               si.quantity,
+               si.total_price
+        FROM sale_items si
+        LEFT JOIN temp.analytics_categories c ON c.category = si.category
+        WHERE si.sale_id BETWEEN ? AND ?
+    '''
+
+    RAW_SALE_DTYPE = np.dtype([("id", np.int64), ("total", np.float64), ("offset", np.float64)])
+    RAW_ITEM_DTYPE = np.dtype([
+        ("sale_id", np.int64), ("sku", np.int32), ("category", np.int16),
+        ("quantity", np.int32), ("line_total", np.float64),
+    ])
+
+    def __init__(self, db):
+        self.db = db
+        self._cached = None
+        self._cached_at = 0.0
+
+    def _fetch(self, conn, query, params, dtype):
+        """Stream rows in chunks straight into a structured array"""
+        cursor = conn.execute(query, params)
+        chunks = []
+        while True:
+            rows = cursor.fetchmany(self.CHUNK_SIZE)
+            if not rows:
+                break
+            chunks.append(np.fromiter(rows, dtype=dtype, count=len(rows)))
+        return np.concatenate(chunks) if chunks else np.empty(0, dtype=dtype)
+
+    def load(self, start, end):
+        """Bulk-load the sales and line items between two ISO dates"""
+        with self.db.get_connection() as conn:
+            # Plain tuples are much cheaper than sqlite3.Row for bulk loads
+            conn.row_factory = None
+
+            categories = ["Other"] + [
+                row[0] for row in conn.execute(
+                    "SELECT DISTINCT category FROM stock WHERE category IS NOT NULL "
+                    "AND category != 'Other' ORDER BY category"
+                )
+            ]
+            conn.execute(
+                "CREATE TEMP TABLE IF NOT EXISTS analytics_categories "
+                "(category TEXT PRIMARY KEY, code INTEGER)"
+            )
+            conn.execute("DELETE FROM temp.analytics_categories")
+            conn.executemany(
+                "INSERT INTO temp.analytics_categories VALUES (?, ?)",
+                [(name, code) for code, name in enumerate(categories)]
+            )
+
+            sku_labels = {0: ("", "Unknown item")}
+            for stock_id, sku, name in conn.execute("SELECT id, sku, name FROM stock"):
+                sku_labels[stock_id] = (sku, name)
+
+            raw_sales = self._fetch(conn, self.SALES_QUERY, (start, start, end), self.RAW_SALE_DTYPE)
+            raw_sales.sort(order="id")
+            if len(raw_sales):
+                first_id, last_id = int(raw_sales["id"][0]), int(raw_sales["id"][-1])
+                raw_items = self._fetch(conn, self.ITEMS_QUERY, (first_id, last_id), self.RAW_ITEM_DTYPE)
+            else:
+                raw_items = np.empty(0, dtype=self.RAW_ITEM_DTYPE)
+
+        sales = np.empty(len(raw_sales), dtype=SALE_DTYPE)
+        sales["id"] = raw_sales["id"]
+        sales["total"] = raw_sales["total"]
+        offset = np.nan_to_num(raw_sales["offset"])
+        day = np.floor(offset)
+        sales["day"] = day
+        # Nudge by a microsecond-ish so exact hour boundaries don't round down
+        sales["hour"] = np.clip(np.floor((offset - day) * 24 + 1e-6), 0, 23)
+
+        # Only keep items whose sale falls in the window; skip the membership
+        # test when the window's ids are contiguous (the normal case)
+        if len(raw_sales) and last_id - first_id + 1 != len(raw_sales):
+            raw_items = raw_items[np.isin(raw_items["sale_id"], sales["id"])]
+        positions = np.searchsorted(sales["id"], raw_items["sale_id"])
+
+        items = np.empty(len(raw_items), dtype=ITEM_DTYPE)
+        for field in ("sku", "category", "quantity", "line_total"):
+            items[field] = raw_items[field]
+        items["day"] = sales["day"][positions] if len(sales) else 0
+
+        return PeriodData(start, end, sales, items, sku_labels, categories)
+
+    def load_window(self, now=None):
+        """Load (or reuse) a window covering today, this week and this month"""
+        if self._cached and time.monotonic() - self._cached_at < self.CACHE_SECONDS:
+            return self._cached
+        week_start, end = period_range("week", now)
+        month_start, _ = period_range("month", now)
+        self._cached = self.load(min(week_start, month_start), end)
+        self._cached_at = time.monotonic()
+        return self._cached
+
+    def invalidate(self):
+        """Drop the cached window so the next summary reloads"""
+        self._cached = None
+
+    def summary(self, period="week", top_n=10, now=None):
+        """All report metrics for a named period"""
+        started = time.perf_counter()
+        start, end = period_range(period, now)
+        data = self.load_window(now).slice(start, end)
+        result = self.compute(data, top_n=top_n)
+        result["period"] = period
+        result["period_label"] = PERIOD_LABELS.get(period, period)
+        result["trend"] = self.trend(data, hourly=(period == "today"))
+        logger.debug(
+            f"Analytics for {period}: {data.transaction_count} sales, "
+            f"{data.item_count} items in {(time.perf_counter() - started) * 1000:.1f} ms"
+        )
+        return result
+
+    @staticmethod
+    def compute(data, top_n=10):
+        """Revenue, AOV, items sold, top SKUs, category mix and hourly histogram"""
+        sales, items = data.sales, data.items
+        totals = sales["total"]
+        revenue = float(totals.sum())
+        transactions = int(totals.size)
+
+        # Per-SKU quantity and revenue via weighted bincounts over stock ids
+        sku_qty = np.bincount(items["sku"], weights=items["quantity"])
+        sku_revenue = np.bincount(items["sku"], weights=items["line_total"])
+        top = [i for i in np.argsort(-sku_qty, kind="stable")[:top_n] if sku_qty[i] > 0]
+        top_items = []
+        for code in top:
+            sku, name = data.sku_labels.get(int(code), ("", "Unknown item"))
+            top_items.append({
+                "sku": sku,
+                "name": name,
+                "quantity": int(sku_qty[code]),
+                "revenue": float(sku_revenue[code]),
+            })
+
+        category_revenue = np.bincount(
+            items["category"], weights=items["line_total"], minlength=len(data.categories)
+        )
+        order = np.argsort(-category_revenue, kind="stable")
+        category_mix = [
+            (data.categories[i], float(category_revenue[i]))
+            for i in order if category_revenue[i] > 0
+        ]
+
+        hourly_revenue = np.bincount(sales["hour"], weights=totals, minlength=24)[:24]
+        hourly_count = np.bincount(sales["hour"], minlength=24)[:24]
+
+        return {
+            "revenue": revenue,
+            "transactions": transactions,
+            "average_sale": revenue / transactions if transactions else 0.0,
+            "items_sold": int(items["quantity"].sum(dtype=np.int64)),
+            "top_items": top_items,
+            "category_mix": category_mix,
+            "hourly_revenue": hourly_revenue.tolist(),
+            "hourly_count": hourly_count.tolist(),
+        }
+
+    @staticmethod
+    def trend(data, hourly=False):
+        """Dense (label, revenue) series by hour of day or by calendar day"""
+        totals = data.sales["total"]
+        if hourly:
+            values = np.bincount(data.sales["hour"], weights=totals, minlength=24)[:24]
+            return [(f"{h:02d}:00", float(v)) for h, v in enumerate(values)]
+
+        days = _day_offset(data.start, data.end)
+        values = np.bincount(data.sales["day"], weights=totals, minlength=days)[:days]
+        start = datetime.strptime(data.start, "%Y-%m-%d")
+        return [
+            ((start + timedelta(days=i)).strftime("%d %b"), float(v))
+            for i, v in enumerate(values)
+        ]
+
+
+class CustomerRFM:
+    """Recency, frequency and monetary scores for the whole customer table
+
+    One grouped scan of the sales index gives each customer's bill count and
+    last purchase; the lifetime spend is the running total kept on the
+    customer row. Scores are quintiles (5 = best) computed over all
+    customers at once in NumPy, and segments are derived from them.
+    """
+
+    RAW_DTYPE = np.dtype([
+        ("customer_id", np.int64), ("recency_days", np.float64),
+        ("frequency", np.int32), ("monetary", np.float64),
+    ])
+    DTYPE = np.dtype(RAW_DTYPE.descr + [
+        ("r", np.int8), ("f", np.int8), ("m", np.int8), ("segment", np.int8),
+    ])
+    SEGMENTS = ("Champions", "Loyal", "New", "At Risk", "Lost", "Regular")
+
+    @staticmethod
+    def quintile_scores(values, lower_is_better=False):
+        """1-5 per value by the quintile it falls in; equal values share a score"""
+        if values.size == 0:
+            return np.empty(0, dtype=np.int8)
+        edges = np.quantile(values, [0.2, 0.4, 0.6, 0.8])
+        # A value on an edge gets the better score: count only the edges below
+        # it when lower is better, and the edges at or below it otherwise
+        if lower_is_better:
+            return (5 - np.searchsorted(edges, values, side="left")).astype(np.int8)
+        return (1 + np.searchsorted(edges, values, side="right")).astype(np.int8)
+
+    @classmethod
+    def compute(cls, raw):
+        """Scores and segments for raw (customer_id, recency_days, frequency, monetary) rows"""
+        scored = np.zeros(raw.size, dtype=cls.DTYPE)
+        for name in cls.RAW_DTYPE.names:
+            scored[name] = raw[name]
+        r = scored["r"] = cls.quintile_scores(raw["recency_days"], lower_is_better=True)
+        f = scored["f"] = cls.quintile_scores(raw["frequency"])
+        scored["m"] = cls.quintile_scores(raw["monetary"])
+        scored["segment"] = np.select(
+            [(r >= 4) & (f >= 4), f >= 4, (r >= 4) & (f <= 1), (r <= 2) & (f >= 3), (r <= 2) & (f <= 2)],
+            [0, 1, 2, 3, 4],
+            default=5,
+        )
+        return scored
+
+    @classmethod
+    def load(cls, db, conn, now=None):
+        """Score every customer with purchases; sorted by customer id
+
+        ``conn`` must expose ``all_sales`` (see SalesArchive.historical_connection).
+        The query runs through the registry as ``customers.rfm``.
+        """
+        started = time.perf_counter()
+        now = (now or datetime.now()).isoformat(sep=" ")
+        rows = db.run_query_on(conn, "customers.rfm", (now,), fetch_all=True)
+        raw = np.fromiter((tuple(row) for row in rows), dtype=cls.RAW_DTYPE, count=len(rows))
+        scored = cls.compute(raw)
+        logger.debug(f"RFM for {raw.size} customers in {(time.perf_counter() - started) * 1000:.1f} ms")
+        return scored
+
+    @classmethod
+    def lookup(cls, scored, customer_id):
+        """The scored row for one customer, or None if they have no purchases"""
+        index = np.searchsorted(scored["customer_id"], customer_id)
+        if index < scored.size and scored["customer_id"][index] == customer_id:
+            return scored[index]
+        return None
+
+
+def _multi_query_summary(db, start, end):
+    """Reference implementation: one aggregate query per metric"""
+    db.execute_query(
+        "SELECT COUNT(*), COALESCE(SUM(total_amount), 0), COALESCE(AVG(total_amount), 0) "
+        "FROM sales WHERE DATE(created_at) >= ? AND DATE(created_at) < ?",
+        (start, end), fetch_one=True
+    )
+    db.execute_query(
+        "SELECT COALESCE(SUM(si.quantity), 0) FROM sale_items si "
+        "JOIN sales s ON si.sale_id = s.id WHERE DATE(s.created_at) >= ? AND DATE(s.created_at) < ?",
+        (start, end), fetch_one=True
+    )
+    db.execute_query(
+        "SELECT si.item_name, SUM(si.quantity) AS qty, SUM(si.total_price) FROM sale_items si "
+        "JOIN sales s ON si.sale_id = s.id WHERE DATE(s.created_at) >= ? AND DATE(s.created_at) < ? "
+        "GROUP BY si.item_name ORDER BY qty DESC LIMIT 10",
+        (start, end), fetch_all=True
+    )
+    db.execute_query(
+        "SELECT si.category, SUM(si.total_price) FROM sale_items si "
+        "JOIN sales s ON si.sale_id = s.id WHERE DATE(s.created_at) >= ? AND DATE(s.created_at) < ? "
+        "GROUP BY si.category",
+        (start, end), fetch_all=True
+    )
+    db.execute_query(
+        "SELECT strftime('%H', created_at) AS hour, SUM(total_amount), COUNT(*) FROM sales "
+        "WHERE DATE(created_at) >= ? AND DATE(created_at) < ? GROUP BY hour",
+        (start, end), fetch_all=True
+    )
+
+
+def benchmark(line_items=1_000_000, db_path="analytics_benchmark.db", seed=42):
+    """Time today/week/month reports: per-metric queries vs. one columnar load"""
+    import os
+    import random
+    from database import Database
+
+    if os.path.exists(db_path):
+        os.remove(db_path)
+    db = Database(db_path)
+    rng = random.Random(seed)
+    now = datetime.now()
+    month_start = now.replace(day=1, hour=0, minute=0, second=0, microsecond=0)
+    span = max(int((now - month_start).total_seconds()), 3600)
+    categories = ["Saree", "Lehenga", "Salwar Suit", "Kurti", "Dress", "Accessories"]
+    stock = [
+        (i, f"SKU-{i:05d}", f"Item {i}", rng.choice(categories), 10, 500.0, 900.0)
+        for i in range(1, 2001)
+    ]
+
+    sales, items = [], []
+    sale_id = 0
+    while len(items) < line_items:
+        sale_id += 1
+        created = month_start + timedelta(seconds=rng.randrange(span))
+        total = 0.0
+        for _ in range(rng.randint(1, 5)):
+            stock_id, sku, name, category = rng.choice(stock)[:4]
+            qty = rng.randint(1, 3)
+            price = float(rng.randrange(500, 20000))
+            total += qty * price
+            items.append((sale_id, stock_id, sku, name, category, qty, price, qty * price))
+        sales.append((sale_id, f"INV-{sale_id:08d}", "[]", total, 0, total, created.isoformat()))
+
+    with db.get_connection() as conn:
+        conn.executemany(
+            "INSERT INTO stock (id, sku, name, category, quantity, purchase_price, selling_price) "
+            "VALUES (?, ?, ?, ?, ?, ?, ?)", stock
+        )
+        conn.executemany(
+            "INSERT INTO sales (id, invoice_number, items, subtotal, gst_amount, total_amount, created_at) "
+            "VALUES (?, ?, ?, ?, ?, ?, ?)", sales
+        )
+        conn.executemany(
+            "INSERT INTO sale_items (sale_id, stock_id, sku, item_name, category, quantity, "
+            "unit_price, total_price) VALUES (?, ?, ?, ?, ?, ?, ?, ?)", items
+        )
+
+    periods = ["today", "week", "month"]
+
+    t0 = time.perf_counter()
+    for period in periods:
+        _multi_query_summary(db, *period_range(period, now))
+    multi_ms = (time.perf_counter() - t0) * 1000
+
+    engine = SalesAnalytics(db)
+    t0 = time.perf_counter()
+    for period in periods:
+        engine.summary(period, now=now)
+    columnar_ms = (time.perf_counter() - t0) * 1000
+
+    # Switching period on an already loaded window
+    t0 = time.perf_counter()
+    engine.summary("week", now=now)
+    switch_ms = (time.perf_counter() - t0) * 1000
+
+    os.remove(db_path)
+    return {
+        "sales": len(sales),
+        "line_items": len(items),
+        "periods": periods,
+        "multi_query_ms": round(multi_ms, 1),
+        "columnar_ms": round(columnar_ms, 1),
+        "columnar_period_switch_ms": round(switch_ms, 1),
+    }
+
+
+if __name__ == "__main__":
+    import argparse
+    import json
+
+    parser = argparse.ArgumentParser(description="Benchmark the sales analytics engine")
+    parser.add_argument("--items", type=int, default=1_000_000, help="number of line items")
+    args = parser.parse_args()
+    print(json.dumps(benchmark(args.items), indent=2))
@@ -0,0 +1,465 @@
+"""
+Local HTTP/JSON API for thin billing clients
+Counters and tablets on the shop LAN bill through this server instead of
+opening the SQLite file over a network share. The server owns the database:
+checkouts go through the database's group commit queue (one writer thread,
+each sale in its own savepoint), and reads run on a pool of read-only WAL
+connections so they never wait for the writer.
+
+Checkout needs a login: POST /login with a username and password returns a
+bearer token, and each checkout is authorized against that user's role and
+PIN scopes exactly as at a counter. The bill's seller is the logged-in user.
+
+Usage:
+    python api_server.py [--db boutique_management.db] [--host 127.0.0.1] [--port 8765]
+    python api_server.py --load-test 400 [--clients 8] [--user admin]   (against a running server)
+
+Endpoints:
+    GET  /health
+    GET  /stock?q=&cart_id=
+    GET  /customers?q=
+    GET  /sales/recent?limit=10
+    GET  /reports/today
+    POST /login     {"username": "...", "password": "..."}  -> {"token": "...", "expires_in": 43200}
+    POST /checkout  {"items": [{"id": 1, "quantity": 2}], "customer_name": "...",
+                     "customer_phone": "...", "discount": 0, "cart_id": "...",
+                     "payment_method": "Cash", "pin": "..."}
+                    with header Authorization: Bearer <token>; "pin" is needed
+                    when the user's billing PIN elevation has lapsed
+"""
+import os
+import json
+import time
+import asyncio
+import secrets
+import logging
+import sqlite3
+import threading
+from concurrent.futures import ThreadPoolExecutor
+from datetime import datetime
+from urllib.parse import urlsplit, parse_qs
+from urllib.request import pathname2url
+from config import AppConfig
+from queries import QUERIES
+from sales_service import SalesService
+from permissions import PERMISSIONS, PermissionCache
+import password_hashing
+
+logger = logging.getLogger(__name__)
+
+STATUS_TEXT = {
+    200: "OK", 201: "Created", 400: "Bad Request", 401: "Unauthorized", 403: "Forbidden", 404: "Not Found",
+    405: "Method Not Allowed", 413: "Payload Too Large", 500: "Internal Server Error",
+}
+
+
+class ApiError(Exception):
+    """Error returned to the client with an HTTP status"""
+
+    def __init__(self, status, message):
+        super().__init__(message)
+        self.status = status
+
+
+class ReaderPool:
+    """Threads with read-only connections; in WAL mode they read alongside the writer"""
+
+    def __init__(self, db, size=AppConfig.API_READERS):
+        self.db = db
+        self._uri = f"file:{pathname2url(os.path.abspath(db.db_name))}?mode=ro"
+        self._local = threading.local()
+        self._executor = ThreadPoolExecutor(max_workers=size, thread_name_prefix="api-reader")
+
+    def _connection(self):
+        conn = getattr(self._local, "conn", None)
+        if conn is None:
+            conn = self._local.conn = sqlite3.connect(self._uri, uri=True)
+            conn.row_factory = sqlite3.Row
+        return conn
+
+    def _run(self, name, params, fetch_one):
+        return self.db.execute_on(
+            self._connection(), QUERIES[name], params,
+            fetch_one=fetch_one, fetch_all=not fetch_one, name=name
+        )
+
+    async def query(self, name, params=(), fetch_one=False):
+        """Run a registry query on a reader thread"""
+        loop = asyncio.get_running_loop()
+        return await loop.run_in_executor(self._executor, self._run, name, params, fetch_one)
+
+    def close(self):
+        self._executor.shutdown(wait=True)
+
+
+class ApiSessions:
+    """Bearer tokens of logged-in API users, each with its own PermissionCache"""
+
+    def __init__(self, db, ttl_seconds=AppConfig.API_SESSION_SECONDS):
+        self.db = db
+        self.ttl = ttl_seconds
+        # token -> {"username", "permissions", "expires"}
+        self._sessions = {}
+        self._lock = threading.Lock()
+
+    def login(self, username, password):
+        """A new token for valid credentials, else None (slow: hashes the password)"""
+        user = self.db.run_query("users.by_username", (username,), fetch_one=True)
+        if not user or not password_hashing.verify_password(password, user['password_hash']):
+            return None
+        token = secrets.token_hex(16)
+        with self._lock:
+            self._sessions[token] = {
+                "username": user['username'],
+                "permissions": PermissionCache(self.db, user['role']),
+                "expires": time.monotonic() + self.ttl,
+            }
+        logger.info(f"API login: {username}")
+        return token
+
+    def get(self, token):
+        """The session of a token that has not expired, else None"""
+        with self._lock:
+            session = self._sessions.get(token)
+            if session and time.monotonic() >= session["expires"]:
+                del self._sessions[token]
+                return None
+            return session
+
+
+def _rows(rows):
+    return [dict(row) for row in rows]
+
+
+class ApiServer:
+    """asyncio HTTP/1.1 server exposing billing over JSON"""
+
+    def __init__(self, db, host=AppConfig.API_HOST, port=AppConfig.API_PORT,
+                 readers=AppConfig.API_READERS, window_ms=AppConfig.WRITE_GROUP_COMMIT_MS):
+        self.db = db
+        self.host = host
+        self.port = port
+        with db.get_connection() as conn:
+            # Readers only see committed data and never block the writer
+            conn.execute("PRAGMA journal_mode = WAL")
+        self.sales = SalesService(db)
+        self.writes = db.write_queue()
+        self.writes.window_ms = window_ms
+        self.readers = ReaderPool(db, readers)
+        self.sessions = ApiSessions(db)
+        self._server = None
+        self.routes = {
+            ("GET", "/health"): self.health,
+            ("GET", "/stock"): self.stock,
+            ("GET", "/customers"): self.customers,
+            ("GET", "/sales/recent"): self.recent_sales,
+            ("GET", "/reports/today"): self.today_report,
+            ("POST", "/login"): self.login,
+            ("POST", "/checkout"): self.checkout,
+        }
+
+    async def start(self):
+        self._server = await asyncio.start_server(self._handle_client, self.host, self.port)
+        self.port = self._server.sockets[0].getsockname()[1]
+        logger.info(f"API server listening on http://{self.host}:{self.port}")
+
+    async def serve_forever(self):
+        await self.start()
+        async with self._server:
+            await self._server.serve_forever()
+
+    async def close(self):
+        if self._server:
+            self._server.close()
+            await self._server.wait_closed()
+        await asyncio.get_running_loop().run_in_executor(None, self.db.close_writes)
+        self.readers.close()
+
+    # Handlers take (query, body, headers) and return (status, payload)
+
+    async def health(self, query, body, headers):
+        return 200, {
+            "status": "ok",
+            "pending_writes": self.writes.pending(),
+            "transactions": self.writes.batches,
+            "committed": self.writes.committed,
+        }
+
+    async def stock(self, query, body, headers):
+        term = query.get("q", "").strip()
+        if term:
+            pattern = f"%{term}%"
+            rows = await self.readers.query("search.stock", (pattern,) * 4)
+        else:
+            rows = await self.readers.query(
+                "billing.available_stock", (datetime.now().isoformat(), query.get("cart_id", ""))
+            )
+        return 200, {"items": _rows(rows)}
+
+    async def customers(self, query, body, headers):
+        pattern = f"%{query.get('q', '').strip()}%"
+        rows = await self.readers.query("search.customers", (pattern,) * 3)
+        return 200, {"customers": _rows(rows)}
+
+    async def recent_sales(self, query, body, headers):
+        try:
+            limit = min(int(query.get("limit", 10)), 100)
+        except ValueError:
+            raise ApiError(400, "limit must be a number")
+        rows = await self.readers.query("sales.recent", (limit,))
+        return 200, {"sales": _rows(rows)}
+
+    async def today_report(self, query, body, headers):
+        today, month = await asyncio.gather(
+            self.readers.query("sales.today_totals", fetch_one=True),
+            self.readers.query("sales.month_totals", fetch_one=True),
+        )
+        return 200, {
+            "today_sales": today["total_sales"] or 0,
+            "today_transactions": today["transaction_count"] or 0,
+            "month_total": month["total"] or 0,
+            "month_transactions": month["count"] or 0,
+        }
+
+    async def login(self, query, body, headers):
+        if not isinstance(body, dict) or not body.get("username") or not body.get("password"):
+            raise ApiError(400, "Expected a JSON object with username and password")
+        # Password hashing is deliberately slow; keep it off the event loop
+        token = await asyncio.get_running_loop().run_in_executor(
+            None, self.sessions.login, str(body["username"]), str(body["password"])
+        )
+        if token is None:
+            raise ApiError(401, "Invalid username or password")
+        return 200, {"token": token, "expires_in": self.sessions.ttl}
+
+    def _session(self, headers):
+        scheme, _, token = headers.get("authorization", "").partition(" ")
+        session = self.sessions.get(token.strip()) if scheme.lower() == "bearer" else None
+        if session is None:
+            raise ApiError(401, "Log in with POST /login and send Authorization: Bearer <token>")
+        return session
+
+    async def _authorize(self, session, permission, pin):
+        """Role check, plus the permission's PIN unless a recent elevation is still valid"""
+        permissions = session["permissions"]
+        decision = permissions.check(permission)
+        if decision == "pin" and pin:
+            elevated = await asyncio.get_running_loop().run_in_executor(
+                None, permissions.elevate, PERMISSIONS[permission], str(pin)
+            )
+            decision = "allowed" if elevated else "pin"
+        if decision == "denied":
+            raise ApiError(403, f"{session['username']} may not use {permission}")
+        if decision == "pin":
+            raise ApiError(401, f"Send the {PERMISSIONS[permission]} PIN as \"pin\"")
+
+    async def checkout(self, query, body, headers):
+        session = self._session(headers)
+        if (not isinstance(body, dict) or not isinstance(body.get("items"), list)
+                or not all(isinstance(item, dict) for item in body["items"])):
+            raise ApiError(400, "Expected a JSON object with a list of item objects")
+        await self._authorize(session, "billing.checkout", body.get("pin"))
+        # Resolves once the batch holding this sale has committed
+        sale_data = await asyncio.wrap_future(
+            self.db.submit_write(lambda conn: self._record_checkout(conn, body, session["username"]))
+        )
+        return 201, dict(sale_data, items=json.loads(sale_data["items"]))
+
+    def _record_checkout(self, conn, request, sold_by):
+        """Price and record one checkout request inside the writer's transaction"""
+        cart_id = request.get('cart_id') or ""
+        cart = self.sales.price_cart(conn, request.get('items') or [], cart_id)
+        sale_data = self.sales.prepare(
+            cart,
+            sold_by,
+            customer_name=request.get('customer_name') or "Walk-in Customer",
+            customer_phone=request.get('customer_phone') or None,
+            discount=float(request.get('discount') or 0),
+            payment_method=request.get('payment_method') or 'Cash'
+        )
+        return self.sales.record(conn, sale_data, cart, cart_id or None)
+
+    async def _read_request(self, reader):
+        """(method, path, query, headers, body) or None when the client has gone"""
+        request_line = await reader.readline()
+        if not request_line.strip():
+            return None
+        try:
+            method, target, _ = request_line.decode("latin-1").split()
+        except ValueError:
+            raise ApiError(400, "Malformed request line")
+
+        headers = {}
+        while True:
+            line = await reader.readline()
+            if line in (b"\r\n", b"\n", b""):
+                break
+            name, _, value = line.decode("latin-1").partition(":")
+            headers[name.strip().lower()] = value.strip()
+
+        try:
+            length = int(headers.get("content-length") or 0)
+        except ValueError:
+            raise ApiError(400, "Content-Length must be a number")
+        if length < 0:
+            raise ApiError(400, "Content-Length must not be negative")
+        if length > AppConfig.API_MAX_BODY_BYTES:
+            raise ApiError(413, "Request body too large")
+        body = None
+        if length:
+            try:
+                body = json.loads(await reader.readexactly(length))
+            except ValueError:
+                raise ApiError(400, "Body is not valid JSON")
+
+        url = urlsplit(target)
+        query = {key: values[-1] for key, values in parse_qs(url.query).items()}
+        return method.upper(), url.path.rstrip("/") or "/", query, headers, body
+
+    async def _dispatch(self, method, path, query, body, headers):
+        handler = self.routes.get((method, path))
+        if handler is None:
+            if any(route_path == path for _, route_path in self.routes):
+                raise ApiError(405, f"{method} not allowed on {path}")
+            raise ApiError(404, f"No such endpoint: {path}")
+        try:
+            return await handler(query, body, headers)
+        except ValueError as e:
+            # Validation errors from the services (empty cart, bad phone, stock)
+            raise ApiError(400, str(e))
+
+    async def _handle_client(self, reader, writer):
+        try:
+            while True:
+                keep_alive = True
+                request = None
+                try:
+                    request = await self._read_request(reader)
+                    if request is None:
+                        break
+                    method, path, query, headers, body = request
+                    keep_alive = headers.get("connection", "").lower() != "close"
+                    status, payload = await self._dispatch(method, path, query, body, headers)
+                except ApiError as e:
+                    status, payload = e.status, {"error": str(e)}
+                    if request is None:
+                        # A bad request head leaves the rest of the stream unframed
+                        keep_alive = False
+                except Exception as e:
+                    logger.exception(f"API request failed: {e}")
+                    status, payload = 500, {"error": "Internal server error"}
+                self._write_response(writer, status, payload, keep_alive)
+                await writer.drain()
+                if not keep_alive or status == 413:
+                    break
+        except (ConnectionError, asyncio.IncompleteReadError):
+            pass
+        finally:
+            writer.close()
+
+    @staticmethod
+    def _write_response(writer, status, payload, keep_alive):
+        data = json.dumps(payload, default=str).encode("utf-8")
+        head = (
+            f"HTTP/1.1 {status} {STATUS_TEXT.get(status, '')}\r\n"
+            f"Content-Type: application/json\r\n"
+            f"Content-Length: {len(data)}\r\n"
+            f"Connection: {'keep-alive' if keep_alive else 'close'}\r\n\r\n"
+        )
+        writer.write(head.encode("latin-1") + data)
+
+
+def load_test(username, password, pin=None, host=AppConfig.API_HOST, port=AppConfig.API_PORT,
+              checkouts=400, clients=8, seed=7):
+    """Run concurrent checkouts as ``username`` against a running server; returns throughput and latency"""
+    import random
+    import statistics
+    from http.client import HTTPConnection
+
+    headers = {"Content-Type": "application/json"}
+
+    def call(conn, method, path, payload=None):
+        body = json.dumps(payload) if payload is not None else None
+        conn.request(method, path, body=body, headers=headers)
+        response = conn.getresponse()
+        return response.status, json.loads(response.read())
+
+    conn = HTTPConnection(host, port)
+    status, login = call(conn, "POST", "/login", {"username": username, "password": password})
+    if status != 200:
+        raise ValueError(f"Login failed: {login.get('error')}")
+    headers["Authorization"] = f"Bearer {login['token']}"
+    _, stock = call(conn, "GET", "/stock")
+    conn.close()
+    stock_ids = [item["id"] for item in stock["items"]]
+    if not stock_ids:
+        raise ValueError("The server's database has no stock to sell")
+
+    def client(index):
+        rng = random.Random(seed + index)
+        conn = HTTPConnection(host, port)
+        latencies, rejected, failed = [], 0, 0
+        for _ in range(checkouts // clients):
+            request = {
+                "items": [{"id": item_id, "quantity": 1}
+                          for item_id in rng.sample(stock_ids, min(len(stock_ids), rng.randint(1, 3)))],
+                "pin": pin,
+            }
+            started = time.perf_counter()
+            status, _ = call(conn, "POST", "/checkout", request)
+            latencies.append((time.perf_counter() - started) * 1000)
+            # 400 is a rejected sale (usually sold out); anything else is a fault
+            rejected += status == 400
+            failed += status not in (201, 400)
+        conn.close()
+        return latencies, rejected, failed
+
+    started = time.perf_counter()
+    with ThreadPoolExecutor(max_workers=clients) as pool:
+        results = list(pool.map(client, range(clients)))
+    elapsed = time.perf_counter() - started
+
+    latencies = sorted(ms for client_latencies, _, _ in results for ms in client_latencies)
+    return {
+        "checkouts": len(latencies),
+        "rejected": sum(rejected for _, rejected, _ in results),
+        "failed": sum(failed for _, _, failed in results),
+        "clients": clients,
+        "bills_per_second": round(len(latencies) / elapsed, 1),
+        "median_ms": round(statistics.median(latencies), 2),
+        "p95_ms": round(latencies[int(0.95 * (len(latencies) - 1))], 2),
+    }
+
+
+if __name__ == "__main__":
+    import argparse
+
+    parser = argparse.ArgumentParser(description="Serve the billing API to thin clients on the LAN")
+    parser.add_argument("--db", default=AppConfig.DB_NAME, help="database file")
+    parser.add_argument("--host", default=AppConfig.API_HOST,
+                        help="use 0.0.0.0 to accept LAN clients (checkout still requires a login)")
+    parser.add_argument("--port", type=int, default=AppConfig.API_PORT)
+    parser.add_argument("--window-ms", type=float, default=AppConfig.WRITE_GROUP_COMMIT_MS,
+                        help="group commit window")
+    parser.add_argument("--load-test", type=int, metavar="CHECKOUTS",
+                        help="run checkouts against an already running server instead of serving")
+    parser.add_argument("--clients", type=int, default=8, help="concurrent clients for --load-test")
+    parser.add_argument("--user", default="admin", help="user the --load-test checkouts bill as")
+    parser.add_argument("--pin", help="billing PIN for --load-test, if the user's role needs one")
+    args = parser.parse_args()
+
+    logging.basicConfig(level=logging.INFO, format="%(asctime)s %(levelname)s %(message)s")
+    if args.load_test:
+        import getpass
+
+        password = getpass.getpass(f"Password for {args.user}: ")
+        print(json.dumps(load_test(args.user, password, args.pin, args.host, args.port,
+                                   args.load_test, args.clients), indent=2))
+    else:
+        from database import Database
+
+        server = ApiServer(Database(args.db), args.host, args.port, window_ms=args.window_ms)
+        try:
+            asyncio.run(server.serve_forever())
+        except KeyboardInterrupt:
+            logger.info("API server stopped")
@@ -0,0 +1,279 @@
+"""
+Archival of closed fiscal years
+Sales (and their line items) from fiscal years that are closed are moved out
+of the hot database into one ``sales_YYYY.db`` file per fiscal year. The
+archives are attached on demand and exposed together with the live tables
+through the ``all_sales`` / ``all_sale_items`` views for historical search.
+"""
+import os
+import re
+import time
+import logging
+import sqlite3
+from contextlib import contextmanager
+from datetime import datetime
+from config import AppConfig
+
+logger = logging.getLogger(__name__)
+
+ARCHIVED_TABLES = ("sales", "sale_items")
+ARCHIVE_FILE_PATTERN = re.compile(r"^sales_(\d{4})\.db$")
+
+
+def fiscal_year_of(value, start_month=AppConfig.FISCAL_YEAR_START_MONTH):
+    """Fiscal year (named by its starting calendar year) containing a date"""
+    return value.year if value.month >= start_month else value.year - 1
+
+
+def fiscal_year_bounds(year, start_month=AppConfig.FISCAL_YEAR_START_MONTH):
+    """(start, end) date strings of a fiscal year; ``end`` is exclusive"""
+    return f"{year}-{start_month:02d}-01", f"{year + 1}-{start_month:02d}-01"
+
+
+def fiscal_year_label(year):
+    """Display label such as 'FY 2023-24'"""
+    return f"FY {year}-{(year + 1) % 100:02d}"
+
+
+class SalesArchive:
+    """Move closed fiscal years out of the hot database and query them back"""
+
+    def __init__(self, db, archive_dir=AppConfig.ARCHIVE_DIR):
+        self.db = db
+        self.archive_dir = archive_dir
+
+    def archive_path(self, year):
+        return os.path.join(self.archive_dir, f"sales_{year}.db")
+
+    def archived_years(self):
+        """Fiscal years that have an archive file, oldest first"""
+        if not os.path.isdir(self.archive_dir):
+            return []
+        years = []
+        for name in os.listdir(self.archive_dir):
+            match = ARCHIVE_FILE_PATTERN.match(name)
+            if match:
+                years.append(int(match.group(1)))
+        return sorted(years)
+
+    def closed_years(self, keep=AppConfig.ARCHIVE_KEEP_CLOSED_YEARS, today=None):
+        """Closed fiscal years still in the hot database, beyond the ``keep`` most recent"""
+        row = self.db.execute_query("SELECT MIN(created_at) AS oldest FROM sales", fetch_one=True)
+        if not row or not row['oldest']:
+            return []
+        oldest = fiscal_year_of(datetime.fromisoformat(row['oldest']))
+        current = fiscal_year_of(today or datetime.now())
+        return list(range(oldest, current - keep))
+
+    # Moving data ---------------------------------------------------------
+
+    @staticmethod
+    def _columns(conn, schema, table):
+        return [row[1] for row in conn.execute(f"PRAGMA {schema}.table_info({table})")]
+
+    def _ensure_archive_schema(self, conn):
+        """Create the archive tables from the live DDL and add any newer columns"""
+        for table in ARCHIVED_TABLES:
+            ddl = conn.execute(
+                "SELECT sql FROM main.sqlite_master WHERE type = 'table' AND name = ?", (table,)
+            ).fetchone()[0]
+            archived = self._columns(conn, "archive", table)
+            if not archived:
+                conn.execute(re.sub(
+                    rf"^CREATE TABLE\s+(IF NOT EXISTS\s+)?\"?{table}\"?",
+                    f"CREATE TABLE archive.{table}", ddl, count=1
+                ))
+                continue
+            types = {row[1]: row[2] for row in conn.execute(f"PRAGMA main.table_info({table})")}
+            for column in self._columns(conn, "main", table):
+                if column not in archived:
+                    conn.execute(f"ALTER TABLE archive.{table} ADD COLUMN {column} {types[column]}")
+        conn.execute("CREATE INDEX IF NOT EXISTS archive.idx_sales_date ON sales(created_at)")
+        conn.execute("CREATE INDEX IF NOT EXISTS archive.idx_sales_invoice ON sales(invoice_number)")
+        conn.execute("CREATE INDEX IF NOT EXISTS archive.idx_sales_customer ON sales(customer_id, created_at)")
+        conn.execute("CREATE INDEX IF NOT EXISTS archive.idx_sale_items_sale ON sale_items(sale_id)")
+
+    def archive_year(self, year):
+        """Move one fiscal year's sales and line items into its archive file
+
+        Copy and delete run in a single transaction spanning both files, so a
+        failure leaves every row in exactly one place. Returns sales moved.
+        """
+        os.makedirs(self.archive_dir, exist_ok=True)
+        start, end = fiscal_year_bounds(year)
+        in_year = "SELECT id FROM main.sales WHERE created_at >= ? AND created_at < ?"
+
+        with self.db.get_connection() as conn:
+            conn.execute("ATTACH DATABASE ? AS archive", (self.archive_path(year),))
+            try:
+                conn.execute("BEGIN IMMEDIATE")
+                self._ensure_archive_schema(conn)
+
+                sale_columns = ", ".join(self._columns(conn, "main", "sales"))
+                item_columns = ", ".join(self._columns(conn, "main", "sale_items"))
+                conn.execute(
+                    f'''INSERT OR REPLACE INTO archive.sales ({sale_columns})
+                        SELECT {sale_columns} FROM main.sales
+                        WHERE created_at >= ? AND created_at < ?''',
+                    (start, end)
+                )
+                conn.execute(
+                    f'''INSERT OR REPLACE INTO archive.sale_items ({item_columns})
+                        SELECT {item_columns} FROM main.sale_items
+                        WHERE sale_id IN ({in_year})''',
+                    (start, end)
+                )
+                conn.execute(f"DELETE FROM main.sale_items WHERE sale_id IN ({in_year})", (start, end))
+                moved = conn.execute(
+                    "DELETE FROM main.sales WHERE created_at >= ? AND created_at < ?", (start, end)
+                ).rowcount
+                conn.commit()
+            except Exception:
+                conn.rollback()
+                raise
+            finally:
+                conn.execute("DETACH DATABASE archive")
+
+        logger.info(f"Archived {moved} sales from {fiscal_year_label(year)} to {self.archive_path(year)}")
+        return moved
+
+    def archive_closed_years(self, keep=AppConfig.ARCHIVE_KEEP_CLOSED_YEARS, vacuum=True):
+        """Archive every eligible closed year; returns {year: sales moved}"""
+        moved = {year: self.archive_year(year) for year in self.closed_years(keep)}
+        if vacuum and any(moved.values()):
+            # Give the freed pages back so the hot file (and its backups) shrink
+            with self.db.get_connection() as conn:
+                conn.execute("VACUUM")
+        return moved
+
+    # Historical queries --------------------------------------------------
+
+    @contextmanager
+    def historical_connection(self):
+        """Connection with archives attached and ``all_sales`` / ``all_sale_items`` views
+
+        Views use UNION ALL across the live tables and each archive, selecting
+        the live column list (NULL for columns an older archive lacks).
+        """
+        with self.db.get_connection() as conn:
+            years = self.archived_years()
+            limit = conn.getlimit(sqlite3.SQLITE_LIMIT_ATTACHED)
+            if len(years) > limit:
+                logger.warning(f"Only the {limit} most recent sales archives can be attached")
+                years = years[-limit:]
+
+            schemas = []
+            for year in years:
+                schema = f"fy{year}"
+                conn.execute(f"ATTACH DATABASE ? AS {schema}", (self.archive_path(year),))
+                schemas.append(schema)
+
+            for table in ARCHIVED_TABLES:
+                columns = self._columns(conn, "main", table)
+                selects = [f"SELECT {', '.join(columns)} FROM main.{table}"]
+                for schema in schemas:
+                    present = set(self._columns(conn, schema, table))
+                    if not present:
+                        continue
+                    select_list = ", ".join(c if c in present else f"NULL AS {c}" for c in columns)
+                    selects.append(f"SELECT {select_list} FROM {schema}.{table}")
+                conn.execute(f"DROP VIEW IF EXISTS temp.all_{table}")
+                conn.execute(f"CREATE TEMP VIEW all_{table} AS {' UNION ALL '.join(selects)}")
+
+            try:
+                yield conn
+            finally:
+                conn.commit()
+                for schema in schemas:
+                    conn.execute(f"DETACH DATABASE {schema}")
+
+
+def benchmark(years=5, sales_per_year=200_000, db_path="archive_benchmark.db", seed=11):
+    """Dashboard query latency with ``years`` closed years in the hot database vs. archived"""
+    import random
+    import shutil
+    import tempfile
+    from datetime import timedelta
+    from database import Database
+
+    work_dir = tempfile.mkdtemp(prefix="archive_benchmark_")
+    db = Database(os.path.join(work_dir, db_path))
+    rng = random.Random(seed)
+    now = datetime.now()
+    current = fiscal_year_of(now)
+    first = datetime.fromisoformat(fiscal_year_bounds(current - years)[0])
+    span = int((now - first).total_seconds())
+    total_sales = int(sales_per_year * (span / (365 * 86400)))
+
+    def rows():
+        for i in range(1, total_sales + 1):
+            created = first + timedelta(seconds=span * i // total_sales)
+            amount = float(rng.randrange(500, 50000))
+            yield (i, f"INV-{i:08d}", "[]", amount, 0, amount, created.isoformat())
+
+    with db.get_connection() as conn:
+        conn.executemany(
+            "INSERT INTO sales (id, invoice_number, items, subtotal, gst_amount, total_amount, created_at) "
+            "VALUES (?, ?, ?, ?, ?, ?, ?)", rows()
+        )
+        conn.execute(
+            "INSERT INTO sale_items (sale_id, sku, item_name, category, quantity, unit_price, total_price) "
+            "SELECT id, 'SKU-1', 'Item', 'Saree', 1, total_amount, total_amount FROM sales"
+        )
+
+    def dashboard_ms(repeat=5):
+        # The queries Dashboard.load_metrics issues on every refresh
+        started = time.perf_counter()
+        for _ in range(repeat):
+            db.get_today_sales()
+            with db.get_connection() as conn:
+                conn.execute(
+                    """SELECT SUM(total_amount) as total, COUNT(*) as count
+                       FROM sales
+                       WHERE strftime('%Y-%m', created_at) = strftime('%Y-%m', 'now')"""
+                ).fetchone()
+            db.get_low_stock_items()
+            db.get_recent_transactions(8)
+        return round((time.perf_counter() - started) * 1000 / repeat, 1)
+
+    before = {"dashboard_ms": dashboard_ms(), "db_mb": round(os.path.getsize(db.db_name) / 1e6, 1)}
+    archive = SalesArchive(db, os.path.join(work_dir, "archive"))
+    started = time.perf_counter()
+    moved = archive.archive_closed_years(keep=0)
+    archive_s = round(time.perf_counter() - started, 1)
+    after = {"dashboard_ms": dashboard_ms(), "db_mb": round(os.path.getsize(db.db_name) / 1e6, 1)}
+
+    with archive.historical_connection() as conn:
+        started = time.perf_counter()
+        found = conn.execute(
+            "SELECT COUNT(*) FROM all_sales WHERE invoice_number LIKE ?", ("%00012%",)
+        ).fetchone()[0]
+        search_ms = round((time.perf_counter() - started) * 1000, 1)
+
+    shutil.rmtree(work_dir)
+    return {
+        "sales": total_sales,
+        "archived": {fiscal_year_label(y): n for y, n in moved.items()},
+        "archive_seconds": archive_s,
+        "before": before,
+        "after": after,
+        "historical_search": {"matches": found, "ms": search_ms},
+    }
+
+
+if __name__ == "__main__":
+    import argparse
+    import json
+
+    parser = argparse.ArgumentParser(description="Archive closed fiscal years of sales")
+    parser.add_argument("--benchmark", action="store_true", help="run the before/after dashboard benchmark")
+    parser.add_argument("--keep", type=int, default=AppConfig.ARCHIVE_KEEP_CLOSED_YEARS,
+                        help="closed years to keep in the hot database")
+    args = parser.parse_args()
+
+    logging.basicConfig(level=logging.INFO, format="%(levelname)s %(message)s")
+    if args.benchmark:
+        print(json.dumps(benchmark(), indent=2))
+    else:
+        from database import Database
+        print(json.dumps(SalesArchive(Database()).archive_closed_years(args.keep), indent=2))
@@ -1,12 +1,13 @@
 """
 Premium Authentication Module with Modern Login Screen
 """
-import hashlib
 import customtkinter as ctk
 from datetime import datetime
 from tkinter import messagebox
 import logging
 from config import Colors, AppConfig
+import password_hashing
+from permissions import PERMISSIONS, PermissionCache
 
 logger = logging.getLogger(__name__)
 
@@ -14,36 +15,56 @@ class AuthManager:
     def __init__(self, db):
         self.db = db
         self.current_user = None
+        # Loaded at login so permission checks never touch the database
+        self.permissions = None
     
     def hash_password(self, password):
-        """Hash password using MD5 (for simplicity, use bcrypt in production)"""
-        return hashlib.md5(password.encode()).hexdigest()
+        """Salted scrypt (or PBKDF2) hash of a password"""
+        return password_hashing.hash_password(password)
     
     def authenticate(self, username, password):
         """Authenticate user"""
-        query = '''
-            SELECT * FROM users 
-            WHERE username = ? AND password_hash = ?
-        '''
-        user = self.db.execute_query(query, (username, self.hash_password(password)), fetch_one=True)
-        
-        if user:
-            # Update last login
-            self.db.execute_query(
-                "UPDATE users SET last_login = ? WHERE id = ?",
-                (datetime.now(), user['id'])
-            )
-            self.current_user = dict(user)
-            return True
-        return False
+        user = self.db.run_query("users.by_username", (username,), fetch_one=True)
+        if not user or not password_hashing.verify_password(password, user['password_hash']):
+            return False
+        
+        # Upgrade legacy MD5 and lower-cost hashes now that the password is known
+        if password_hashing.needs_rehash(user['password_hash']):
+            self.db.run_query("users.set_password_hash", (self.hash_password(password), user['id']))
+            logger.info(f"Upgraded password hash for {username}")
+        
+        # Update last login
+        self.db.run_query("users.touch_login", (datetime.now(), user['id']))
+        self.current_user = dict(user)
+        self.permissions = PermissionCache(self.db, user['role'])
+        return True
+    
+    def logout(self):
+        """Forget the current user, their permissions and any PIN elevation"""
+        self.current_user = None
+        self.permissions = None
+    
+    def authorize(self, permission):
+        """'allowed', 'pin' (PIN still to be entered) or 'denied' for the current user"""
+        if self.permissions is None:
+            return "denied"
+        return self.permissions.check(permission)
+    
+    def verify_pin(self, scope, pin):
+        """Check a PIN and elevate the session so it is not asked again right away"""
+        return self.permissions is not None and self.permissions.elevate(scope, pin)
+    
+    def pin_session_token(self, scope):
+        """Token of a still-valid PIN elevation for ``scope``, else None"""
+        return self.permissions.session_token(scope) if self.permissions else None
     
     def verify_admin_pin(self, pin):
         """Verify admin PIN for sensitive operations"""
-        return pin == AppConfig.DEFAULT_ADMIN_PIN
+        return self.verify_pin("admin", pin)
     
     def verify_billing_pin(self, pin):
         """Verify billing PIN for stock management"""
-        return pin == AppConfig.DEFAULT_BILLING_PIN
+        return self.verify_pin("billing", pin)
 
 
 class LoginWindow(ctk.CTkFrame):
@@ -53,7 +74,8 @@ class LoginWindow(ctk.CTkFrame):
         super().__init__(parent, fg_color=Colors.BG_LIGHT)
         self.parent = parent
         self.on_login_success = on_login_success
-        self.auth = AuthManager(parent.db)
+        # The application's manager, so the logged-in user and PIN sessions are shared
+        self.auth = parent.auth
         
         self.setup_ui()
     
@@ -230,6 +252,18 @@ class LoginWindow(ctk.CTkFrame):
 class PinDialog(ctk.CTkToplevel):
     """Modern PIN verification dialog"""
     
+    @classmethod
+    def confirm(cls, parent, auth, permission, title="Enter PIN"):
+        """True when the user may do ``permission``, asking for its PIN only if needed"""
+        status = auth.authorize(permission)
+        if status == "denied":
+            messagebox.showwarning("Access Denied", "Your role does not have access to this.")
+            return False
+        if status == "allowed":
+            return True
+        scope = PERMISSIONS[permission]
+        return bool(cls(parent, title, lambda pin: auth.verify_pin(scope, pin)).show())
+    
     def __init__(self, parent, title="Enter PIN", verify_callback=None):
         super().__init__(parent)
         self.parent = parent
@@ -0,0 +1,233 @@
+"""
+Headless performance benchmarks
+Runs the database work behind checkout, stock loading, global search, the
+dashboard and reports against a deterministic dataset from generate_data.py
+and writes JSON results that can be compared across commits.
+
+Usage:
+    python benchmark.py --scale 100k [--repeat 20] [--compare benchmarks/results_100k_abc1234.json]
+"""
+import os
+import sys
+import json
+import time
+import random
+import shutil
+import sqlite3
+import logging
+import platform
+import statistics
+import subprocess
+import tempfile
+from datetime import datetime
+from generate_data import SCALES, default_end_date, generate
+
+logger = logging.getLogger(__name__)
+
+BENCHMARK_DIR = "benchmarks"
+STOCK_LIST_SQL = "SELECT * FROM stock WHERE is_active = 1 ORDER BY name"
+SEARCH_TERMS = {"bills": "INV-2", "customers": "Priya", "stock": "Silk"}
+
+
+def _stats(samples_ms):
+    ordered = sorted(samples_ms)
+    return {
+        "runs": len(ordered),
+        "min_ms": round(ordered[0], 3),
+        "median_ms": round(statistics.median(ordered), 3),
+        "p95_ms": round(ordered[min(len(ordered) - 1, int(round(0.95 * (len(ordered) - 1))))], 3),
+        "mean_ms": round(statistics.fmean(ordered), 3),
+    }
+
+
+def _time(func, repeat, warmup=1):
+    for _ in range(warmup):
+        func()
+    samples = []
+    for _ in range(repeat):
+        started = time.perf_counter()
+        func()
+        samples.append((time.perf_counter() - started) * 1000)
+    return _stats(samples)
+
+
+def run_benchmarks(db_path, repeat=20, checkouts=200, seed=7):
+    """Time each workload against ``db_path``; checkout runs last since it writes"""
+    from database import Database
+    from queries import QUERIES
+    from archive import SalesArchive
+    from analytics import period_range
+    from chart_data import ChartDataProvider
+    from sales_series import period_series
+    from report_service import ReportService
+    from sales_service import SalesService
+
+    db = Database(db_path)
+    results = {}
+
+    now = datetime.now().isoformat()
+    results["stock_load.billing"] = _time(
+        lambda: db.run_query("billing.available_stock", (now, ""), fetch_all=True), repeat)
+    results["stock_load.stock"] = _time(lambda: db.execute_query(STOCK_LIST_SQL, fetch_all=True), repeat)
+
+    archive = SalesArchive(db)
+
+    def search_bills():
+        pattern = f"%{SEARCH_TERMS['bills']}%"
+        with archive.historical_connection() as conn:
+            conn.execute(QUERIES["search.bills"], (pattern, pattern, pattern)).fetchall()
+
+    results["search.bills"] = _time(search_bills, repeat)
+    pattern = f"%{SEARCH_TERMS['customers']}%"
+    results["search.customers"] = _time(
+        lambda: db.run_query("search.customers", (pattern,) * 3, fetch_all=True), repeat)
+    pattern = f"%{SEARCH_TERMS['stock']}%"
+    results["search.stock"] = _time(
+        lambda: db.run_query("search.stock", (pattern,) * 4, fetch_all=True), repeat)
+
+    reports = ReportService(db)
+
+    def dashboard_metrics():
+        # Dashboard.load_metrics, with a cold chart cache as on first open
+        reports.dashboard_metrics(8)
+        with db.get_connection() as conn:
+            period_series(conn, "week")
+        charts = ChartDataProvider(db)
+        charts.sales_trend(30)
+        charts.category_distribution("month")
+
+    results["dashboard.metrics"] = _time(dashboard_metrics, repeat)
+
+    for period in ("today", "week", "month"):
+        def summary(period=period):
+            reports.analytics.invalidate()
+            reports.analytics.summary(period)
+        results[f"reports.summary.{period}"] = _time(summary, repeat)
+    results["reports.top_items.month"] = _time(
+        lambda: reports.rollups.top_items(*period_range("month"), limit=10), repeat)
+
+    rng = random.Random(seed)
+    stock = [dict(row) for row in db.execute_query(
+        "SELECT id, sku, name, category, selling_price, quantity FROM stock "
+        "WHERE is_active = 1 AND quantity > 0", fetch_all=True)]
+    sales = SalesService(db)
+    samples = []
+    rejected = 0
+    for i in range(checkouts):
+        cart, picked = [], []
+        for item in rng.sample(stock, min(rng.randint(1, 4), len(stock))):
+            # Never ask for more than is left, as the billing screen would not allow it
+            quantity = min(rng.randint(1, 2), item["quantity"])
+            if quantity <= 0:
+                continue
+            cart.append({"id": item["id"], "sku": item["sku"], "name": item["name"],
+                         "category": item["category"], "price": item["selling_price"],
+                         "quantity": quantity, "total": item["selling_price"] * quantity})
+            picked.append((item, quantity))
+        if not cart:
+            rejected += 1
+            continue
+        phone = f"8{rng.randrange(10 ** 9):09d}" if rng.random() < 0.5 else f"9{rng.randint(1, 1000):09d}"
+        started = time.perf_counter()
+        try:
+            sales.checkout(cart, "benchmark", customer_name="Benchmark Customer", customer_phone=phone)
+        except ValueError as e:
+            logger.warning(f"Checkout rejected: {e}")
+            rejected += 1
+            continue
+        samples.append((time.perf_counter() - started) * 1000)
+        for item, quantity in picked:
+            item["quantity"] -= quantity
+    results["checkout"] = dict(_stats(samples), rejected=rejected) if samples else {"runs": 0, "rejected": rejected}
+    return results
+
+
+def _git_commit():
+    try:
+        return subprocess.run(
+            ["git", "rev-parse", "--short", "HEAD"], capture_output=True, text=True,
+            cwd=os.path.dirname(os.path.abspath(__file__)), check=True
+        ).stdout.strip()
+    except (OSError, subprocess.CalledProcessError):
+        return "unknown"
+
+
+def benchmark(scale="10k", seed=42, end_date=None, repeat=20, checkouts=200, data_dir=BENCHMARK_DIR):
+    """Generate (or reuse) the dataset for ``scale``, run every benchmark on a copy, return results"""
+    end_date = end_date or default_end_date()
+    os.makedirs(data_dir, exist_ok=True)
+    dataset = os.path.join(data_dir, f"bench_{scale}_s{seed}_{end_date:%Y%m%d}.db")
+    if not os.path.exists(dataset):
+        generate(dataset, SCALES[scale], seed, end_date)
+
+    work_dir = tempfile.mkdtemp(prefix="boutique_bench_")
+    try:
+        # Benchmarks write (checkout), so each run starts from a fresh copy
+        work_db = os.path.join(work_dir, "bench.db")
+        shutil.copyfile(dataset, work_db)
+        started = time.perf_counter()
+        results = run_benchmarks(work_db, repeat, checkouts)
+        elapsed = time.perf_counter() - started
+    finally:
+        shutil.rmtree(work_dir, ignore_errors=True)
+
+    return {
+        "meta": {
+            "commit": _git_commit(),
+            "timestamp": datetime.now().isoformat(timespec="seconds"),
+            "scale": scale,
+            "sales": SCALES[scale],
+            "seed": seed,
+            "end_date": end_date.strftime("%Y-%m-%d"),
+            "repeat": repeat,
+            "checkouts": checkouts,
+            "python": platform.python_version(),
+            "sqlite": sqlite3.sqlite_version,
+            "platform": platform.platform(),
+            "seconds": round(elapsed, 1),
+        },
+        "results": results,
+    }
+
+
+def compare(current, previous):
+    """Lines comparing median times with an earlier results file"""
+    lines = [f"{'benchmark':<28}{'before':>12}{'after':>12}{'change':>10}"]
+    for name, result in current["results"].items():
+        if "median_ms" not in result:
+            continue
+        before = previous["results"].get(name)
+        if not before:
+            lines.append(f"{name:<28}{'-':>12}{result['median_ms']:>12.3f}{'new':>10}")
+            continue
+        change = (result["median_ms"] - before["median_ms"]) / before["median_ms"] * 100 if before["median_ms"] else 0
+        lines.append(f"{name:<28}{before['median_ms']:>12.3f}{result['median_ms']:>12.3f}{change:>+9.1f}%")
+    return "\n".join(lines)
+
+
+if __name__ == "__main__":
+    import argparse
+
+    parser = argparse.ArgumentParser(description="Run the headless performance benchmarks")
+    parser.add_argument("--scale", choices=SCALES, default="10k", help="dataset size in sales")
+    parser.add_argument("--seed", type=int, default=42)
+    parser.add_argument("--end-date", help="exclusive end date of the dataset, YYYY-MM-DD (default tomorrow)")
+    parser.add_argument("--repeat", type=int, default=20, help="timed runs per read benchmark")
+    parser.add_argument("--checkouts", type=int, default=200, help="timed checkouts")
+    parser.add_argument("--out", help="results file (default benchmarks/results_<scale>_<commit>.json)")
+    parser.add_argument("--compare", help="earlier results file to compare medians with")
+    args = parser.parse_args()
+
+    logging.basicConfig(level=logging.WARNING, format="%(levelname)s %(message)s")
+    end_date = datetime.strptime(args.end_date, "%Y-%m-%d") if args.end_date else None
+    output = benchmark(args.scale, args.seed, end_date, args.repeat, args.checkouts)
+    out_path = args.out or os.path.join(
+        BENCHMARK_DIR, f"results_{args.scale}_{output['meta']['commit']}.json")
+    with open(out_path, "w", encoding="utf-8") as f:
+        json.dump(output, f, indent=2)
+
+    print(json.dumps(output["results"], indent=2))
+    if args.compare:
+        with open(args.compare, encoding="utf-8") as f:
+            print(compare(output, json.load(f)))
+    print(f"Results written to {out_path}", file=sys.stderr)
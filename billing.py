@@ -3,11 +3,14 @@ Billing and invoice generation module
 """
 import customtkinter as ctk
 from tkinter import ttk, messagebox
-import json
 from datetime import datetime
 from config import Colors, AppConfig
 from utils import InvoiceGenerator, Validators, Formatters
 from auth import PinDialog
+from reservations import ReservationManager
+from sales_service import SalesService
+from profiler import profiler, traced
+from ui_components import TreeviewSync, SuggestionList, ticks
 
 class BillingSystem(ctk.CTkFrame):
     """Billing system with cart and invoice generation"""
@@ -20,6 +23,12 @@ class BillingSystem(ctk.CTkFrame):
         # Cart items
         self.cart_items = []
         
+        # Stock held by this cart until checkout or expiry
+        self.reservations = ReservationManager(self.db)
+        self.cart_id = self.reservations.new_cart_id()
+        self.customers = parent.customer_index
+        self.sales = SalesService(self.db, journal=parent.journal, customers=self.customers)
+        
         # Customer info
         self.customer_info = {
             "name": "",
@@ -29,6 +38,36 @@ class BillingSystem(ctk.CTkFrame):
         
         self.setup_ui()
         self.load_stock_items()
+        # Keeps sweeping while the screen is cached but hidden; stops when it is destroyed
+        ticks.every(self, AppConfig.RESERVATION_SWEEP_INTERVAL_MS, self.sweep_reservations,
+                    name="BillingSystem.sweep_reservations", visible_only=False)
+        # Only while the screen is shown: a cart left on a hidden screen is let go
+        ticks.every(self, AppConfig.RESERVATION_TOUCH_INTERVAL_MS, self.keep_cart_held,
+                    name="BillingSystem.keep_cart_held")
+    
+    def destroy(self):
+        """Release this cart's reservations when the billing screen closes"""
+        try:
+            self.reservations.release(self.cart_id)
+        except Exception as e:
+            print(f"Error releasing reservations: {e}")
+        super().destroy()
+    
+    def keep_cart_held(self):
+        """Extend the holds of the cart being billed so they do not expire mid-sale"""
+        if not self.cart_items:
+            return
+        try:
+            self.reservations.touch(self.cart_id)
+        except Exception as e:
+            print(f"Error extending reservations: {e}")
+    
+    def sweep_reservations(self):
+        """Periodically drop expired reservations from abandoned carts"""
+        try:
+            self.reservations.sweep_expired()
+        except Exception as e:
+            print(f"Error sweeping reservations: {e}")
     
     def setup_ui(self):
         """Setup billing UI"""
@@ -94,6 +133,7 @@ class BillingSystem(ctk.CTkFrame):
         )
         self.stock_tree.grid(row=0, column=0, sticky="nsew")
         self.tree_scroll.configure(command=self.stock_tree.yview)
+        self.stock_rows = TreeviewSync(self.stock_tree)
         
         # Define columns
         columns = ("ID", "SKU", "Name", "Category", "Material", "Color", "Qty", "Price")
@@ -156,6 +196,10 @@ class BillingSystem(ctk.CTkFrame):
         )
         phone_entry.grid(row=2, column=1, padx=10, pady=5, sticky="ew")
         
+        # Returning customers are suggested as the name or phone is typed
+        SuggestionList(name_entry, self.suggest_by_name, self.fill_customer)
+        SuggestionList(phone_entry, self.suggest_by_phone, self.fill_customer)
+        
         # Cart frame
         cart_frame = ctk.CTkFrame(right_panel)
         cart_frame.grid(row=1, column=0, sticky="nsew", pady=(0, 10))
@@ -295,36 +339,46 @@ class BillingSystem(ctk.CTkFrame):
         )
         generate_btn.grid(row=0, column=1, padx=5)
     
+    @traced()
     def load_stock_items(self):
-        """Load stock items into treeview"""
-        # Clear existing items
-        for item in self.stock_tree.get_children():
-            self.stock_tree.delete(item)
-        
-        # Get stock items
-        query = '''
-            SELECT id, sku, name, category, material, color, quantity, selling_price
-            FROM stock 
-            WHERE is_active = 1 AND quantity > 0
-            ORDER BY name
-        '''
-        items = self.db.execute_query(query, fetch_all=True)
-        
-        # Add to treeview
-        for item in items:
-            self.stock_tree.insert(
-                "", "end",
-                values=(
-                    item['id'],
-                    item['sku'],
-                    item['name'],
-                    item['category'],
-                    item['material'] or "",
-                    item['color'] or "",
-                    item['quantity'],
-                    Formatters.format_currency(item['selling_price'])
-                )
-            )
+        """Load stock items into treeview, updating only rows that changed"""
+        # Get stock items, net of quantities reserved by other open carts
+        items = self.db.run_query(
+            "billing.available_stock", (datetime.now().isoformat(), self.cart_id), fetch_all=True
+        )
+        
+        self.stock_rows.sync(
+            (item['id'],
+             (item['id'],
+              item['sku'],
+              item['name'],
+              item['category'],
+              item['material'] or "",
+              item['color'] or "",
+              item['quantity'],
+              Formatters.format_currency(item['selling_price'])),
+             ())
+            for item in items
+        )
+    
+    def refresh(self):
+        """Reload stock when shown again after the data changed"""
+        self.load_stock_items()
+        self.on_search_changed()
+        self.customers.refresh()
+    
+    def suggest_by_phone(self, text):
+        return [(f"{customer['phone']}  {customer['name']}", customer)
+                for customer in self.customers.by_phone_prefix(text)]
+    
+    def suggest_by_name(self, text):
+        return [(f"{customer['name']}  {customer['phone'] or ''}", customer)
+                for customer in self.customers.by_name_prefix(text)]
+    
+    def fill_customer(self, customer):
+        """Fill the customer fields from a picked suggestion"""
+        self.customer_name_var.set(customer['name'])
+        self.customer_phone_var.set(customer['phone'] or "")
     
     def on_search_changed(self, *args):
         """Handle search input change"""
@@ -398,12 +452,18 @@ class BillingSystem(ctk.CTkFrame):
                         messagebox.showwarning("Warning", f"Only {stock_qty} items available in stock!")
                         return
                     
+                    if not self.reserve_item(item_id, new_qty):
+                        return
+                    
                     self.cart_items[i]['quantity'] = new_qty
                     self.cart_items[i]['total'] = new_qty * price
                     self.update_cart_display()
                     self.calculate_totals()
                     return
             
+            if not self.reserve_item(item_id, quantity):
+                return
+            
             # Add new item to cart
             cart_item = {
                 'id': item_id,
@@ -427,6 +487,18 @@ class BillingSystem(ctk.CTkFrame):
         except ValueError:
             messagebox.showwarning("Warning", "Please enter a valid quantity!")
     
+    def reserve_item(self, item_id, quantity):
+        """Hold stock for this cart; warn if another counter got there first"""
+        if self.reservations.reserve(self.cart_id, item_id, quantity):
+            return True
+        available = self.reservations.available_quantity(item_id, self.cart_id)
+        messagebox.showwarning(
+            "Warning",
+            f"Only {available} items available - the rest are held in other open carts!"
+        )
+        self.load_stock_items()
+        return False
+    
     def update_cart_display(self):
         """Update cart display"""
         self.cart_text.configure(state="normal")
@@ -444,21 +516,15 @@ class BillingSystem(ctk.CTkFrame):
     
     def calculate_totals(self):
         """Calculate subtotal, GST, and total"""
-        subtotal = sum(item['total'] for item in self.cart_items)
-        
         try:
             discount = float(self.discount_var.get() or 0)
         except ValueError:
             discount = 0
             self.discount_var.set("0")
         
-        if discount > subtotal:
-            discount = subtotal
-            self.discount_var.set(str(discount))
-        
-        taxable = subtotal - discount
-        gst_amount = taxable * (AppConfig.GST_RATE / 100)
-        total = taxable + gst_amount
+        subtotal, capped, gst_amount, total = SalesService.calculate_totals(self.cart_items, discount)
+        if capped != discount:
+            self.discount_var.set(str(capped))
         
         # Update display
         self.subtotal_var.set(Formatters.format_currency(subtotal))
@@ -469,6 +535,11 @@ class BillingSystem(ctk.CTkFrame):
         """Clear all items from cart"""
         if self.cart_items:
             if messagebox.askyesno("Confirm", "Clear all items from cart?"):
+                try:
+                    self.reservations.release(self.cart_id)
+                except Exception as e:
+                    # Offline: the holds expire on their own
+                    print(f"Error releasing reservations: {e}")
                 self.cart_items = []
                 self.update_cart_display()
                 self.calculate_totals()
@@ -479,11 +550,8 @@ class BillingSystem(ctk.CTkFrame):
             messagebox.showwarning("Warning", "Cart is empty!")
             return
         
-        # Verify billing PIN for stock management access
-        pin_dialog = PinDialog(self.parent, "Enter Billing PIN", 
-                             self.parent.auth.verify_billing_pin)
-        if not pin_dialog.show():
-            messagebox.showwarning("Warning", "PIN verification failed!")
+        # Role check, plus the billing PIN unless it was entered recently
+        if not PinDialog.confirm(self.parent, self.parent.auth, "billing.checkout", "Enter Billing PIN"):
             return
         
         # Get customer info
@@ -495,129 +563,62 @@ class BillingSystem(ctk.CTkFrame):
             messagebox.showwarning("Warning", "Please enter a valid 10-digit phone number!")
             return
         
-        # Calculate totals
-        subtotal = sum(item['total'] for item in self.cart_items)
-        try:
-            discount = float(self.discount_var.get() or 0)
-        except ValueError:
-            discount = 0
-        
-        taxable = subtotal - discount
-        gst_amount = taxable * (AppConfig.GST_RATE / 100)
-        total = taxable + gst_amount
-        
-        # Generate invoice number
-        invoice_number = InvoiceGenerator.generate_invoice_number()
-        
-        # Prepare sale data
-        sale_data = {
-            'invoice_number': invoice_number,
-            'customer_name': customer_name,
-            'customer_phone': customer_phone,
-            'items': json.dumps(self.cart_items),
-            'subtotal': subtotal,
-            'discount': discount,
-            'gst_amount': gst_amount,
-            'total_amount': total,
-            'payment_method': 'Cash',
-            'payment_status': 'Completed',
-            'sold_by': self.parent.auth.current_user['username'],
-            'created_at': datetime.now().isoformat()
-        }
-        
-        # Check if customer exists
-        customer_id = None
-        if customer_phone:
-            query = "SELECT id FROM customers WHERE phone = ?"
-            existing_customer = self.db.execute_query(query, (customer_phone,), fetch_one=True)
-            if existing_customer:
-                customer_id = existing_customer['id']
-                # Update customer stats
-                update_query = '''
-                    UPDATE customers 
-                    SET total_purchases = total_purchases + ?, 
-                        last_purchase_date = ?
-                    WHERE id = ?
-                '''
-                self.db.execute_query(update_query, (total, datetime.now(), customer_id))
-            else:
-                # Create new customer
-                insert_query = '''
-                    INSERT INTO customers (name, phone, total_purchases, last_purchase_date)
-                    VALUES (?, ?, ?, ?)
-                '''
-                customer_id = self.db.execute_query(
-                    insert_query,
-                    (customer_name, customer_phone, total, datetime.now())
+        # Save the sale and render its invoice (the timed part of billing)
+        with profiler.span("generate_bill", items=len(self.cart_items)):
+            try:
+                discount = float(self.discount_var.get() or 0)
+            except ValueError:
+                discount = 0
+            try:
+                sale_data = self.sales.checkout(
+                    self.cart_items,
+                    self.parent.auth.current_user['username'],
+                    customer_name=customer_name,
+                    customer_phone=customer_phone,
+                    discount=discount,
+                    cart_id=self.cart_id
                 )
+            except ValueError as e:
+                # Sold at another counter after this cart's holds expired
+                messagebox.showwarning("Warning", str(e))
+                self.load_stock_items()
+                return
+            # The sold (or journaled) cart's holds are gone; the next bill gets its own id
+            self.cart_id = self.reservations.new_cart_id()
+            customer_info = {
+                'name': customer_name,
+                'phone': customer_phone or ''
+            }
+            try:
+                invoice_path = InvoiceGenerator.generate_invoice(
+                    sale_data, customer_info, self.cart_items
+                )
+                invoice_error = None
+            except Exception as e:
+                invoice_path, invoice_error = None, e
         
-        # Save sale to database
-        sale_query = '''
-            INSERT INTO sales (
-                invoice_number, customer_id, customer_name, customer_phone,
-                items, subtotal, discount, gst_amount, total_amount,
-                payment_method, payment_status, sold_by, created_at
-            ) VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?)
-        '''
-        
-        self.db.execute_query(
-            sale_query,
-            (
-                invoice_number,
-                customer_id,
-                customer_name,
-                customer_phone,
-                json.dumps(self.cart_items),
-                subtotal,
-                discount,
-                gst_amount,
-                total,
-                'Cash',
-                'Completed',
-                self.parent.auth.current_user['username'],
-                datetime.now().isoformat()
-            )
-        )
+        if invoice_error:
+            messagebox.showerror("Error", f"Failed to generate invoice: {str(invoice_error)}")
+            return
         
-        # Update stock quantities
-        for item in self.cart_items:
-            update_stock_query = '''
-                UPDATE stock 
-                SET quantity = quantity - ?, 
-                    last_updated = ?
-                WHERE id = ?
-            '''
-            self.db.execute_query(
-                update_stock_query,
-                (item['quantity'], datetime.now().isoformat(), item['id'])
-            )
-        
-        # Generate invoice
-        customer_info = {
-            'name': customer_name,
-            'phone': customer_phone or ''
-        }
+        # Show success message
+        offline_note = (
+            "Database unavailable: the sale is saved on this counter "
+            "and will be synced automatically.\n\n"
+            if sale_data.get('offline') else ""
+        )
+        messagebox.showinfo(
+            "Success!",
+            f"Bill generated successfully!\n"
+            f"Invoice: {sale_data['invoice_number']}\n"
+            f"Total: ₹{sale_data['total_amount']:.2f}\n\n"
+            f"{offline_note}"
+            f"Invoice saved to:\n{invoice_path}"
+        )
         
-        try:
-            invoice_path = InvoiceGenerator.generate_invoice(
-                sale_data, customer_info, self.cart_items
-            )
-            
-            # Show success message
-            messagebox.showinfo(
-                "Success!",
-                f"Bill generated successfully!\n"
-                f"Invoice: {invoice_number}\n"
-                f"Total: ₹{total:.2f}\n\n"
-                f"Invoice saved to:\n{invoice_path}"
-            )
-            
-            # Reset form
-            self.clear_cart()
-            self.customer_name_var.set("")
-            self.customer_phone_var.set("")
-            self.discount_var.set("0")
-            self.load_stock_items()  # Refresh stock
-            
-        except Exception as e:
-            messagebox.showerror("Error", f"Failed to generate invoice: {str(e)}")
\ No newline at end of file
+        # Reset form
+        self.clear_cart()
+        self.customer_name_var.set("")
+        self.customer_phone_var.set("")
+        self.discount_var.set("0")
+        self.load_stock_items()  # Refresh stock
\ No newline at end of file
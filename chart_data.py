@@ -0,0 +1,82 @@
+"""
+Chart data provider
+Computes the series behind the dashboard charts from live sales data and
+caches each (metric, period) result, so refreshing a chart does not
+re-aggregate unless the data changed or the entry expired.
+"""
+import time
+import logging
+import threading
+from datetime import datetime, timedelta
+from config import AppConfig
+from analytics import period_range
+from sales_series import bucket_series
+
+logger = logging.getLogger(__name__)
+
+
+class ChartDataProvider:
+    """Cached category distribution and sales trend series"""
+
+    def __init__(self, db, ttl_seconds=AppConfig.CHART_CACHE_TTL_SECONDS):
+        self.db = db
+        self.ttl = ttl_seconds
+        self._cache = {}
+        self._lock = threading.Lock()
+
+    def _cached(self, metric, period, compute):
+        key = (metric, period)
+        marker = self.db.data_version()
+        now = time.monotonic()
+        with self._lock:
+            entry = self._cache.get(key)
+            if entry and entry[0] > now and entry[1] == marker:
+                return entry[2]
+
+        value = compute()
+        with self._lock:
+            self._cache[key] = (now + self.ttl, marker, value)
+        return value
+
+    def invalidate(self, metric=None):
+        """Drop cached series for one metric, or everything"""
+        with self._lock:
+            if metric is None:
+                self._cache.clear()
+            else:
+                for key in [k for k in self._cache if k[0] == metric]:
+                    del self._cache[key]
+
+    def category_distribution(self, period="month", limit=6):
+        """(labels, revenue) per category; smaller categories are folded into 'Others'"""
+        def compute():
+            start, end = period_range(period)
+            rows = self.db.execute_query(
+                '''
+                SELECT category, SUM(revenue) AS revenue
+                FROM daily_category_sales
+                WHERE sale_date >= ? AND sale_date < ?
+                GROUP BY category
+                ORDER BY revenue DESC
+                ''',
+                (start, end), fetch_all=True
+            )
+            labels = [row['category'] for row in rows[:limit]]
+            values = [row['revenue'] or 0 for row in rows[:limit]]
+            others = sum(row['revenue'] or 0 for row in rows[limit:])
+            if others:
+                labels.append("Others")
+                values.append(others)
+            return labels, values
+
+        return self._cached("category_distribution", (period, limit), compute)
+
+    def sales_trend(self, days=30):
+        """(labels, totals) for the last ``days`` days, including days without sales"""
+        def compute():
+            end = datetime.now().replace(hour=0, minute=0, second=0, microsecond=0) + timedelta(days=1)
+            with self.db.get_connection() as conn:
+                series = bucket_series(conn, "day", end - timedelta(days=days), end)
+            return [label for label, _, _ in series], [total for _, total, _ in series]
+
+        return self._cached("sales_trend", days, compute)
@@ -10,6 +10,7 @@ from config import Colors
 from typing import List, Tuple
 import matplotlib.dates as mdates
 from datetime import datetime, timedelta
+from profiler import traced
 
 
 class ChartBase:
@@ -123,7 +124,7 @@ class EarningsBarChart(ctk.CTkFrame):
 class CategoryPieChart(ctk.CTkFrame):
     """Pie chart for category distribution"""
     
-    def __init__(self, parent, **kwargs):
+    def __init__(self, parent, data_provider=None, period="month", **kwargs):
         super().__init__(parent, fg_color=Colors.CARD_BG, corner_radius=15,
                         border_width=1, border_color=Colors.BORDER_LIGHT, **kwargs)
         
@@ -143,7 +144,12 @@ class CategoryPieChart(ctk.CTkFrame):
         self.chart_frame.pack(fill="both", expand=True, padx=20, pady=(5, 15))
         
         self.canvas = None
-        self.create_sample_chart()
+        self.data_provider = data_provider
+        self.period = period
+        if data_provider:
+            self.refresh()
+        else:
+            self.create_sample_chart()
     
     def create_sample_chart(self):
         """Create a sample pie chart"""
@@ -152,6 +158,14 @@ class CategoryPieChart(ctk.CTkFrame):
         
         self.update_chart(categories, values)
     
+    @traced()
+    def refresh(self):
+        """Redraw from the data provider (served from its cache when fresh)"""
+        labels, values = self.data_provider.category_distribution(self.period)
+        if not values:
+            labels, values = ["No sales yet"], [1]
+        self.update_chart(labels, values)
+    
     def update_chart(self, labels: List[str], values: List[float]):
         """Update chart with new data"""
         if self.canvas:
@@ -189,7 +203,7 @@ class CategoryPieChart(ctk.CTkFrame):
 class TrendLineChart(ctk.CTkFrame):
     """Line chart for showing trends over time"""
     
-    def __init__(self, parent, **kwargs):
+    def __init__(self, parent, data_provider=None, days=30, **kwargs):
         super().__init__(parent, fg_color=Colors.CARD_BG, corner_radius=15,
                         border_width=1, border_color=Colors.BORDER_LIGHT, **kwargs)
         
@@ -209,7 +223,18 @@ class TrendLineChart(ctk.CTkFrame):
         self.chart_frame.pack(fill="both", expand=True, padx=20, pady=(5, 15))
         
         self.canvas = None
-        self.create_sample_chart()
+        self.data_provider = data_provider
+        self.days = days
+        if data_provider:
+            self.refresh()
+        else:
+            self.create_sample_chart()
+    
+    @traced()
+    def refresh(self):
+        """Redraw from the data provider (served from its cache when fresh)"""
+        dates, values = self.data_provider.sales_trend(self.days)
+        self.update_chart(dates, values)
     
     def create_sample_chart(self):
         """Create a sample trend chart"""
@@ -66,14 +66,94 @@ class AppConfig:
     APP_NAME = "Saree Boutique Management System"
     VERSION = "1.0.0"
     COMPANY_NAME = "Ethnic Elegance Boutique"
-    DEFAULT_ADMIN_PIN = "1234"  # Change in production
-    DEFAULT_BILLING_PIN = "5678"  # Change in production
+    DEFAULT_ADMIN_PIN = "1234"  # Seeded hashed into the database; change with permissions.py
+    DEFAULT_BILLING_PIN = "5678"  # Seeded hashed into the database; change with permissions.py
+    PIN_SESSION_SECONDS = 300  # Elevation timeout: a verified PIN is not asked again for this long
+    
+    # Password hashing cost (python password_hashing.py --calibrate picks it per machine)
+    PASSWORD_SCRYPT_N = 2 ** 14
+    PASSWORD_SCRYPT_R = 8
+    PASSWORD_SCRYPT_P = 1
+    PASSWORD_PBKDF2_ITERATIONS = 600000  # only where hashlib has no scrypt
+    LOGIN_TARGET_MS = 250
     GST_RATE = 18  # 18% GST
     LOGO_PATH = os.path.join("assets", "logo.png") if os.path.exists(os.path.join("assets", "logo.png")) else None
     
     # Database
     DB_NAME = "boutique_management.db"
     
+    # Stock reservations held by open billing carts
+    RESERVATION_TTL_MINUTES = 30
+    RESERVATION_SWEEP_INTERVAL_MS = 60000
+    # Holds of the cart on screen are extended this often, well inside the TTL
+    RESERVATION_TOUCH_INTERVAL_MS = 300000
+    
+    # Returning-customer suggestions in billing
+    CUSTOMER_SUGGESTIONS = 8
+    # Bills per page in a customer's purchase history
+    CUSTOMER_HISTORY_PAGE_SIZE = 20
+    
+    # Dashboard chart data cache
+    CHART_CACHE_TTL_SECONDS = 300
+    
+    # Columnar sales export (python sales_export.py)
+    EXPORT_DIR = "exports"
+    EXPORT_CHUNK_SIZE = 20000
+    
+    # Archival of closed fiscal years (April-March)
+    FISCAL_YEAR_START_MONTH = 4
+    ARCHIVE_DIR = "archive"
+    ARCHIVE_KEEP_CLOSED_YEARS = 1
+    
+    # Idle-time database maintenance
+    MAINTENANCE_IDLE_SECONDS = 120
+    MAINTENANCE_CHECK_INTERVAL_MS = 30000
+    MAINTENANCE_OPTIMIZE_HOURS = 6
+    MAINTENANCE_ANALYZE_HOURS = 24
+    MAINTENANCE_VACUUM_HOURS = 24
+    MAINTENANCE_INTEGRITY_HOURS = 24 * 7
+    VACUUM_STEP_PAGES = 256
+    
+    # Rows per transaction when a schema migration backfills existing data
+    MIGRATION_BATCH_SIZE = 5000
+    
+    # Query instrumentation
+    SLOW_QUERY_MS = 100
+    QUERY_STATS_SAMPLES = 1000
+    QUERY_REPORT_FILE = "query_report.txt"
+    
+    # Opt-in UI profiling (BOUTIQUE_PROFILE=1 or Ctrl+Shift+P)
+    PROFILE_TRACE_FILE = "profile_trace.json"
+    PROFILE_MAX_EVENTS = 100000
+    PROFILE_OVERLAY_ACTIONS = 8
+    PROFILE_OVERLAY_REFRESH_MS = 500
+    
+    # Screens are built once per login and reused; slower switches are logged
+    FRAME_SWITCH_TARGET_MS = 100
+    
+    # Periodic UI updates share one timer; hidden widgets are rechecked this often
+    UI_HIDDEN_POLL_MS = 1000
+    
+    # Prefetching after login, once the dashboard is idle
+    WARMUP_DELAY_MS = 2000
+    WARMUP_QUIET_MS = 250
+    
+    # Local HTTP API for thin billing clients (python api_server.py)
+    API_HOST = "127.0.0.1"
+    API_PORT = 8765
+    API_READERS = 4
+    API_MAX_BODY_BYTES = 1_000_000
+    API_SESSION_SECONDS = 12 * 3600  # Tokens from POST /login last about a shift
+    
+    # Group commit of queued writes (Database.write / submit_write)
+    WRITE_GROUP_COMMIT_MS = 1
+    WRITE_MAX_BATCH = 64
+    
+    # Offline sale journal used while the shared database is unavailable
+    SALE_JOURNAL_FILE = "sale_journal.jsonl"
+    JOURNAL_REPLAY_BATCH = 500
+    JOURNAL_SYNC_INTERVAL_MS = 60000
+    
     # Paths
     INVOICE_DIR = "invoices"
     BACKUP_DIR = "backups"
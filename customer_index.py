@@ -0,0 +1,192 @@
+"""
+In-memory customer lookup for billing autocomplete
+Phone numbers and the words of customer names are kept in sorted lists,
+so every prefix is one contiguous run found with two binary searches. This
+answers a prefix lookup in microseconds for hundreds of thousands of
+customers, in a fraction of the memory a character-per-node trie would
+take. The index is loaded on first use and kept current by checkouts on
+this terminal; ``refresh`` picks up customers added elsewhere.
+
+Benchmark: python customer_index.py [--customers 200000] [--lookups 10000]
+"""
+import time
+import logging
+import threading
+from bisect import bisect_left, insort
+from config import AppConfig
+
+logger = logging.getLogger(__name__)
+
+
+class CustomerIndex:
+    """Phone-prefix and name-prefix lookup over the customers table"""
+
+    def __init__(self, db, limit=AppConfig.CUSTOMER_SUGGESTIONS):
+        self.db = db
+        self.limit = limit
+        self.loaded = False
+        self._lock = threading.Lock()
+        self._customers = {}
+        self._phones = []
+        self._names = []
+        self._last_id = 0
+
+    def load(self):
+        """Read every customer; later calls only pick up new ones"""
+        with self._lock:
+            if self.loaded:
+                return
+            started = time.perf_counter()
+            rows = self.db.execute_query("SELECT id, name, phone FROM customers", fetch_all=True)
+            self._build(rows)
+            self.loaded = True
+        logger.info(f"Customer index: {len(self._customers)} customers in "
+                    f"{(time.perf_counter() - started) * 1000:.0f} ms")
+
+    def _build(self, rows):
+        self._customers = {row['id']: (row['name'], row['phone']) for row in rows}
+        self._phones = sorted((phone, customer_id)
+                              for customer_id, (_, phone) in self._customers.items() if phone)
+        self._names = sorted((word, customer_id)
+                             for customer_id, (name, _) in self._customers.items()
+                             for word in self._words(name))
+        self._last_id = max(self._customers, default=0)
+
+    @staticmethod
+    def _words(name):
+        return set((name or "").lower().split())
+
+    def refresh(self):
+        """Add customers created since the index was loaded, e.g. by other terminals
+
+        Only new rows are picked up: the app never renames a customer or
+        changes their phone, and the table has no modification time to find
+        such edits by. Edits made outside the app show after a restart.
+        """
+        if not self.loaded:
+            return
+        rows = self.db.execute_query(
+            "SELECT id, name, phone FROM customers WHERE id > ? ORDER BY id", (self._last_id,), fetch_all=True
+        )
+        for row in rows:
+            self.upsert(row['id'], row['name'], row['phone'])
+
+    def upsert(self, customer_id, name, phone):
+        """Index a customer just written to the database"""
+        with self._lock:
+            if not self.loaded:
+                return
+            previous = self._customers.get(customer_id)
+            if previous == (name, phone):
+                return
+            if previous:
+                self._remove(customer_id, *previous)
+            self._customers[customer_id] = (name, phone)
+            if phone:
+                insort(self._phones, (phone, customer_id))
+            for word in self._words(name):
+                insort(self._names, (word, customer_id))
+            self._last_id = max(self._last_id, customer_id)
+
+    def _remove(self, customer_id, name, phone):
+        if phone:
+            self._phones.pop(bisect_left(self._phones, (phone, customer_id)))
+        for word in self._words(name):
+            self._names.pop(bisect_left(self._names, (word, customer_id)))
+
+    @staticmethod
+    def _prefix_run(keys, prefix):
+        """Ids of entries whose key starts with ``prefix``, in key order"""
+        start = bisect_left(keys, (prefix,))
+        for index in range(start, len(keys)):
+            key, customer_id = keys[index]
+            if not key.startswith(prefix):
+                return
+            yield customer_id
+
+    def _results(self, ids, limit, accept=None):
+        results, seen = [], set()
+        for customer_id in ids:
+            if customer_id in seen:
+                continue
+            seen.add(customer_id)
+            name, phone = self._customers[customer_id]
+            if accept and not accept(name):
+                continue
+            results.append({"id": customer_id, "name": name, "phone": phone})
+            if len(results) >= limit:
+                break
+        return results
+
+    def by_phone_prefix(self, prefix, limit=None):
+        """Customers whose phone starts with ``prefix``"""
+        prefix = prefix.strip()
+        if not prefix:
+            return []
+        self.load()
+        with self._lock:
+            return self._results(self._prefix_run(self._phones, prefix), limit or self.limit)
+
+    def by_name_prefix(self, text, limit=None):
+        """Customers with a name word starting with each word of ``text``"""
+        words = text.lower().split()
+        if not words:
+            return []
+        self.load()
+
+        def accept(name):
+            name_words = self._words(name)
+            return all(any(w.startswith(word) for w in name_words) for word in words[1:])
+
+        with self._lock:
+            return self._results(self._prefix_run(self._names, words[0]), limit or self.limit, accept)
+
+
+def benchmark(customers=200_000, lookups=10_000, seed=42):
+    """Index build time and prefix lookup latency for a synthetic customer table"""
+    import random
+
+    rng = random.Random(seed)
+    first = ["Aarav", "Priya", "Rohan", "Ananya", "Vikram", "Neha", "Arjun", "Kavya", "Ishaan", "Meera"]
+    last = ["Sharma", "Patel", "Iyer", "Reddy", "Khan", "Gupta", "Nair", "Das", "Joshi", "Mehta"]
+    rows = [{"id": i, "name": f"{rng.choice(first)} {rng.choice(last)}",
+             "phone": f"9{rng.randrange(10 ** 9):09d}"} for i in range(1, customers + 1)]
+
+    index = CustomerIndex(None)
+    started = time.perf_counter()
+    index._build(rows)
+    index.loaded = True
+    build_ms = (time.perf_counter() - started) * 1000
+
+    def timed(lookup, queries):
+        started = time.perf_counter()
+        for query in queries:
+            lookup(query)
+        return round((time.perf_counter() - started) * 1e6 / len(queries), 1)
+
+    phones = [rows[rng.randrange(customers)]["phone"][:rng.randint(3, 10)] for _ in range(lookups)]
+    names = [rng.choice(first)[:rng.randint(2, 4)] + " " + rng.choice(last)[:2] for _ in range(lookups)]
+    started = time.perf_counter()
+    for i in range(1000):
+        index.upsert(customers + i + 1, "New Customer", f"8{i:09d}")
+    upsert_us = round((time.perf_counter() - started) * 1e6 / 1000, 1)
+    return {
+        "customers": customers,
+        "build_ms": round(build_ms, 1),
+        "phone_lookup_us": timed(index.by_phone_prefix, phones),
+        "name_lookup_us": timed(index.by_name_prefix, names),
+        "upsert_us": upsert_us,
+    }
+
+
+if __name__ == "__main__":
+    import json
+    import argparse
+
+    parser = argparse.ArgumentParser(description="Benchmark customer prefix lookups")
+    parser.add_argument("--customers", type=int, default=200_000)
+    parser.add_argument("--lookups", type=int, default=10_000)
+    args = parser.parse_args()
+
+    logging.basicConfig(level=logging.WARNING, format="%(levelname)s %(message)s")
+    print(json.dumps(benchmark(args.customers, args.lookups), indent=2))
@@ -0,0 +1,73 @@
+"""
+Customer purchase history without the UI
+Lifetime metrics, paginated bills and RFM scores for one customer. Bills are
+read by customer id through the sales(customer_id, created_at) index, across
+the live database and archived fiscal years, instead of matching phone
+numbers with LIKE.
+"""
+import logging
+import threading
+from config import AppConfig
+from archive import SalesArchive
+from analytics import CustomerRFM
+
+logger = logging.getLogger(__name__)
+
+
+class CustomerService:
+    """Customer-360: profile, lifetime metrics, bill history and RFM segment"""
+
+    def __init__(self, db, page_size=AppConfig.CUSTOMER_HISTORY_PAGE_SIZE):
+        self.db = db
+        self.page_size = page_size
+        self.archive = SalesArchive(db)
+        # (newest sale id, scores) so RFM is recomputed only after new sales
+        self._rfm = None
+        self._rfm_lock = threading.Lock()
+
+    def get(self, customer_id):
+        row = self.db.run_query("customers.by_id", (customer_id,), fetch_one=True)
+        return dict(row) if row else None
+
+    def lifetime(self, customer_id):
+        """Bill count, spend, average bill and first/last purchase"""
+        with self.archive.historical_connection() as conn:
+            return dict(self.db.run_query_on(conn, "customers.lifetime", (customer_id,), fetch_one=True))
+
+    def bills(self, customer_id, page=0):
+        """One page of the customer's bills, newest first"""
+        with self.archive.historical_connection() as conn:
+            rows = self.db.run_query_on(
+                conn, "customers.history", (customer_id, self.page_size, page * self.page_size), fetch_all=True
+            )
+        return [dict(row) for row in rows]
+
+    def rfm_scores(self):
+        """Scores for every customer, recomputed only when sales were added"""
+        marker = self.db.execute_query("SELECT MAX(id) AS last_id FROM sales", fetch_one=True)['last_id']
+        with self._rfm_lock:
+            if self._rfm is None or self._rfm[0] != marker:
+                with self.archive.historical_connection() as conn:
+                    self._rfm = (marker, CustomerRFM.load(self.db, conn))
+            return self._rfm[1]
+
+    def rfm(self, customer_id):
+        """{'r', 'f', 'm', 'segment'} for one customer, or None without purchases"""
+        row = CustomerRFM.lookup(self.rfm_scores(), customer_id)
+        if row is None:
+            return None
+        return {
+            "r": int(row["r"]),
+            "f": int(row["f"]),
+            "m": int(row["m"]),
+            "segment": CustomerRFM.SEGMENTS[row["segment"]],
+        }
+
+    def profile(self, customer_id):
+        """Customer row, lifetime metrics and RFM in one dict; None if unknown"""
+        customer = self.get(customer_id)
+        if customer is None:
+            return None
+        customer["lifetime"] = self.lifetime(customer_id)
+        customer["rfm"] = self.rfm(customer_id)
+        return customer
@@ -0,0 +1,141 @@
+"""
+Customer purchase history window
+"""
+import json
+import customtkinter as ctk
+from tkinter import ttk, messagebox
+from config import Colors
+from utils import Formatters
+from customer_service import CustomerService
+
+
+class CustomerProfileWindow(ctk.CTkToplevel):
+    """Customer-360: lifetime metrics, RFM segment and paginated bill history"""
+
+    def __init__(self, parent, db, customer_id):
+        super().__init__(parent)
+        self.service = CustomerService(db)
+        self.customer_id = customer_id
+        self.page = 0
+
+        customer = self.service.profile(customer_id)
+        if customer is None:
+            self.destroy()
+            messagebox.showerror("Error", "Customer not found!")
+            return
+
+        self.title(f"Customer - {customer['name']}")
+        self.geometry("820x600")
+        self.transient(parent)
+
+        self.grid_columnconfigure(0, weight=1)
+        self.grid_rowconfigure(2, weight=1)
+
+        self.setup_header(customer)
+        self.setup_metrics(customer)
+        self.setup_history()
+        self.load_page(0)
+
+    def setup_header(self, customer):
+        header = ctk.CTkFrame(self, fg_color="transparent")
+        header.grid(row=0, column=0, sticky="ew", padx=20, pady=(20, 10))
+
+        ctk.CTkLabel(
+            header,
+            text=customer['name'],
+            font=ctk.CTkFont(size=22, weight="bold"),
+            text_color=Colors.TEXT_PRIMARY
+        ).pack(anchor="w")
+
+        contact = "  |  ".join(value for value in (customer['phone'], customer['email']) if value)
+        ctk.CTkLabel(
+            header,
+            text=contact or "No contact details",
+            font=ctk.CTkFont(size=13),
+            text_color=Colors.TEXT_SECONDARY
+        ).pack(anchor="w")
+
+    def setup_metrics(self, customer):
+        lifetime = customer['lifetime']
+        rfm = customer['rfm']
+        metrics = [
+            ("Bills", str(lifetime['bills'])),
+            ("Lifetime Spend", Formatters.format_currency(customer['total_purchases'] or 0)),
+            ("Average Bill", Formatters.format_currency(lifetime['average_bill'])),
+            ("First Purchase", Formatters.format_date(lifetime['first_purchase'])),
+            ("Last Purchase", Formatters.format_date(lifetime['last_purchase'])),
+            ("Segment", f"{rfm['segment']} (R{rfm['r']} F{rfm['f']} M{rfm['m']})" if rfm else "No purchases"),
+        ]
+
+        metrics_frame = ctk.CTkFrame(self, fg_color=Colors.CARD_BG, corner_radius=12,
+                                     border_width=1, border_color=Colors.BORDER_LIGHT)
+        metrics_frame.grid(row=1, column=0, sticky="ew", padx=20, pady=10)
+        for column, (label, value) in enumerate(metrics):
+            metrics_frame.grid_columnconfigure(column, weight=1)
+            ctk.CTkLabel(
+                metrics_frame,
+                text=label,
+                font=ctk.CTkFont(size=11),
+                text_color=Colors.TEXT_SECONDARY
+            ).grid(row=0, column=column, padx=10, pady=(10, 0), sticky="w")
+            ctk.CTkLabel(
+                metrics_frame,
+                text=value,
+                font=ctk.CTkFont(size=14, weight="bold"),
+                text_color=Colors.TEXT_PRIMARY
+            ).grid(row=1, column=column, padx=10, pady=(0, 10), sticky="w")
+
+    def setup_history(self):
+        history_frame = ctk.CTkFrame(self)
+        history_frame.grid(row=2, column=0, sticky="nsew", padx=20, pady=10)
+        history_frame.grid_columnconfigure(0, weight=1)
+        history_frame.grid_rowconfigure(0, weight=1)
+
+        columns = ("Invoice", "Date", "Items", "Discount", "Total", "Payment")
+        self.history_tree = ttk.Treeview(history_frame, columns=columns, show="headings", height=12)
+        for col in columns:
+            self.history_tree.heading(col, text=col, anchor="w")
+            self.history_tree.column(col, width=120, minwidth=60)
+        self.history_tree.grid(row=0, column=0, sticky="nsew")
+
+        scroll = ctk.CTkScrollbar(history_frame, command=self.history_tree.yview)
+        scroll.grid(row=0, column=1, sticky="ns")
+        self.history_tree.configure(yscrollcommand=scroll.set)
+
+        pager = ctk.CTkFrame(self, fg_color="transparent")
+        pager.grid(row=3, column=0, sticky="ew", padx=20, pady=(0, 20))
+
+        self.prev_btn = ctk.CTkButton(pager, text="◀ Newer", width=100,
+                                      command=lambda: self.load_page(self.page - 1))
+        self.prev_btn.pack(side="left")
+
+        self.page_label = ctk.CTkLabel(pager, text="", text_color=Colors.TEXT_SECONDARY)
+        self.page_label.pack(side="left", padx=15)
+
+        self.next_btn = ctk.CTkButton(pager, text="Older ▶", width=100,
+                                      command=lambda: self.load_page(self.page + 1))
+        self.next_btn.pack(side="left")
+
+    def load_page(self, page):
+        """Show one page of bills, newest first"""
+        bills = self.service.bills(self.customer_id, page)
+        if not bills and page > 0:
+            return
+        self.page = page
+
+        for item in self.history_tree.get_children():
+            self.history_tree.delete(item)
+        for bill in bills:
+            items = json.loads(bill['items']) if bill['items'] else []
+            self.history_tree.insert("", "end", values=(
+                bill['invoice_number'],
+                Formatters.format_date(bill['created_at']),
+                len(items),
+                Formatters.format_currency(bill['discount'] or 0),
+                Formatters.format_currency(bill['total_amount']),
+                bill['payment_method'] or ""
+            ))
+
+        self.page_label.configure(text=f"Page {page + 1}")
+        self.prev_btn.configure(state="normal" if page > 0 else "disabled")
+        self.next_btn.configure(state="normal" if len(bills) == self.service.page_size else "disabled")
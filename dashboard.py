@@ -5,14 +5,19 @@ Features: Greeting card, stat cards, charts, and elegant data tables
 import customtkinter as ctk
 from datetime import datetime
 import threading
-from tkinter import messagebox
 from config import Colors, AppConfig
 from utils import Formatters
 from ui_components import (
     StatCard, GreetingCard, ModernTable, 
-    StatusBadge, AnimatedButton
+    StatusBadge, AnimatedButton, ticks
 )
-from charts import EarningsBarChart, TrendLineChart
+from charts import EarningsBarChart, TrendLineChart, CategoryPieChart
+from analytics import period_range
+from sales_rollups import SalesRollups
+from report_service import ReportService
+from sales_series import period_series
+from profiler import traced
+from permissions import FRAME_PERMISSIONS
 
 
 class Dashboard(ctk.CTkFrame):
@@ -22,6 +27,9 @@ class Dashboard(ctk.CTkFrame):
         super().__init__(parent, fg_color=Colors.BG_LIGHT)
         self.parent = parent
         self.db = parent.db
+        self.rollups = SalesRollups(self.db)
+        self.reports = ReportService(self.db)
+        self.chart_data = parent.chart_data
         self.switch_frame = switch_frame_callback
         self.user_info = user_info
         
@@ -105,7 +113,7 @@ class Dashboard(ctk.CTkFrame):
             ("💰", "New Bill", lambda: self.switch_frame("billing"), False),
             ("📦", "Stock Management", lambda: self.verify_and_switch("stock"), False),
             ("📥", "New Stock", lambda: self.verify_and_switch("new_stock"), False),
-            ("🔍", "Global Search", lambda: self.switch_frame("search"), False),
+            ("🔍", "Global Search", lambda: self.verify_and_switch("search"), False),
             ("📈", "Reports", self.show_reports, False),
             ("⚙️", "Settings", self.show_settings, False),
         ]
@@ -143,7 +151,7 @@ class Dashboard(ctk.CTkFrame):
         
         role_label = ctk.CTkLabel(
             bottom_frame,
-            text="Administrator",
+            text="Administrator" if self.user_info.get('role') == 'admin' else "Staff",
             font=ctk.CTkFont(size=11),
             text_color=Colors.TEXT_SECONDARY
         )
@@ -218,7 +226,8 @@ class Dashboard(ctk.CTkFrame):
             text_color=Colors.PRIMARY
         )
         self.time_label.grid(row=0, column=1, sticky="e")
-        self.update_time()
+        # Checked every second so the minute turns over on time; redrawn only when it does
+        ticks.every(self.time_label, 1000, self.update_time, name="Dashboard.update_time")
     
     def setup_metrics_section(self):
         """Setup metric cards section"""
@@ -300,20 +309,42 @@ class Dashboard(ctk.CTkFrame):
         )
         header.pack(pady=(20, 15), padx=20, anchor="w")
         
-        # Sample top items
+        # Top categories this month
         self.top_items_container = ctk.CTkFrame(top_items_frame, fg_color="transparent")
         self.top_items_container.pack(fill="both", expand=True, padx=20, pady=(0, 20))
         
         self.populate_top_items()
+        
+        # Sales trend and category mix, fed by the shared chart data cache
+        self.trend_chart = TrendLineChart(analytics_container, data_provider=self.chart_data,
+                                          days=30, height=320)
+        self.trend_chart.grid(row=1, column=0, sticky="nsew", padx=(0, 12), pady=(25, 0))
+        
+        self.category_chart = CategoryPieChart(analytics_container, data_provider=self.chart_data,
+                                               period="month", height=320)
+        self.category_chart.grid(row=1, column=1, sticky="nsew", pady=(25, 0))
     
     def populate_top_items(self):
-        """Populate top selling items/categories"""
-        # Sample data (replace with real data)
+        """Populate top selling categories for the current month"""
+        for widget in self.top_items_container.winfo_children():
+            widget.destroy()
+        
+        start, end = period_range("month")
+        categories = self.rollups.top_categories(start, end, limit=4)
+        if not categories:
+            ctk.CTkLabel(
+                self.top_items_container,
+                text="No sales this month yet",
+                font=ctk.CTkFont(size=12),
+                text_color=Colors.TEXT_SECONDARY
+            ).pack(pady=20)
+            return
+        
+        icons = ["💎", "👗", "🎨", "✨"]
+        colors = [Colors.PRIMARY, Colors.SECONDARY, Colors.ACCENT, Colors.INFO]
         top_items = [
-            ("💎", "Silk Sarees", "₹45,280", Colors.PRIMARY),
-            ("👗", "Designer Wear", "₹32,150", Colors.SECONDARY),
-            ("🎨", "Cotton Collection", "₹28,940", Colors.ACCENT),
-            ("✨", "Accessories", "₹15,680", Colors.INFO),
+            (icons[i], row['category'], Formatters.format_currency(row['revenue']), colors[i])
+            for i, row in enumerate(categories)
         ]
         
         for icon, name, amount, color in top_items:
@@ -373,7 +404,7 @@ class Dashboard(ctk.CTkFrame):
         refresh_btn = AnimatedButton(
             header_container,
             text="🔄 Refresh",
-            command=self.load_metrics,
+            command=self.refresh,
             width=100,
             height=32,
             fg_color=Colors.BG_LIGHT,
@@ -401,55 +432,49 @@ class Dashboard(ctk.CTkFrame):
         """Load dashboard metrics asynchronously"""
         def load():
             try:
+                metrics = self.reports.dashboard_metrics(8)
+                
                 # Today's sales
-                sales_data = self.db.get_today_sales()
-                if sales_data:
-                    today_sales = sales_data['total_sales'] or 0
-                    trans_count = sales_data['transaction_count'] or 0
-                    
-                    self.after(0, self.todays_sales_card.update_value,
-                             Formatters.format_currency(today_sales),
-                             f"{trans_count} transactions")
-                    
-                    self.after(0, self.transactions_card.update_value,
-                             str(trans_count),
-                             "Completed today")
+                self.after(0, self.todays_sales_card.update_value,
+                         Formatters.format_currency(metrics['today_sales']),
+                         f"{metrics['today_transactions']} transactions")
                 
-                # Monthly revenue
-                with self.db.get_connection() as conn:
-                    monthly_data = conn.execute(
-                        """SELECT SUM(total_amount) as total, COUNT(*) as count
-                           FROM sales 
-                           WHERE strftime('%Y-%m', created_at) = strftime('%Y-%m', 'now')"""
-                    ).fetchone()
+                self.after(0, self.transactions_card.update_value,
+                         str(metrics['today_transactions']),
+                         "Completed today")
                 
-                if monthly_data:
-                    monthly_total = monthly_data['total'] or 0
-                    monthly_count = monthly_data['count'] or 0
-                    self.after(0, self.monthly_revenue_card.update_value,
-                             Formatters.format_currency(monthly_total),
-                             f"{monthly_count} transactions")
+                # Monthly revenue
+                self.after(0, self.monthly_revenue_card.update_value,
+                         Formatters.format_currency(metrics['month_total']),
+                         f"{metrics['month_transactions']} transactions")
                 
                 # Low stock items
-                low_stock = self.db.get_low_stock_items()
-                low_stock_count = len(low_stock) if low_stock else 0
-                
                 self.after(0, self.low_stock_card.update_value,
-                         str(low_stock_count),
+                         str(metrics['low_stock_count']),
                          "Items need restocking")
                 
                 # Recent transactions
-                recent_trans = self.db.get_recent_transactions(8)
-                self.after(0, self.update_recent_transactions, recent_trans)
+                self.after(0, self.update_recent_transactions, metrics['recent_transactions'])
                 
                 # Update chart with real data
                 self.after(0, self.update_earnings_chart)
                 
+                # Warm the chart cache off the UI thread, then redraw from it
+                self.chart_data.sales_trend(self.trend_chart.days)
+                self.chart_data.category_distribution(self.category_chart.period)
+                self.after(0, self.trend_chart.refresh)
+                self.after(0, self.category_chart.refresh)
+                
             except Exception as e:
                 print(f"Error loading metrics: {e}")
         
         threading.Thread(target=load, daemon=True).start()
     
+    def refresh(self):
+        """Reload cards, charts, recent transactions and top categories after the data changed"""
+        self.load_metrics()
+        self.populate_top_items()
+    
     def update_recent_transactions(self, transactions):
         """Update recent transactions table"""
         self.transactions_table.clear_rows()
@@ -479,52 +504,32 @@ class Dashboard(ctk.CTkFrame):
             
             self.transactions_table.add_row(row_data, row_colors)
     
+    @traced()
     def update_earnings_chart(self):
         """Update earnings chart with real data"""
         try:
-            # Get last 7 days of sales
+            # Last 7 days, one bar per calendar day including days without sales
             with self.db.get_connection() as conn:
-                query = """
-                    SELECT 
-                        DATE(created_at) as date,
-                        SUM(total_amount) as total
-                    FROM sales
-                    WHERE created_at >= date('now', '-7 days')
-                    GROUP BY DATE(created_at)
-                    ORDER BY date
-                """
-                results = conn.execute(query).fetchall()
-                
-                if results:
-                    dates = [datetime.strptime(r['date'], '%Y-%m-%d').strftime('%a') 
-                            for r in results]
-                    amounts = [r['total'] or 0 for r in results]
-                    
-                    # Pad with zeros if less than 7 days
-                    days = ['Mon', 'Tue', 'Wed', 'Thu', 'Fri', 'Sat', 'Sun']
-                    while len(dates) < 7:
-                        dates.insert(0, days[7-len(dates)-1])
-                        amounts.insert(0, 0)
-                    
-                    self.earnings_chart.update_chart(dates, amounts)
+                series = period_series(conn, "week")
+            
+            dates = [label for label, _ in series]
+            amounts = [total for _, total in series]
+            self.earnings_chart.update_chart(dates, amounts)
         except Exception as e:
             print(f"Error updating chart: {e}")
     
     def update_time(self):
         """Update time display"""
-        self.time_label.configure(text=datetime.now().strftime("%I:%M %p"))
-        self.after(60000, self.update_time)
+        text = datetime.now().strftime("%I:%M %p")
+        if self.time_label.cget("text") != text:
+            self.time_label.configure(text=text)
     
     def verify_and_switch(self, frame_name):
-        """Verify PIN before switching to protected frames"""
+        """Check the role, and the PIN if needed, before switching to protected frames"""
         from auth import PinDialog
         
-        if frame_name in ["stock", "new_stock"]:
-            pin_dialog = PinDialog(self.parent, "Enter Admin PIN",
-                                 self.parent.auth.verify_admin_pin)
-            if pin_dialog.show():
-                self.switch_frame(frame_name)
-        else:
+        permission = FRAME_PERMISSIONS.get(frame_name)
+        if permission is None or PinDialog.confirm(self.parent, self.parent.auth, permission, "Enter Admin PIN"):
             self.switch_frame(frame_name)
     
     def show_dashboard(self):
@@ -532,9 +537,9 @@ class Dashboard(ctk.CTkFrame):
         pass
     
     def show_reports(self):
-        """Show reports"""
-        messagebox.showinfo("Coming Soon", "Reports module will be available soon!")
+        """Show sales reports"""
+        self.verify_and_switch("reports")
     
     def show_settings(self):
-        """Show settings"""
-        messagebox.showinfo("Coming Soon", "Settings module will be available soon!")
\ No newline at end of file
+        """Show settings (backups, archiving, query statistics)"""
+        self.verify_and_switch("settings")
\ No newline at end of file
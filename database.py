@@ -1,40 +1,86 @@
 """
 Database setup and connection management
 """
+import os
 import sqlite3
+import time
 import logging
+import threading
 from datetime import datetime
 from contextlib import contextmanager
 import json
 from config import AppConfig
+from migrations import MigrationRunner
+from queries import QUERIES, QueryStats, query_key
+from profiler import profiler
+from write_queue import WriteQueue
 
 logger = logging.getLogger(__name__)
 
+# Set on threads doing deferrable work, whose connections do not count as activity
+_background = threading.local()
+
 class Database:
     def __init__(self, db_name=AppConfig.DB_NAME):
         self.db_name = db_name
+        self.query_stats = QueryStats()
+        self._write_queue = None
+        self._write_queue_lock = threading.Lock()
+        # Bumped by every transaction from this process that changed a row
+        self._local_writes = 0
+        # Connections open for foreground work, and when the last one closed
+        self._foreground_open = 0
+        self._foreground_lock = threading.Lock()
+        self.last_foreground_at = 0.0
         self.init_database()
     
     @contextmanager
     def get_connection(self):
         """Context manager for database connections"""
+        foreground = not getattr(_background, "active", False)
+        if foreground:
+            with self._foreground_lock:
+                self._foreground_open += 1
         conn = sqlite3.connect(self.db_name)
         conn.row_factory = sqlite3.Row
         try:
             yield conn
             conn.commit()
+            if conn.total_changes:
+                self._local_writes += 1
         except Exception as e:
             conn.rollback()
             logger.error(f"Database error: {e}")
             raise
         finally:
             conn.close()
+            if foreground:
+                with self._foreground_lock:
+                    self._foreground_open -= 1
+                    self.last_foreground_at = time.monotonic()
+    
+    @contextmanager
+    def background_work(self):
+        """Mark the current thread's queries as deferrable (see ``foreground_quiet``)"""
+        _background.active = True
+        try:
+            yield
+        finally:
+            _background.active = False
+    
+    def foreground_quiet(self, seconds):
+        """True when no foreground connection is open or was closed in the last ``seconds``"""
+        with self._foreground_lock:
+            return self._foreground_open == 0 and time.monotonic() - self.last_foreground_at >= seconds
     
     def init_database(self):
         """Initialize database with all required tables"""
         with self.get_connection() as conn:
             cursor = conn.cursor()
             
+            # Only takes effect on a new file; existing ones are converted by maintenance
+            cursor.execute('PRAGMA auto_vacuum = INCREMENTAL')
+            
             # Users table
             cursor.execute('''
                 CREATE TABLE IF NOT EXISTS users (
@@ -130,47 +176,109 @@ class Database:
             cursor.execute('CREATE INDEX IF NOT EXISTS idx_stock_category ON stock(category)')
             cursor.execute('CREATE INDEX IF NOT EXISTS idx_sales_date ON sales(created_at)')
             cursor.execute('CREATE INDEX IF NOT EXISTS idx_sales_invoice ON sales(invoice_number)')
+        
+        # Tables and indexes added since the original schema are versioned migrations
+        MigrationRunner(self).run()
+    
+    def data_version(self):
+        """Marker that changes whenever data may have changed, without a query
+        
+        Combines this process's committed writes with the modification times
+        of the database and WAL files, which other terminals' commits touch.
+        """
+        stamps = []
+        for path in (self.db_name, self.db_name + "-wal"):
+            try:
+                stamps.append(os.stat(path).st_mtime_ns)
+            except OSError:
+                stamps.append(None)
+        return (self._local_writes, *stamps)
     
-    def execute_query(self, query, params=None, fetch_one=False, fetch_all=False):
-        """Execute a query with optional fetching"""
+    def execute_query(self, query, params=None, fetch_one=False, fetch_all=False, name=None):
+        """Execute a query with optional fetching, timed under ``name`` or its SQL text"""
         with self.get_connection() as conn:
-            cursor = conn.cursor()
-            cursor.execute(query, params or ())
-            
-            if fetch_one:
-                return cursor.fetchone()
-            elif fetch_all:
-                return cursor.fetchall()
-            return cursor.lastrowid
+            return self.execute_on(conn, query, params, fetch_one, fetch_all, name)
+    
+    def execute_on(self, conn, query, params=None, fetch_one=False, fetch_all=False, name=None):
+        """Like ``execute_query`` but on the caller's connection and transaction"""
+        params = params or ()
+        cursor = conn.cursor()
+        started = time.perf_counter()
+        cursor.execute(query, params)
+        
+        if fetch_one:
+            result = cursor.fetchone()
+            rows = 1 if result else 0
+        elif fetch_all:
+            result = cursor.fetchall()
+            rows = len(result)
+        else:
+            result = cursor.lastrowid
+            rows = max(cursor.rowcount, 0)
+        
+        ended = time.perf_counter()
+        duration_ms = (ended - started) * 1000
+        key = name or query_key(query)
+        self.query_stats.record(key, duration_ms, rows)
+        profiler.record("sql", key, started, ended, rows=rows)
+        self.query_stats.check_slow(conn, key, query, params, duration_ms)
+        return result
+    
+    def run_query(self, name, params=None, fetch_one=False, fetch_all=False):
+        """Execute a query from the named registry in queries.py"""
+        return self.execute_query(QUERIES[name], params, fetch_one, fetch_all, name=name)
+    
+    def run_query_on(self, conn, name, params=None, fetch_one=False, fetch_all=False):
+        """Execute a registry query on the caller's connection and transaction"""
+        return self.execute_on(conn, QUERIES[name], params, fetch_one, fetch_all, name=name)
+    
+    def write_queue(self):
+        """The group commit queue, started on first use"""
+        with self._write_queue_lock:
+            if self._write_queue is None:
+                self._write_queue = WriteQueue(self)
+            return self._write_queue
+    
+    def submit_write(self, work):
+        """Queue ``work(conn)`` for group commit; returns a Future resolved after COMMIT"""
+        return self.write_queue().submit(work)
+    
+    def write(self, work, timeout=None):
+        """Run ``work(conn)`` through the group commit queue and wait until it is durable"""
+        future = self.submit_write(work)
+        try:
+            return future.result(timeout)
+        finally:
+            # The SQL ran on the writer thread; count it in the caller's open spans
+            profiler.add_time("sql", getattr(future, "sql_ms", 0.0))
+    
+    def close_writes(self):
+        """Commit queued writes and stop the writer thread"""
+        with self._write_queue_lock:
+            if self._write_queue is not None:
+                self._write_queue.stop()
+                self._write_queue = None
+    
+    def dump_query_report(self, path=None):
+        """Log per-query statistics and optionally write them to a file"""
+        report = self.query_stats.format_report()
+        logger.info(f"Query statistics:\n{report}")
+        if path:
+            with open(path, "w", encoding="utf-8") as f:
+                f.write(report + "\n")
+        return report
     
     def get_low_stock_items(self, threshold=5):
         """Get items with stock below threshold"""
-        query = '''
-            SELECT * FROM stock 
-            WHERE quantity <= min_stock_level 
-            AND is_active = 1
-            ORDER BY quantity ASC
-        '''
-        return self.execute_query(query, fetch_all=True)
+        return self.run_query("stock.low_stock", fetch_all=True)
     
     def get_today_sales(self):
         """Get total sales for today"""
-        query = '''
-            SELECT SUM(total_amount) as total_sales, COUNT(*) as transaction_count
-            FROM sales 
-            WHERE DATE(created_at) = DATE('now')
-        '''
-        return self.execute_query(query, fetch_one=True)
+        return self.run_query("sales.today_totals", fetch_one=True)
     
     def get_recent_transactions(self, limit=10):
         """Get recent sales transactions"""
-        query = '''
-            SELECT invoice_number, customer_name, total_amount, created_at
-            FROM sales 
-            ORDER BY created_at DESC 
-            LIMIT ?
-        '''
-        return self.execute_query(query, (limit,), fetch_all=True)
+        return self.run_query("sales.recent", (limit,), fetch_all=True)
 
 # Global database instance
 db = Database()
\ No newline at end of file
@@ -1481,13 +1481,21 @@ class BoutiqueManagementApp(ctk.CTk):
             text_color=Config.COLOR_SECONDARY
         ).pack(pady=20, padx=20, anchor="w")
         
+        # Today's and this month's figures come from a single pass over the month
         today = datetime.now().strftime("%Y-%m-%d")
-        today_data = self.db.execute_query(
-            """SELECT COUNT(*), COALESCE(SUM(final_amount), 0), COALESCE(SUM(total_amount), 0),
-               COALESCE(SUM(discount_amount), 0), COALESCE(SUM(gst_amount), 0)
-               FROM sales WHERE DATE(sale_date) = ?""",
-            (today,)
+        month_start = datetime.now().strftime("%Y-%m-01")
+        period_data = self.db.execute_query(
+            """SELECT SUM(DATE(sale_date) = :today),
+               COALESCE(SUM(CASE WHEN DATE(sale_date) = :today THEN final_amount END), 0),
+               COALESCE(SUM(CASE WHEN DATE(sale_date) = :today THEN total_amount END), 0),
+               COALESCE(SUM(CASE WHEN DATE(sale_date) = :today THEN discount_amount END), 0),
+               COALESCE(SUM(CASE WHEN DATE(sale_date) = :today THEN gst_amount END), 0),
+               COUNT(*), COALESCE(SUM(final_amount), 0)
+               FROM sales WHERE sale_date >= :month_start""",
+            {"today": today, "month_start": month_start}
         )[0]
+        today_data = (period_data[0] or 0,) + tuple(period_data[1:5])
+        month_data = period_data[5:7]
         
         stats_text = f"""
         Total Bills: {today_data[0]}
@@ -1516,13 +1524,6 @@ class BoutiqueManagementApp(ctk.CTk):
             text_color=Config.COLOR_SECONDARY
         ).pack(pady=20, padx=20, anchor="w")
         
-        month_start = datetime.now().strftime("%Y-%m-01")
-        month_data = self.db.execute_query(
-            """SELECT COUNT(*), COALESCE(SUM(final_amount), 0)
-               FROM sales WHERE DATE(sale_date) >= ?""",
-            (month_start,)
-        )[0]
-        
         month_stats_text = f"""
         Total Bills: {month_data[0]}
         Total Sales: ₹{month_data[1]:,.2f}
@@ -0,0 +1,197 @@
+"""
+Chart Renderer Module
+Renders report charts to PNG images with the Agg backend on a background
+thread and keeps them in an on-disk LRU cache keyed by chart content
+"""
+
+import hashlib
+import io
+import json
+import os
+import threading
+from concurrent.futures import ThreadPoolExecutor
+from typing import Callable, Dict, List, Optional, Tuple
+
+from matplotlib.figure import Figure
+from matplotlib.backends.backend_agg import FigureCanvasAgg
+from matplotlib.ticker import FuncFormatter
+import config
+
+
+class ChartImageCache:
+    """On-disk LRU cache of rendered chart images (recency tracked by mtime)"""
+
+    def __init__(self, directory: str = config.CHART_CACHE_DIR,
+                 max_bytes: int = config.CHART_CACHE_MAX_MB * 1024 * 1024):
+        self.directory = directory
+        self.max_bytes = max_bytes
+        self._lock = threading.Lock()
+        os.makedirs(directory, exist_ok=True)
+
+    @staticmethod
+    def make_key(chart_type: str, period: str, data: List[Tuple], size: Tuple) -> str:
+        """Stable key for a chart type, period, pixel size and data hash"""
+        payload = json.dumps([chart_type, period, list(size), data],
+                             default=str, separators=(",", ":"))
+        digest = hashlib.sha256(payload.encode("utf-8")).hexdigest()[:24]
+        return f"{chart_type}-{digest}"
+
+    def _path(self, key: str) -> str:
+        return os.path.join(self.directory, f"{key}.png")
+
+    def get(self, key: str) -> Optional[str]:
+        """Path of a cached image, marking it as recently used"""
+        path = self._path(key)
+        try:
+            os.utime(path)
+        except FileNotFoundError:
+            return None
+        return path
+
+    def put(self, key: str, png: bytes) -> str:
+        """Store an image and evict the least recently used ones over the size limit"""
+        path = self._path(key)
+        tmp_path = f"{path}.{threading.get_ident()}.tmp"
+        with open(tmp_path, "wb") as f:
+            f.write(png)
+        os.replace(tmp_path, path)
+        self._evict()
+        return path
+
+    def _evict(self):
+        with self._lock:
+            entries = []
+            for name in os.listdir(self.directory):
+                if not name.endswith(".png"):
+                    continue
+                path = os.path.join(self.directory, name)
+                try:
+                    stat = os.stat(path)
+                except FileNotFoundError:
+                    continue
+                entries.append((stat.st_mtime, stat.st_size, path))
+
+            total = sum(size for _, size, _ in entries)
+            for _, size, path in sorted(entries):
+                if total <= self.max_bytes:
+                    break
+                try:
+                    os.remove(path)
+                except FileNotFoundError:
+                    pass
+                total -= size
+
+
+def render_earnings_bar(data: List[Tuple], size: Tuple[int, int]) -> bytes:
+    """
+    Render the earnings bar chart to PNG bytes
+
+    Args:
+        data: List of (label, value) tuples
+        size: Image size in pixels (width, height)
+    """
+    dpi = 100
+    fig = Figure(figsize=(size[0] / dpi, size[1] / dpi), facecolor=config.COLOR_BG_CARD, dpi=dpi)
+    FigureCanvasAgg(fig)
+    ax = fig.add_subplot(111)
+
+    if not data:
+        ax.text(0.5, 0.5, 'No data available',
+               horizontalalignment='center',
+               verticalalignment='center',
+               fontsize=14,
+               color=config.COLOR_TEXT_SECONDARY)
+        ax.set_xlim(0, 1)
+        ax.set_ylim(0, 1)
+        ax.axis('off')
+    else:
+        labels = [item[0] for item in data]
+        values = [item[1] if item[1] else 0 for item in data]
+
+        bars = ax.bar(range(len(labels)), values,
+                     color=config.COLOR_PRIMARY,
+                     alpha=0.8,
+                     edgecolor=config.COLOR_PRIMARY_DARK,
+                     linewidth=1)
+
+        # Alternate colors for visual interest
+        for i, bar in enumerate(bars):
+            bar.set_color(config.COLOR_PRIMARY if i % 2 == 0 else config.COLOR_PRIMARY_LIGHT)
+
+        ax.set_xticks(range(len(labels)))
+        ax.set_xticklabels(labels, rotation=0, fontsize=9,
+                          color=config.COLOR_TEXT_SECONDARY)
+        ax.set_ylabel('Amount (₹)', fontsize=10,
+                     color=config.COLOR_TEXT_SECONDARY)
+        ax.yaxis.set_major_formatter(FuncFormatter(lambda x, p: f'₹{int(x):,}'))
+
+        ax.grid(axis='y', alpha=0.3, linestyle='--', linewidth=0.5)
+        ax.set_axisbelow(True)
+
+        ax.spines['top'].set_visible(False)
+        ax.spines['right'].set_visible(False)
+        ax.spines['left'].set_color(config.COLOR_BORDER)
+        ax.spines['bottom'].set_color(config.COLOR_BORDER)
+        ax.tick_params(colors=config.COLOR_TEXT_SECONDARY, labelsize=9)
+
+    fig.tight_layout()
+
+    buffer = io.BytesIO()
+    fig.savefig(buffer, format="png", facecolor=fig.get_facecolor())
+    return buffer.getvalue()
+
+
+CHART_RENDERERS: Dict[str, Callable[[List[Tuple], Tuple[int, int]], bytes]] = {
+    "earnings_bar": render_earnings_bar,
+}
+
+
+class ChartRenderer:
+    """Serve chart images from the cache, rendering misses on a worker thread"""
+
+    def __init__(self, cache: Optional[ChartImageCache] = None):
+        self.cache = cache or ChartImageCache()
+        # One worker: matplotlib's font and text caches are not thread-safe
+        self._executor = ThreadPoolExecutor(max_workers=1, thread_name_prefix="chart-render")
+        self._pending = {}
+        self._lock = threading.Lock()
+
+    def request(self, chart_type: str, period: str, data: List[Tuple],
+                size: Tuple[int, int], on_ready: Callable[[str], None]) -> Optional[str]:
+        """
+        Get a chart image
+
+        Returns the cached image path immediately when available. Otherwise
+        schedules a render and returns None; ``on_ready(path)`` is then called
+        from the worker thread once the image is on disk.
+        """
+        key = ChartImageCache.make_key(chart_type, period, data, size)
+        path = self.cache.get(key)
+        if path:
+            return path
+
+        with self._lock:
+            future = self._pending.get(key)
+            if future is None:
+                future = self._executor.submit(self._render, key, chart_type, data, size)
+                self._pending[key] = future
+        future.add_done_callback(lambda f: f.exception() is None and on_ready(f.result()))
+        return None
+
+    def _render(self, key: str, chart_type: str, data: List[Tuple], size: Tuple[int, int]) -> str:
+        try:
+            return self.cache.put(key, CHART_RENDERERS[chart_type](data, size))
+        finally:
+            with self._lock:
+                self._pending.pop(key, None)
+
+
+_renderer: Optional[ChartRenderer] = None
+
+
+def get_chart_renderer() -> ChartRenderer:
+    """Shared renderer, so every chart uses the same cache and worker"""
+    global _renderer
+    if _renderer is None:
+        _renderer = ChartRenderer()
+    return _renderer
@@ -3,19 +3,19 @@ Charts Module
 Data visualization components using matplotlib for earnings and analytics
 """
 
-import matplotlib
-matplotlib.use('Agg')  # Use non-interactive backend
-import matplotlib.pyplot as plt
-from matplotlib.backends.backend_tkagg import FigureCanvasTkAgg
-from matplotlib.figure import Figure
+import tkinter
 import customtkinter as ctk
+from PIL import Image
 from typing import List, Tuple
 import config
+from chart_renderer import get_chart_renderer
 
 
 class EarningsBarChart(ctk.CTkFrame):
     """Bar chart for earnings visualization"""
     
+    CHART_SIZE = (800, 400)  # pixels
+    
     def __init__(self, parent, data: List[Tuple], period: str = "Today", **kwargs):
         """
         Create earnings bar chart
@@ -56,77 +56,38 @@ class EarningsBarChart(ctk.CTkFrame):
         chart_frame.pack(fill="both", expand=True, padx=config.SPACING_LG, 
                         pady=(0, config.SPACING_LG))
         
-        # Create matplotlib figure
-        self._create_chart(chart_frame, data)
+        # Chart image, rendered off the UI thread and cached on disk
+        self.chart_label = ctk.CTkLabel(
+            chart_frame,
+            text="Loading chart...",
+            font=ctk.CTkFont(size=config.FONT_SIZE_SMALL),
+            text_color=config.COLOR_TEXT_SECONDARY
+        )
+        self.chart_label.pack(fill="both", expand=True)
+        self._chart_image = None
+        
+        path = get_chart_renderer().request(
+            "earnings_bar", period, data, self.CHART_SIZE, self._on_chart_ready
+        )
+        if path:
+            self._show_chart(path)
     
-    def _create_chart(self, parent, data: List[Tuple]):
-        """Create the bar chart"""
-        # Create figure with transparent background
-        fig = Figure(figsize=(8, 4), facecolor=config.COLOR_BG_CARD, dpi=100)
-        ax = fig.add_subplot(111)
-        
-        if not data or len(data) == 0:
-            # No data - show message
-            ax.text(0.5, 0.5, 'No data available', 
-                   horizontalalignment='center',
-                   verticalalignment='center',
-                   fontsize=14,
-                   color=config.COLOR_TEXT_SECONDARY)
-            ax.set_xlim(0, 1)
-            ax.set_ylim(0, 1)
-            ax.axis('off')
-        else:
-            # Extract labels and values
-            labels = [item[0] for item in data]
-            values = [item[1] if item[1] else 0 for item in data]
-            
-            # Create bars with purple gradient
-            bars = ax.bar(range(len(labels)), values, 
-                         color=config.COLOR_PRIMARY,
-                         alpha=0.8,
-                         edgecolor=config.COLOR_PRIMARY_DARK,
-                         linewidth=1)
-            
-            # Gradient effect on bars
-            for i, bar in enumerate(bars):
-                # Alternate colors for visual interest
-                if i % 2 == 0:
-                    bar.set_color(config.COLOR_PRIMARY)
-                else:
-                    bar.set_color(config.COLOR_PRIMARY_LIGHT)
-            
-            # Customize axes
-            ax.set_xticks(range(len(labels)))
-            ax.set_xticklabels(labels, rotation=0, fontsize=9, 
-                              color=config.COLOR_TEXT_SECONDARY)
-            ax.set_ylabel('Amount (₹)', fontsize=10, 
-                         color=config.COLOR_TEXT_SECONDARY)
-            
-            # Format y-axis as currency
-            ax.yaxis.set_major_formatter(plt.FuncFormatter(
-                lambda x, p: f'₹{int(x):,}'
-            ))
-            
-            # Grid
-            ax.grid(axis='y', alpha=0.3, linestyle='--', linewidth=0.5)
-            ax.set_axisbelow(True)
-            
-            # Remove top and right spines
-            ax.spines['top'].set_visible(False)
-            ax.spines['right'].set_visible(False)
-            ax.spines['left'].set_color(config.COLOR_BORDER)
-            ax.spines['bottom'].set_color(config.COLOR_BORDER)
-            
-            # Tick colors
-            ax.tick_params(colors=config.COLOR_TEXT_SECONDARY, labelsize=9)
-        
-        # Tight layout
-        fig.tight_layout()
-        
-        # Embed in tkinter
-        canvas = FigureCanvasTkAgg(fig, parent)
-        canvas.draw()
-        canvas.get_tk_widget().pack(fill="both", expand=True)
+    def _on_chart_ready(self, path: str):
+        """Called on the render thread; hand the image back to the Tk thread"""
+        try:
+            self.after(0, self._show_chart, path)
+        except (RuntimeError, tkinter.TclError):
+            pass  # Widget was destroyed before the render finished
+    
+    def _show_chart(self, path: str):
+        """Display a rendered chart image"""
+        if not self.winfo_exists():
+            return
+        with Image.open(path) as img:
+            img.load()
+            image = img.copy()
+        self._chart_image = ctk.CTkImage(light_image=image, size=image.size)
+        self.chart_label.configure(image=self._chart_image, text="")
 
 
 class CategoryList(ctk.CTkFrame):
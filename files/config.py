@@ -135,6 +135,8 @@ ANIMATION_SLOW = 500
 # File Paths
 INVOICES_DIR = "invoices"
 LOGO_PATH = "logo.png"  # Optional logo file
+CHART_CACHE_DIR = "chart_cache"  # Rendered chart images (LRU)
+CHART_CACHE_MAX_MB = 50
 
 # Settings Keys
 SETTING_SHOP_NAME = "shop_name"
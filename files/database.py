@@ -3,11 +3,17 @@ Database Manager Module
 Handles all SQLite database operations for the boutique management system
 """
 
+import os
+import sys
 import sqlite3
 import hashlib
-from typing import Optional, List, Tuple, Any
+from typing import Optional, List, Tuple, Any, Dict
 import config
 
+# Shared with the main application one directory up; appended so local modules win
+sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+from sales_series import period_series
+
 
 class DatabaseManager:
     """Manages database connections and operations"""
@@ -22,6 +28,7 @@ class DatabaseManager:
         self.db_name = db_name
         self.conn = None
         self.cursor = None
+        self._settings_cache: Optional[Dict[str, str]] = None
         self.initialize_database()
     
     def connect(self):
@@ -110,6 +117,11 @@ class DatabaseManager:
             )
         ''')
         
+        # Covering index for time-bucketed revenue series
+        self.cursor.execute(
+            "CREATE INDEX IF NOT EXISTS idx_sales_date_amount ON sales(sale_date, final_amount)"
+        )
+        
         # Create default admin user
         try:
             password_hash = hashlib.sha256(config.DEFAULT_PASSWORD.encode()).hexdigest()
@@ -183,9 +195,20 @@ class DatabaseManager:
         self.disconnect()
         return last_id
     
+    def _load_settings(self) -> Dict[str, str]:
+        """Load the whole settings table into memory on first use"""
+        if self._settings_cache is None:
+            rows = self.execute_query("SELECT setting_key, setting_value FROM settings")
+            self._settings_cache = dict(rows)
+        return self._settings_cache
+    
+    def invalidate_settings(self):
+        """Drop cached settings so the next read reloads them"""
+        self._settings_cache = None
+    
     def get_setting(self, key: str) -> Optional[str]:
         """
-        Get a setting value by key
+        Get a setting value by key (served from the in-memory settings map)
         
         Args:
             key: Setting key
@@ -193,11 +216,20 @@ class DatabaseManager:
         Returns:
             Setting value or None if not found
         """
-        result = self.execute_query(
-            "SELECT setting_value FROM settings WHERE setting_key = ?",
-            (key,)
-        )
-        return result[0][0] if result else None
+        return self._load_settings().get(key)
+    
+    def get_settings(self, keys: List[str]) -> Dict[str, Optional[str]]:
+        """
+        Get several settings at once
+        
+        Args:
+            keys: Setting keys
+            
+        Returns:
+            Dictionary of key to value (None if not found)
+        """
+        settings = self._load_settings()
+        return {key: settings.get(key) for key in keys}
     
     def update_setting(self, key: str, value: str):
         """
@@ -211,6 +243,7 @@ class DatabaseManager:
             "UPDATE settings SET setting_value = ? WHERE setting_key = ?",
             (value, key)
         )
+        self.invalidate_settings()
     
     def verify_user(self, username: str, password: str) -> Optional[dict]:
         """
@@ -326,31 +359,13 @@ class DatabaseManager:
             period: "today", "week", or "month"
             
         Returns:
-            List of (date, amount) tuples
+            List of (label, amount) tuples with one entry per hour (today)
+            or day (week, month), including periods without sales
         """
-        from datetime import datetime, timedelta
-        
-        if period == "today":
-            today = datetime.now().strftime("%Y-%m-%d")
-            return self.execute_query(
-                """SELECT strftime('%H:00', sale_date) as hour, SUM(final_amount)
-                   FROM sales WHERE DATE(sale_date) = ?
-                   GROUP BY hour ORDER BY hour""",
-                (today,)
-            )
-        elif period == "week":
-            week_ago = (datetime.now() - timedelta(days=7)).strftime("%Y-%m-%d")
-            return self.execute_query(
-                """SELECT DATE(sale_date) as day, SUM(final_amount)
-                   FROM sales WHERE DATE(sale_date) >= ?
-                   GROUP BY day ORDER BY day""",
-                (week_ago,)
-            )
-        else:  # month
-            month_start = datetime.now().strftime("%Y-%m-01")
-            return self.execute_query(
-                """SELECT DATE(sale_date) as day, SUM(final_amount)
-                   FROM sales WHERE DATE(sale_date) >= ?
-                   GROUP BY day ORDER BY day""",
-                (month_start,)
-            )
+        self.connect()
+        series = period_series(
+            self.conn, period,
+            time_column="sale_date", value_column="final_amount"
+        )
+        self.disconnect()
+        return series
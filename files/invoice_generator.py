@@ -54,11 +54,15 @@ class InvoiceGenerator:
         )
         
         # Get shop details
-        shop_name = self.db.get_setting(config.SETTING_SHOP_NAME)
-        shop_address = self.db.get_setting(config.SETTING_SHOP_ADDRESS)
-        shop_phone = self.db.get_setting(config.SETTING_SHOP_PHONE)
-        shop_email = self.db.get_setting(config.SETTING_SHOP_EMAIL)
-        gst_number = self.db.get_setting(config.SETTING_GST_NUMBER)
+        shop = self.db.get_settings([
+            config.SETTING_SHOP_NAME, config.SETTING_SHOP_ADDRESS, config.SETTING_SHOP_PHONE,
+            config.SETTING_SHOP_EMAIL, config.SETTING_GST_NUMBER
+        ])
+        shop_name = shop[config.SETTING_SHOP_NAME]
+        shop_address = shop[config.SETTING_SHOP_ADDRESS]
+        shop_phone = shop[config.SETTING_SHOP_PHONE]
+        shop_email = shop[config.SETTING_SHOP_EMAIL]
+        gst_number = shop[config.SETTING_GST_NUMBER]
         
         # Create PDF
         bill_number = sale_data[0]
@@ -0,0 +1,187 @@
+"""
+Deterministic synthetic data for the root schema
+Builds stock, customers, sales (with their items JSON), sale_items and the
+daily aggregates for a given scale. The same seed and end date always give
+the same database; rows are written with executemany in one transaction.
+
+Usage: python generate_data.py --scale 100k [--db bench_100k.db] [--seed 42]
+"""
+import os
+import json
+import time
+import random
+import logging
+from datetime import datetime, timedelta
+from sales_rollups import rebuild_rollups
+
+logger = logging.getLogger(__name__)
+
+SCALES = {
+    "10k": 10_000,
+    "100k": 100_000,
+    "1m": 1_000_000,
+}
+
+CATEGORIES = ["Silk Saree", "Cotton Saree", "Designer Saree", "Lehenga", "Salwar Suit",
+              "Kurti", "Dupatta", "Blouse", "Accessories"]
+MATERIALS = ["Silk", "Cotton", "Georgette", "Chiffon", "Linen", "Banarasi", "Crepe"]
+COLORS = ["Red", "Maroon", "Green", "Blue", "Pink", "Yellow", "Gold", "Black", "Cream"]
+FIRST_NAMES = ["Aarti", "Priya", "Sneha", "Kavya", "Meera", "Anjali", "Pooja", "Neha",
+               "Divya", "Lakshmi", "Ritu", "Sunita", "Swati", "Rekha", "Nisha"]
+LAST_NAMES = ["Sharma", "Patil", "Iyer", "Reddy", "Kulkarni", "Deshmukh", "Nair",
+              "Joshi", "Gupta", "Mehta", "Rao", "Shah"]
+
+CHUNK_SIZE = 50_000
+
+STOCK_INSERT = '''
+    INSERT INTO stock (id, sku, name, category, material, color, quantity,
+                       purchase_price, selling_price, min_stock_level)
+    VALUES (:id, :sku, :name, :category, :material, :color, :quantity,
+            :purchase_price, :selling_price, :min_stock_level)
+'''
+
+CUSTOMER_INSERT = '''
+    INSERT INTO customers (id, name, phone, email, total_purchases, last_purchase_date)
+    VALUES (?, ?, ?, ?, ?, ?)
+'''
+
+SALE_INSERT = '''
+    INSERT INTO sales (
+        id, invoice_number, customer_id, customer_name, customer_phone,
+        items, subtotal, discount, gst_amount, total_amount,
+        payment_method, payment_status, sold_by, created_at
+    ) VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?)
+'''
+
+SALE_ITEM_INSERT = '''
+    INSERT INTO sale_items (
+        sale_id, stock_id, sku, item_name, category,
+        quantity, unit_price, total_price
+    ) VALUES (?, ?, ?, ?, ?, ?, ?, ?)
+'''
+
+
+def default_end_date():
+    """Midnight after today, so today's dashboard figures have data"""
+    return datetime.now().replace(hour=0, minute=0, second=0, microsecond=0) + timedelta(days=1)
+
+
+def generate(db_path, sales=10_000, seed=42, end_date=None, days=365,
+             stock_items=None, customers=None, gst_rate=5.0):
+    """Create ``db_path`` from scratch with ``sales`` synthetic sales; returns row counts"""
+    from database import Database
+
+    if os.path.exists(db_path):
+        os.remove(db_path)
+    db = Database(db_path)
+    rng = random.Random(seed)
+    end = end_date or default_end_date()
+    start = end - timedelta(days=days)
+    span = int((end - start).total_seconds())
+    stock_items = stock_items or max(200, min(sales // 50, 20_000))
+    customers = customers or max(100, sales // 8)
+    started = time.perf_counter()
+
+    stock = []
+    for i in range(1, stock_items + 1):
+        category = rng.choice(CATEGORIES)
+        purchase = float(rng.randrange(300, 15000, 50))
+        stock.append({
+            "id": i,
+            "sku": f"SKU-{i:06d}",
+            "name": f"{rng.choice(COLORS)} {rng.choice(MATERIALS)} {category} {i}",
+            "category": category,
+            "material": rng.choice(MATERIALS),
+            "color": rng.choice(COLORS),
+            "quantity": rng.randint(0, 40),
+            "purchase_price": purchase,
+            "selling_price": round(purchase * rng.uniform(1.3, 1.9), 0),
+            "min_stock_level": 5,
+        })
+
+    customer_rows = []
+    for i in range(1, customers + 1):
+        name = f"{rng.choice(FIRST_NAMES)} {rng.choice(LAST_NAMES)}"
+        customer_rows.append([i, name, f"9{i:09d}", f"customer{i}@example.com", 0.0, None])
+
+    with db.get_connection() as conn:
+        conn.execute("BEGIN")
+        conn.executemany(STOCK_INSERT, stock)
+
+        # Timestamps are evenly spread (with jitter) so every day of the range has sales
+        step = span / sales
+        sale_rows, item_rows, item_count = [], [], 0
+        for sale_id in range(1, sales + 1):
+            created = start + timedelta(seconds=min(span - 1, int(step * (sale_id - 1) + rng.random() * step)))
+            cart = []
+            for _ in range(rng.choices((1, 2, 3, 4, 5), weights=(40, 30, 15, 10, 5))[0]):
+                item = stock[rng.randrange(stock_items)]
+                quantity = rng.choices((1, 2, 3), weights=(80, 15, 5))[0]
+                cart.append({
+                    "id": item["id"], "sku": item["sku"], "name": item["name"],
+                    "category": item["category"], "material": item["material"],
+                    "color": item["color"], "price": item["selling_price"],
+                    "quantity": quantity, "total": item["selling_price"] * quantity,
+                })
+            subtotal = sum(line["total"] for line in cart)
+            discount = float(rng.choice((0, 0, 0, 100, 250, 500))) if subtotal > 1000 else 0.0
+            gst_amount = (subtotal - discount) * gst_rate / 100
+            total = subtotal - discount + gst_amount
+
+            customer = None
+            if rng.random() < 0.6:
+                customer = customer_rows[rng.randrange(customers)]
+                customer[4] += total
+                customer[5] = created.isoformat()
+
+            sale_rows.append((
+                sale_id, f"INV-{created:%Y%m%d}-{sale_id:07d}",
+                customer[0] if customer else None,
+                customer[1] if customer else "Walk-in Customer",
+                customer[2] if customer else None,
+                json.dumps(cart), subtotal, discount, gst_amount, total,
+                rng.choice(("Cash", "Cash", "UPI", "Card")), "Completed", "admin", created.isoformat(),
+            ))
+            item_rows.extend(
+                (sale_id, line["id"], line["sku"], line["name"], line["category"],
+                 line["quantity"], line["price"], line["total"])
+                for line in cart
+            )
+
+            # Flush in chunks so 1M sales never sit in memory at once (same transaction)
+            if len(sale_rows) >= CHUNK_SIZE or sale_id == sales:
+                conn.executemany(SALE_INSERT, sale_rows)
+                conn.executemany(SALE_ITEM_INSERT, item_rows)
+                item_count += len(item_rows)
+                sale_rows, item_rows = [], []
+
+        conn.executemany(CUSTOMER_INSERT, customer_rows)
+        rebuild_rollups(conn)
+    with db.get_connection() as conn:
+        conn.execute("ANALYZE")
+
+    counts = {
+        "stock": stock_items,
+        "customers": customers,
+        "sales": sales,
+        "sale_items": item_count,
+        "seconds": round(time.perf_counter() - started, 1),
+    }
+    logger.info(f"Generated {db_path}: {counts}")
+    return counts
+
+
+if __name__ == "__main__":
+    import argparse
+
+    parser = argparse.ArgumentParser(description="Generate a deterministic synthetic boutique database")
+    parser.add_argument("--scale", choices=SCALES, default="10k", help="number of sales")
+    parser.add_argument("--db", help="output database (default bench_<scale>.db)")
+    parser.add_argument("--seed", type=int, default=42)
+    parser.add_argument("--end-date", help="exclusive end date YYYY-MM-DD (default tomorrow)")
+    args = parser.parse_args()
+
+    logging.basicConfig(level=logging.INFO, format="%(levelname)s %(message)s")
+    end_date = datetime.strptime(args.end_date, "%Y-%m-%d") if args.end_date else None
+    print(json.dumps(generate(args.db or f"bench_{args.scale}.db", SCALES[args.scale],
+                              args.seed, end_date), indent=2))
@@ -0,0 +1,98 @@
+"""
+Stock management without the UI
+Listing, adding, editing, quantity updates and soft deletes of stock items,
+with the same validation rules the stock screens enforce.
+"""
+import logging
+from datetime import datetime
+
+logger = logging.getLogger(__name__)
+
+# Columns StockManagement's edit dialog may change
+EDITABLE_FIELDS = (
+    "sku", "name", "category", "material", "color", "size", "quantity",
+    "min_stock_level", "purchase_price", "selling_price", "supplier_name",
+)
+
+
+def validate_levels(quantity, min_stock_level, purchase_price, selling_price):
+    """Raise ValueError when quantities or prices break the stock rules"""
+    if quantity < 0 or min_stock_level < 0:
+        raise ValueError("Quantity and min stock cannot be negative!")
+    if purchase_price < 0 or selling_price < 0:
+        raise ValueError("Prices cannot be negative!")
+    if selling_price < purchase_price:
+        raise ValueError("Selling price cannot be less than purchase price!")
+
+
+class InventoryService:
+    """Read and change stock items"""
+
+    def __init__(self, db):
+        self.db = db
+
+    def list_items(self, search_term="", low_stock_only=False):
+        """Active items, optionally only low stock and/or matching ``search_term``"""
+        query = "SELECT * FROM stock WHERE is_active = 1"
+        params = []
+        if low_stock_only:
+            query += " AND quantity <= min_stock_level"
+        if search_term:
+            query += " AND (sku LIKE ? OR name LIKE ? OR category LIKE ? OR material LIKE ?)"
+            params = [f"%{search_term}%"] * 4
+        query += " ORDER BY name"
+        return self.db.execute_query(query, params, fetch_all=True)
+
+    def get_item(self, item_id):
+        return self.db.execute_query("SELECT * FROM stock WHERE id = ?", (item_id,), fetch_one=True)
+
+    def add_item(self, sku, name, category, quantity, purchase_price, selling_price,
+                 min_stock_level=5, material=None, color=None, size=None,
+                 supplier_name=None, supplier_contact=None):
+        """Insert a new stock item and return its id"""
+        validate_levels(quantity, min_stock_level, purchase_price, selling_price)
+        item_id = self.db.execute_query(
+            '''
+            INSERT INTO stock (
+                sku, name, category, material, color, size,
+                quantity, min_stock_level, purchase_price, selling_price,
+                supplier_name, supplier_contact, arrival_date
+            ) VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?)
+            ''',
+            (sku, name, category, material, color, size, quantity, min_stock_level,
+             purchase_price, selling_price, supplier_name, supplier_contact,
+             datetime.now().isoformat())
+        )
+        logger.info(f"Added stock item {sku}")
+        return item_id
+
+    def update_item(self, item_id, **fields):
+        """Change any of ``EDITABLE_FIELDS`` on an item"""
+        unknown = set(fields) - set(EDITABLE_FIELDS)
+        if unknown:
+            raise ValueError(f"Cannot edit: {', '.join(sorted(unknown))}")
+        current = self.get_item(item_id)
+        if not current:
+            raise ValueError("Item not found!")
+        merged = dict(current, **fields)
+        validate_levels(merged['quantity'], merged['min_stock_level'],
+                        merged['purchase_price'], merged['selling_price'])
+
+        assignments = ", ".join(f"{name} = ?" for name in fields)
+        self.db.execute_query(
+            f"UPDATE stock SET {assignments}, last_updated = ? WHERE id = ?",
+            (*fields.values(), datetime.now().isoformat(), item_id)
+        )
+
+    def set_quantity(self, item_id, quantity):
+        if quantity < 0:
+            raise ValueError("Quantity cannot be negative!")
+        self.db.execute_query(
+            "UPDATE stock SET quantity = ?, last_updated = ? WHERE id = ?",
+            (quantity, datetime.now().isoformat(), item_id)
+        )
+
+    def deactivate(self, item_ids):
+        """Soft delete (mark inactive) so past sales keep their stock rows"""
+        with self.db.get_connection() as conn:
+            conn.executemany("UPDATE stock SET is_active = 0 WHERE id = ?", [(i,) for i in item_ids])
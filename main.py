@@ -3,15 +3,25 @@ Main application file - Boutique Management System
 """
 import customtkinter as ctk
 import sys
+import time
 import logging
 from config import Colors, AppConfig
 from database import Database
+from chart_data import ChartDataProvider
+from maintenance import DatabaseMaintenance, IdleMaintenanceScheduler
 from auth import LoginWindow, AuthManager
 from dashboard import Dashboard
 from billing import BillingSystem
 from stock import StockManagement
 from new_stock import NewStockEntry
 from search import GlobalSearch
+from reports import Reports
+from settings import Settings
+from sale_journal import SaleJournal, JournalSyncScheduler
+from warmup import WarmupScheduler, login_tasks
+from customer_index import CustomerIndex
+from profiler import profiler
+from ui_components import ProfilerOverlay, ticks
 
 # Configure logging
 logging.basicConfig(
@@ -36,6 +46,8 @@ class BoutiqueManagementSystem(ctk.CTk):
         # Initialize database
         self.db = Database()
         self.auth = AuthManager(self.db)
+        self.chart_data = ChartDataProvider(self.db)
+        self.customer_index = CustomerIndex(self.db)
         
         # Configure window
         self.title(AppConfig.APP_NAME)
@@ -50,14 +62,40 @@ class BoutiqueManagementSystem(ctk.CTk):
         self.grid_columnconfigure(0, weight=1)
         self.grid_rowconfigure(0, weight=1)
         
-        # Initialize frames dictionary
+        # Screens built since login, reused on navigation; data version each last showed
         self.frames = {}
+        self.frame_versions = {}
+        self.current_frame = None
+        self.warmup = None
+        self.frame_classes = {
+            "billing": BillingSystem,
+            "stock": StockManagement,
+            "new_stock": NewStockEntry,
+            "search": GlobalSearch,
+            "reports": Reports,
+            "settings": Settings,
+        }
         
         # Show login screen initially
         self.show_login()
         
         # Bind close event
         self.protocol("WM_DELETE_WINDOW", self.on_closing)
+        
+        # ANALYZE, vacuum and integrity checks while nobody is using the app
+        self.maintenance = IdleMaintenanceScheduler(self, DatabaseMaintenance(self.db))
+        
+        # Sales billed while the database was unavailable are synced once it returns
+        self.journal = SaleJournal()
+        self.journal_sync = JournalSyncScheduler(self, self.journal, self.db)
+        
+        # Opt-in profiling overlay, toggled with Ctrl+Shift+P
+        self.profiler_overlay = ProfilerOverlay(self, profiler, AppConfig.PROFILE_OVERLAY_REFRESH_MS)
+        self.bind_all("<Control-Shift-KeyPress-P>", self.toggle_profiling)
+        # Screens other than the dashboard have no navigation of their own
+        self.bind("<Escape>", self.back_to_dashboard)
+        if profiler.enabled:
+            self.profiler_overlay.show()
     
     def show_login(self):
         """Show login screen"""
@@ -66,58 +104,113 @@ class BoutiqueManagementSystem(ctk.CTk):
         login_frame = LoginWindow(self, self.on_login_success)
         login_frame.grid(row=0, column=0, sticky="nsew")
         self.frames["login"] = login_frame
+        self.current_frame = login_frame
     
     def on_login_success(self, user_info):
         """Handle successful login"""
         logger.info(f"User {user_info['username']} logged in successfully")
         self.user_info = user_info
+        self.clear_frames()
         self.show_dashboard()
+        # Prefetch the billing screen and chart data once the dashboard is idle
+        self.warmup = WarmupScheduler(self, self.db, login_tasks(self))
     
     def show_dashboard(self):
         """Show dashboard"""
-        self.clear_frames()
-        
-        dashboard = Dashboard(self, self.switch_frame, self.user_info)
-        dashboard.grid(row=0, column=0, sticky="nsew")
-        self.frames["dashboard"] = dashboard
+        self.switch_frame("dashboard")
     
     def switch_frame(self, frame_name):
-        """Switch between frames"""
-        self.clear_frames()
+        """Show the named frame, building it only the first time"""
+        started = time.perf_counter()
+        with profiler.span(f"switch_frame:{frame_name}"):
+            self._show_frame(frame_name)
+            profiler.measure_render(self)
+        # Idle callbacks run after the redraws the switch queued, so this is the latency seen
+        self.after_idle(self._log_switch, frame_name, started)
+    
+    def _log_switch(self, frame_name, started):
+        elapsed_ms = (time.perf_counter() - started) * 1000
+        level = logging.WARNING if elapsed_ms > AppConfig.FRAME_SWITCH_TARGET_MS else logging.DEBUG
+        logger.log(level, f"Switched to {frame_name} in {elapsed_ms:.0f} ms")
+    
+    def _show_frame(self, frame_name):
+        """Raise the cached frame, refreshing it if the data changed since it was last shown"""
+        version = self.db.data_version()
+        frame = self.frames.get(frame_name)
+        if frame is None:
+            frame = self._build_frame(frame_name)
+            self.frames[frame_name] = frame
+        elif self.frame_versions.get(frame_name) != version and hasattr(frame, "refresh"):
+            frame.refresh()
+        self.frame_versions[frame_name] = version
         
+        if self.current_frame is not None and self.current_frame is not frame:
+            self.current_frame.grid_remove()
+        frame.grid(row=0, column=0, sticky="nsew")
+        frame.tkraise()
+        self.current_frame = frame
+    
+    def prebuild_frame(self, frame_name):
+        """Build a frame ahead of its first visit without showing it"""
+        if frame_name not in self.frames:
+            self.frame_versions[frame_name] = self.db.data_version()
+            self.frames[frame_name] = self._build_frame(frame_name)
+    
+    def _build_frame(self, frame_name):
+        """Construct the named frame"""
         if frame_name == "dashboard":
-            self.show_dashboard()
-        elif frame_name == "billing":
-            billing_frame = BillingSystem(self)
-            billing_frame.grid(row=0, column=0, sticky="nsew")
-            self.frames["billing"] = billing_frame
-        elif frame_name == "stock":
-            stock_frame = StockManagement(self)
-            stock_frame.grid(row=0, column=0, sticky="nsew")
-            self.frames["stock"] = stock_frame
-        elif frame_name == "new_stock":
-            new_stock_frame = NewStockEntry(self)
-            new_stock_frame.grid(row=0, column=0, sticky="nsew")
-            self.frames["new_stock"] = new_stock_frame
-        elif frame_name == "search":
-            search_frame = GlobalSearch(self)
-            search_frame.grid(row=0, column=0, sticky="nsew")
-            self.frames["search"] = search_frame
+            return Dashboard(self, self.switch_frame, self.user_info)
+        return self.frame_classes[frame_name](self)
     
     def clear_frames(self):
         """Clear all frames"""
         for frame in self.frames.values():
             frame.destroy()
         self.frames.clear()
+        self.frame_versions.clear()
+        self.current_frame = None
+    
+    def back_to_dashboard(self, event=None):
+        """Return to the dashboard from any screen while logged in"""
+        if "dashboard" in self.frames and self.current_frame is not self.frames["dashboard"]:
+            self.switch_frame("dashboard")
     
     def logout(self):
         """Handle logout"""
-        self.auth.current_user = None
+        self.auth.logout()
+        self.stop_warmup()
         self.show_login()
     
+    def stop_warmup(self):
+        """Cancel any warm-up still pending"""
+        if self.warmup:
+            self.warmup.stop()
+            self.warmup = None
+    
+    def toggle_profiling(self, event=None):
+        """Start or stop profiling; stopping writes the Chrome trace file"""
+        if profiler.enabled:
+            profiler.enabled = False
+            self.profiler_overlay.hide()
+            profiler.write_trace()
+        else:
+            profiler.clear()
+            profiler.enabled = True
+            self.profiler_overlay.show()
+        logger.info(f"Profiling {'enabled' if profiler.enabled else 'disabled'}")
+    
     def on_closing(self):
         """Handle window closing"""
         # Database connections are handled by context manager, no cleanup needed
+        self.maintenance.stop()
+        self.journal_sync.stop()
+        self.stop_warmup()
+        self.db.close_writes()
+        # Also kept on disk, so the last session can be inspected without the Settings screen
+        self.db.dump_query_report(AppConfig.QUERY_REPORT_FILE)
+        logger.info(f"Periodic UI updates:\n{ticks.format_report()}")
+        if profiler.enabled:
+            profiler.write_trace()
         self.destroy()
         sys.exit(0)
 
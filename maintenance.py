@@ -0,0 +1,221 @@
+"""
+Scheduled database maintenance
+Runs PRAGMA optimize, ANALYZE, incremental vacuuming and integrity checks
+while the application is idle. Vacuuming works in bounded page steps, each in
+its own short transaction, so a checkout never waits behind it for long.
+
+Databases created before auto_vacuum was enabled need a one-time full VACUUM
+to switch to incremental mode. That rewrites the whole file under an exclusive
+lock, so it is never run from the idle job; run it from Settings > Database
+or with ``python maintenance.py --enable-incremental-vacuum`` while the other
+counters are closed.
+"""
+import time
+import logging
+import threading
+from datetime import datetime, timedelta
+from config import AppConfig
+
+logger = logging.getLogger(__name__)
+
+AUTO_VACUUM_INCREMENTAL = 2
+
+
+class DatabaseMaintenance:
+    """Individual maintenance tasks and their schedule"""
+
+    # task -> hours between runs
+    SCHEDULE = {
+        "optimize": AppConfig.MAINTENANCE_OPTIMIZE_HOURS,
+        "analyze": AppConfig.MAINTENANCE_ANALYZE_HOURS,
+        "incremental_vacuum": AppConfig.MAINTENANCE_VACUUM_HOURS,
+        "integrity_check": AppConfig.MAINTENANCE_INTEGRITY_HOURS,
+    }
+
+    def __init__(self, db, step_pages=AppConfig.VACUUM_STEP_PAGES):
+        self.db = db
+        self.step_pages = step_pages
+
+    def _pragma(self, name):
+        with self.db.get_connection() as conn:
+            return conn.execute(f"PRAGMA {name}").fetchone()[0]
+
+    def _record(self, task, started, detail):
+        duration_ms = (time.perf_counter() - started) * 1000
+        self.db.execute_query(
+            '''
+            INSERT INTO maintenance_log (task, last_run, duration_ms, detail)
+            VALUES (?, ?, ?, ?)
+            ON CONFLICT (task) DO UPDATE SET
+                last_run = excluded.last_run,
+                duration_ms = excluded.duration_ms,
+                detail = excluded.detail
+            ''',
+            (task, datetime.now().isoformat(), duration_ms, detail)
+        )
+        logger.info(f"Maintenance {task} finished in {duration_ms:.0f} ms: {detail}")
+
+    def due_tasks(self, now=None):
+        """Tasks whose interval has elapsed, in schedule order"""
+        now = now or datetime.now()
+        rows = self.db.execute_query("SELECT task, last_run FROM maintenance_log", fetch_all=True)
+        last_runs = {row['task']: datetime.fromisoformat(row['last_run']) for row in rows}
+        return [
+            task for task, hours in self.SCHEDULE.items()
+            if task not in last_runs or now - last_runs[task] >= timedelta(hours=hours)
+        ]
+
+    def run(self, task, should_continue=lambda: True):
+        """Run one task by name"""
+        getattr(self, task)(should_continue)
+
+    def optimize(self, should_continue=lambda: True):
+        """Let SQLite refresh statistics it considers stale"""
+        started = time.perf_counter()
+        with self.db.get_connection() as conn:
+            conn.execute("PRAGMA optimize")
+        self._record("optimize", started, "ok")
+
+    def analyze(self, should_continue=lambda: True):
+        """Full ANALYZE so the planner sees current table and index sizes"""
+        started = time.perf_counter()
+        with self.db.get_connection() as conn:
+            conn.execute("ANALYZE")
+        self._record("analyze", started, "ok")
+
+    def needs_vacuum_conversion(self):
+        """Whether the database still needs the one-time switch to incremental auto_vacuum"""
+        return self._pragma("auto_vacuum") != AUTO_VACUUM_INCREMENTAL
+
+    def enable_incremental_vacuum(self):
+        """Switch to incremental auto_vacuum with one full VACUUM; returns bytes reclaimed
+
+        Holds an exclusive lock for the whole rewrite, so checkouts on other
+        counters fail while it runs. Only ever started explicitly.
+        """
+        started = time.perf_counter()
+        page_size = self._pragma("page_size")
+        before = self._pragma("page_count")
+        with self.db.get_connection() as conn:
+            conn.execute("PRAGMA auto_vacuum = INCREMENTAL")
+            conn.execute("VACUUM")
+        # Incremental mode adds pointer-map pages, so a file without free pages can grow slightly
+        reclaimed = max(before - self._pragma("page_count"), 0) * page_size
+        self._record("incremental_vacuum", started,
+                     f"enabled incremental auto_vacuum, reclaimed {reclaimed / 1024:.0f} KB")
+        return reclaimed
+
+    def incremental_vacuum(self, should_continue=lambda: True):
+        """Return free pages to the OS in ``step_pages`` chunks while idle"""
+        started = time.perf_counter()
+        page_size = self._pragma("page_size")
+
+        if self.needs_vacuum_conversion():
+            # Recorded, so this is logged once per interval rather than every idle tick
+            logger.warning("Incremental vacuum is not enabled for this database; run "
+                           "'python maintenance.py --enable-incremental-vacuum' or Settings > Database "
+                           "while the other counters are closed")
+            self._record("incremental_vacuum", started, "skipped: incremental auto_vacuum not enabled")
+            return
+
+        free_before = self._pragma("freelist_count")
+        steps = 0
+        while should_continue():
+            with self.db.get_connection() as conn:
+                if conn.execute("PRAGMA freelist_count").fetchone()[0] == 0:
+                    break
+                # executescript steps the pragma to completion; execute() frees one page
+                conn.executescript(f"PRAGMA incremental_vacuum({self.step_pages});")
+            steps += 1
+        free_after = self._pragma("freelist_count")
+        reclaimed = (free_before - free_after) * page_size
+        if free_after and not should_continue():
+            # Interrupted by user activity; not recorded, so it resumes next idle period
+            logger.info(f"Incremental vacuum paused after reclaiming {reclaimed / 1024:.0f} KB")
+            return
+        self._record("incremental_vacuum", started,
+                     f"reclaimed {reclaimed / 1024:.0f} KB in {steps} step(s), "
+                     f"{free_after} free page(s) left")
+
+    def integrity_check(self, should_continue=lambda: True):
+        """PRAGMA quick_check; problems are logged as errors"""
+        started = time.perf_counter()
+        with self.db.get_connection() as conn:
+            results = [row[0] for row in conn.execute("PRAGMA quick_check").fetchall()]
+        if results != ["ok"]:
+            logger.error(f"Database integrity problems: {results[:20]}")
+        self._record("integrity_check", started, "ok" if results == ["ok"] else f"{len(results)} problem(s)")
+
+
+class IdleMaintenanceScheduler:
+    """Run due maintenance tasks on a worker thread once the UI has been idle"""
+
+    def __init__(self, root, maintenance,
+                 idle_seconds=AppConfig.MAINTENANCE_IDLE_SECONDS,
+                 check_interval_ms=AppConfig.MAINTENANCE_CHECK_INTERVAL_MS):
+        self.root = root
+        self.maintenance = maintenance
+        self.idle_seconds = idle_seconds
+        self.check_interval_ms = check_interval_ms
+        self.last_activity = time.monotonic()
+        self._worker = None
+        self._after_id = None
+
+        for sequence in ("<Any-KeyPress>", "<Any-ButtonPress>", "<Motion>", "<MouseWheel>"):
+            root.bind_all(sequence, self._on_activity, add="+")
+        self._after_id = root.after(check_interval_ms, self._tick)
+
+    def _on_activity(self, event=None):
+        self.last_activity = time.monotonic()
+
+    def is_idle(self):
+        return time.monotonic() - self.last_activity >= self.idle_seconds
+
+    def _tick(self):
+        busy = self._worker is not None and self._worker.is_alive()
+        if not busy and self.is_idle():
+            due = self.maintenance.due_tasks()
+            if due:
+                # One task per tick keeps each burst of work short
+                self._worker = threading.Thread(target=self._run, args=(due[0],), daemon=True)
+                self._worker.start()
+        self._after_id = self.root.after(self.check_interval_ms, self._tick)
+
+    def _run(self, task):
+        try:
+            # Background connections must not count as counter activity
+            with self.maintenance.db.background_work():
+                self.maintenance.run(task, should_continue=self.is_idle)
+        except Exception as e:
+            logger.error(f"Maintenance task {task} failed: {e}")
+
+    def stop(self):
+        """Stop scheduling further tasks"""
+        if self._after_id:
+            self.root.after_cancel(self._after_id)
+            self._after_id = None
+
+
+if __name__ == "__main__":
+    import argparse
+
+    parser = argparse.ArgumentParser(description="Database maintenance")
+    parser.add_argument("--db", default=AppConfig.DB_NAME, help="database file")
+    parser.add_argument("--enable-incremental-vacuum", action="store_true",
+                        help="one-time full VACUUM switching to incremental auto_vacuum "
+                             "(close the app on every counter first)")
+    parser.add_argument("--task", choices=DatabaseMaintenance.SCHEDULE, help="run one maintenance task now")
+    args = parser.parse_args()
+
+    logging.basicConfig(level=logging.INFO, format="%(levelname)s %(message)s")
+    from database import Database
+
+    maintenance = DatabaseMaintenance(Database(args.db))
+    if args.enable_incremental_vacuum:
+        if maintenance.needs_vacuum_conversion():
+            reclaimed = maintenance.enable_incremental_vacuum()
+            print(f"Incremental auto_vacuum enabled; reclaimed {reclaimed / 1024:.0f} KB")
+        else:
+            print("Incremental auto_vacuum is already enabled")
+    if args.task:
+        maintenance.run(args.task)
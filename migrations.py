@@ -0,0 +1,336 @@
+"""
+Versioned schema migrations
+The schema version lives in SQLite's ``PRAGMA user_version``. Each migration
+runs in its own transaction that also bumps the version, so a database is
+always at exactly one known version. Backfills over large tables run in
+batches, each committed with its progress, and resume where they stopped if
+the application is closed part way through.
+
+Usage: python migrations.py [--db boutique_management.db]
+"""
+import json
+import time
+import logging
+from datetime import datetime
+from config import AppConfig
+from sales_rollups import rebuild_rollups
+from permissions import seed_access
+
+logger = logging.getLogger(__name__)
+
+
+class Migration:
+    """One schema step: DDL statements, an ``apply(conn)`` hook and/or a batched backfill
+
+    ``backfill(conn, after_id, batch_size)`` processes the next batch after
+    ``after_id`` and returns the last id it handled, or None once finished.
+    """
+
+    def __init__(self, version, description, statements=(), apply=None, backfill=None):
+        self.version = version
+        self.description = description
+        self.statements = statements
+        self.apply = apply
+        self.backfill = backfill
+
+
+def _backfill_sale_items(conn, after_id, batch_size):
+    """Expand the JSON ``sales.items`` of sales recorded before sale_items existed"""
+    rows = conn.execute(
+        '''
+        SELECT id, items FROM sales
+        WHERE id > ? AND NOT EXISTS (SELECT 1 FROM sale_items WHERE sale_id = sales.id)
+        ORDER BY id
+        LIMIT ?
+        ''',
+        (after_id, batch_size)
+    ).fetchall()
+    if not rows:
+        return None
+
+    line_items = []
+    for sale_id, items_json in rows:
+        try:
+            items = json.loads(items_json or "[]")
+        except ValueError:
+            logger.warning(f"Sale {sale_id} has unreadable items JSON; no line items created")
+            continue
+        for item in items:
+            quantity = item.get('quantity', 0)
+            price = item.get('price', 0)
+            line_items.append((
+                sale_id, item.get('id'), item.get('sku') or '', item.get('name') or '',
+                item.get('category'), quantity, price, item.get('total', price * quantity)
+            ))
+    conn.executemany(
+        '''
+        INSERT INTO sale_items (
+            sale_id, stock_id, sku, item_name, category,
+            quantity, unit_price, total_price
+        ) VALUES (?, ?, ?, ?, ?, ?, ?, ?)
+        ''',
+        line_items
+    )
+    return rows[-1][0]
+
+
+MIGRATIONS = [
+    Migration(1, "Stock reservations for open billing carts", statements=[
+        '''
+        CREATE TABLE IF NOT EXISTS stock_reservations (
+            id INTEGER PRIMARY KEY AUTOINCREMENT,
+            stock_id INTEGER NOT NULL,
+            cart_id TEXT NOT NULL,
+            quantity INTEGER NOT NULL,
+            expires_at TIMESTAMP NOT NULL,
+            created_at TIMESTAMP DEFAULT CURRENT_TIMESTAMP,
+            UNIQUE (cart_id, stock_id),
+            FOREIGN KEY (stock_id) REFERENCES stock (id)
+        )
+        ''',
+        # Covering index so the active reserved quantity per SKU never touches the table
+        '''
+        CREATE INDEX IF NOT EXISTS idx_reservations_stock
+        ON stock_reservations(stock_id, expires_at, cart_id, quantity)
+        ''',
+        'CREATE INDEX IF NOT EXISTS idx_reservations_expiry ON stock_reservations(expires_at)',
+    ]),
+    Migration(2, "Sale line items table", statements=[
+        '''
+        CREATE TABLE IF NOT EXISTS sale_items (
+            id INTEGER PRIMARY KEY AUTOINCREMENT,
+            sale_id INTEGER NOT NULL,
+            stock_id INTEGER,
+            sku TEXT NOT NULL,
+            item_name TEXT NOT NULL,
+            category TEXT,
+            quantity INTEGER NOT NULL,
+            unit_price REAL NOT NULL,
+            total_price REAL NOT NULL,
+            FOREIGN KEY (sale_id) REFERENCES sales (id),
+            FOREIGN KEY (stock_id) REFERENCES stock (id)
+        )
+        ''',
+        'CREATE INDEX IF NOT EXISTS idx_sale_items_sale ON sale_items(sale_id)',
+    ]),
+    Migration(3, "Backfill sale_items from sales.items JSON", backfill=_backfill_sale_items),
+    Migration(4, "Daily SKU and category sales aggregates", statements=[
+        '''
+        CREATE TABLE IF NOT EXISTS daily_sku_sales (
+            sale_date TEXT NOT NULL,
+            sku TEXT NOT NULL,
+            stock_id INTEGER,
+            item_name TEXT NOT NULL,
+            category TEXT NOT NULL,
+            quantity INTEGER NOT NULL DEFAULT 0,
+            revenue REAL NOT NULL DEFAULT 0,
+            PRIMARY KEY (sale_date, sku)
+        ) WITHOUT ROWID
+        ''',
+        '''
+        CREATE TABLE IF NOT EXISTS daily_category_sales (
+            sale_date TEXT NOT NULL,
+            category TEXT NOT NULL,
+            quantity INTEGER NOT NULL DEFAULT 0,
+            revenue REAL NOT NULL DEFAULT 0,
+            PRIMARY KEY (sale_date, category)
+        ) WITHOUT ROWID
+        ''',
+    ], apply=rebuild_rollups),
+    Migration(5, "Covering index for time-bucketed revenue series", statements=[
+        'CREATE INDEX IF NOT EXISTS idx_sales_date_amount ON sales(created_at, total_amount)',
+    ]),
+    Migration(6, "Idle-time maintenance log", statements=[
+        '''
+        CREATE TABLE IF NOT EXISTS maintenance_log (
+            task TEXT PRIMARY KEY,
+            last_run TIMESTAMP NOT NULL,
+            duration_ms REAL,
+            detail TEXT
+        )
+        ''',
+    ]),
+    Migration(7, "Replayed offline journal entries", statements=[
+        '''
+        CREATE TABLE IF NOT EXISTS journal_replays (
+            journal_id TEXT PRIMARY KEY,
+            sale_id INTEGER NOT NULL,
+            invoice_number TEXT NOT NULL,
+            replayed_at TIMESTAMP NOT NULL,
+            conflicts TEXT,
+            FOREIGN KEY (sale_id) REFERENCES sales (id)
+        )
+        ''',
+    ]),
+    Migration(8, "Role permissions and hashed access PINs", statements=[
+        '''
+        CREATE TABLE IF NOT EXISTS role_permissions (
+            role TEXT NOT NULL,
+            permission TEXT NOT NULL,
+            PRIMARY KEY (role, permission)
+        ) WITHOUT ROWID
+        ''',
+        '''
+        CREATE TABLE IF NOT EXISTS access_pins (
+            scope TEXT PRIMARY KEY,
+            pin_hash TEXT NOT NULL,
+            updated_at TIMESTAMP NOT NULL
+        )
+        ''',
+    ], apply=seed_access),
+    Migration(9, "Sales by customer index for purchase history", statements=[
+        'CREATE INDEX IF NOT EXISTS idx_sales_customer ON sales(customer_id, created_at)',
+    ]),
+    # Adds role permissions introduced since version 8; existing grants and PINs are kept
+    Migration(10, "Stock permissions for staff behind the admin PIN", apply=seed_access),
+]
+
+
+class MigrationRunner:
+    """Bring a database up to the latest schema version"""
+
+    def __init__(self, db, migrations=MIGRATIONS, batch_size=AppConfig.MIGRATION_BATCH_SIZE):
+        self.db = db
+        self.migrations = sorted(migrations, key=lambda m: m.version)
+        self.batch_size = batch_size
+        versions = [m.version for m in self.migrations]
+        if len(set(versions)) != len(versions):
+            raise ValueError("Duplicate migration versions")
+
+    @property
+    def latest_version(self):
+        return self.migrations[-1].version if self.migrations else 0
+
+    def _ensure_bookkeeping(self, conn):
+        conn.execute('''
+            CREATE TABLE IF NOT EXISTS schema_migrations (
+                version INTEGER PRIMARY KEY,
+                description TEXT NOT NULL,
+                applied_at TIMESTAMP NOT NULL,
+                duration_ms REAL
+            )
+        ''')
+        # Resume point of batched backfills that have not finished yet
+        conn.execute('''
+            CREATE TABLE IF NOT EXISTS schema_migration_progress (
+                version INTEGER PRIMARY KEY,
+                last_id INTEGER NOT NULL,
+                batches INTEGER NOT NULL DEFAULT 0,
+                elapsed_ms REAL NOT NULL DEFAULT 0
+            )
+        ''')
+
+    def current_version(self):
+        with self.db.get_connection() as conn:
+            return conn.execute("PRAGMA user_version").fetchone()[0]
+
+    def pending(self):
+        """Migrations newer than the database, in order"""
+        current = self.current_version()
+        return [m for m in self.migrations if m.version > current]
+
+    def status(self):
+        """Applied migrations with their timings, plus anything still pending"""
+        with self.db.get_connection() as conn:
+            self._ensure_bookkeeping(conn)
+            applied = conn.execute(
+                "SELECT version, description, applied_at, duration_ms FROM schema_migrations ORDER BY version"
+            ).fetchall()
+        return {
+            "version": self.current_version(),
+            "latest": self.latest_version,
+            "applied": [dict(row) for row in applied],
+            "pending": [(m.version, m.description) for m in self.pending()],
+        }
+
+    def run(self):
+        """Apply every pending migration; returns [(version, description, ms)]"""
+        with self.db.get_connection() as conn:
+            self._ensure_bookkeeping(conn)
+            current = conn.execute("PRAGMA user_version").fetchone()[0]
+        if current > self.latest_version:
+            raise RuntimeError(
+                f"Database schema version {current} is newer than this application ({self.latest_version})"
+            )
+
+        applied = []
+        for migration in self.migrations:
+            if migration.version <= current:
+                continue
+            started = time.perf_counter()
+            previous_ms = 0
+            if migration.backfill:
+                previous_ms = self._run_backfill(migration)
+            else:
+                with self.db.get_connection() as conn:
+                    conn.execute("BEGIN IMMEDIATE")
+                    self._apply(conn, migration)
+                    self._finish(conn, migration, (time.perf_counter() - started) * 1000)
+            duration_ms = previous_ms + (time.perf_counter() - started) * 1000
+            logger.info(f"Applied migration {migration.version} ({migration.description}) in {duration_ms:.0f} ms")
+            applied.append((migration.version, migration.description, round(duration_ms, 1)))
+        return applied
+
+    def _apply(self, conn, migration):
+        for statement in migration.statements:
+            conn.execute(statement)
+        if migration.apply:
+            migration.apply(conn)
+
+    def _finish(self, conn, migration, duration_ms):
+        """Record the migration and bump user_version inside the current transaction"""
+        conn.execute(
+            "INSERT OR REPLACE INTO schema_migrations (version, description, applied_at, duration_ms) "
+            "VALUES (?, ?, ?, ?)",
+            (migration.version, migration.description, datetime.now().isoformat(), duration_ms)
+        )
+        conn.execute("DELETE FROM schema_migration_progress WHERE version = ?", (migration.version,))
+        conn.execute(f"PRAGMA user_version = {int(migration.version)}")
+
+    def _run_backfill(self, migration):
+        """Run a backfill batch by batch; returns time spent in earlier, interrupted runs"""
+        with self.db.get_connection() as conn:
+            row = conn.execute(
+                "SELECT last_id, batches, elapsed_ms FROM schema_migration_progress WHERE version = ?",
+                (migration.version,)
+            ).fetchone()
+        last_id, batches, previous_ms = (row['last_id'], row['batches'], row['elapsed_ms']) if row else (0, 0, 0)
+        if row:
+            logger.info(f"Resuming migration {migration.version} after id {last_id} ({batches} batch(es) done)")
+
+        run_started = time.perf_counter()
+        while True:
+            batch_started = time.perf_counter()
+            with self.db.get_connection() as conn:
+                conn.execute("BEGIN IMMEDIATE")
+                if batches == 0:
+                    self._apply(conn, migration)
+                next_id = migration.backfill(conn, last_id, self.batch_size)
+                if next_id is None:
+                    self._finish(conn, migration, previous_ms + (time.perf_counter() - run_started) * 1000)
+                    return previous_ms
+                batches += 1
+                conn.execute(
+                    "INSERT OR REPLACE INTO schema_migration_progress (version, last_id, batches, elapsed_ms) "
+                    "VALUES (?, ?, ?, ?)",
+                    (migration.version, next_id, batches,
+                     previous_ms + (time.perf_counter() - run_started) * 1000)
+                )
+            last_id = next_id
+            logger.debug(
+                f"Migration {migration.version}: batch {batches} up to id {last_id} "
+                f"in {(time.perf_counter() - batch_started) * 1000:.0f} ms"
+            )
+
+
+if __name__ == "__main__":
+    import argparse
+    from database import Database
+
+    parser = argparse.ArgumentParser(description="Apply pending schema migrations")
+    parser.add_argument("--db", default=AppConfig.DB_NAME, help="database file")
+    args = parser.parse_args()
+
+    logging.basicConfig(level=logging.INFO, format="%(levelname)s %(message)s")
+    # Opening the database applies pending migrations
+    print(json.dumps(MigrationRunner(Database(args.db)).status(), indent=2))
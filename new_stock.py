@@ -8,6 +8,7 @@ import random
 import string
 from config import Colors, AppConfig
 from utils import Validators
+from inventory_service import InventoryService, validate_levels
 
 class NewStockEntry(ctk.CTkFrame):
     """New stock entry form"""
@@ -16,6 +17,7 @@ class NewStockEntry(ctk.CTkFrame):
         super().__init__(parent)
         self.parent = parent
         self.db = parent.db
+        self.inventory = InventoryService(self.db)
         
         self.setup_ui()
         self.generate_sku()
@@ -193,23 +195,16 @@ class NewStockEntry(ctk.CTkFrame):
             min_stock_level = int(self.fields['min_stock_level'].get() or "5")
             purchase_price = float(self.fields['purchase_price'].get())
             selling_price = float(self.fields['selling_price'].get())
-            
-            if quantity < 0 or min_stock_level < 0:
-                messagebox.showwarning("Warning", "Quantity and min stock cannot be negative!")
-                return
-            
-            if purchase_price < 0 or selling_price < 0:
-                messagebox.showwarning("Warning", "Prices cannot be negative!")
-                return
-            
-            if selling_price < purchase_price:
-                messagebox.showwarning("Warning", "Selling price cannot be less than purchase price!")
-                return
-            
         except ValueError:
             messagebox.showerror("Error", "Please enter valid numbers for quantity and prices!")
             return
         
+        try:
+            validate_levels(quantity, min_stock_level, purchase_price, selling_price)
+        except ValueError as e:
+            messagebox.showwarning("Warning", str(e))
+            return
+        
         # Validate supplier contact if provided
         supplier_contact = self.fields['supplier_contact'].get().strip()
         if supplier_contact and not Validators.validate_phone(supplier_contact):
@@ -218,32 +213,20 @@ class NewStockEntry(ctk.CTkFrame):
                 return
         
         # Save to database
-        insert_query = '''
-            INSERT INTO stock (
-                sku, name, category, material, color, size,
-                quantity, min_stock_level, purchase_price, selling_price,
-                supplier_name, supplier_contact, arrival_date
-            ) VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?)
-        '''
-        
         try:
-            self.db.execute_query(
-                insert_query,
-                (
-                    self.sku_var.get(),
-                    self.fields['name'].get().strip(),
-                    self.fields['category'].get().strip(),
-                    self.fields['material'].get().strip() or None,
-                    self.fields['color'].get().strip() or None,
-                    self.fields['size'].get().strip() or None,
-                    quantity,
-                    min_stock_level,
-                    purchase_price,
-                    selling_price,
-                    self.fields['supplier_name'].get().strip() or None,
-                    supplier_contact or None,
-                    datetime.now().isoformat()
-                )
+            self.inventory.add_item(
+                sku=self.sku_var.get(),
+                name=self.fields['name'].get().strip(),
+                category=self.fields['category'].get().strip(),
+                material=self.fields['material'].get().strip() or None,
+                color=self.fields['color'].get().strip() or None,
+                size=self.fields['size'].get().strip() or None,
+                quantity=quantity,
+                min_stock_level=min_stock_level,
+                purchase_price=purchase_price,
+                selling_price=selling_price,
+                supplier_name=self.fields['supplier_name'].get().strip() or None,
+                supplier_contact=supplier_contact or None
             )
             
             messagebox.showinfo(
@@ -0,0 +1,143 @@
+"""
+Salted password hashing
+Hashes use scrypt from hashlib (PBKDF2-SHA256 where OpenSSL lacks scrypt)
+with a random salt. The algorithm and cost are stored in the hash itself,
+so raising the cost only affects new hashes, and ``needs_rehash`` tells the
+login code when a stored hash should be upgraded. Unsalted MD5 hashes from
+older versions still verify and always need a rehash.
+
+Calibrate the cost on the slowest counter PC:
+    python password_hashing.py --calibrate [--target-ms 250]
+"""
+import os
+import hmac
+import time
+import base64
+import hashlib
+import logging
+from config import AppConfig
+
+logger = logging.getLogger(__name__)
+
+HAS_SCRYPT = hasattr(hashlib, "scrypt")
+SALT_BYTES = 16
+KEY_BYTES = 32
+
+
+def _b64(data):
+    return base64.b64encode(data).decode("ascii")
+
+
+def _scrypt(password, salt, n, r, p):
+    # scrypt needs about 128 * n * r bytes; allow headroom above OpenSSL's 32 MB default
+    return hashlib.scrypt(password.encode(), salt=salt, n=n, r=r, p=p,
+                          maxmem=256 * n * r + 1024 * 1024, dklen=KEY_BYTES)
+
+
+def _pbkdf2(password, salt, iterations):
+    return hashlib.pbkdf2_hmac("sha256", password.encode(), salt, iterations, dklen=KEY_BYTES)
+
+
+def hash_password(password, scrypt_n=AppConfig.PASSWORD_SCRYPT_N,
+                  pbkdf2_iterations=AppConfig.PASSWORD_PBKDF2_ITERATIONS):
+    """Salted hash string for ``password`` at the configured cost"""
+    salt = os.urandom(SALT_BYTES)
+    if HAS_SCRYPT:
+        r, p = AppConfig.PASSWORD_SCRYPT_R, AppConfig.PASSWORD_SCRYPT_P
+        key = _scrypt(password, salt, scrypt_n, r, p)
+        return f"scrypt${scrypt_n}${r}${p}${_b64(salt)}${_b64(key)}"
+    key = _pbkdf2(password, salt, pbkdf2_iterations)
+    return f"pbkdf2_sha256${pbkdf2_iterations}${_b64(salt)}${_b64(key)}"
+
+
+def _is_legacy_md5(stored):
+    return len(stored) == 32 and all(c in "0123456789abcdef" for c in stored)
+
+
+def verify_password(password, stored):
+    """True when ``password`` matches the stored hash (any supported format)"""
+    if not stored:
+        return False
+    if _is_legacy_md5(stored):
+        return hmac.compare_digest(hashlib.md5(password.encode()).hexdigest(), stored)
+
+    parts = stored.split("$")
+    try:
+        if parts[0] == "scrypt" and len(parts) == 6:
+            n, r, p = int(parts[1]), int(parts[2]), int(parts[3])
+            key = _scrypt(password, base64.b64decode(parts[4]), n, r, p)
+            return hmac.compare_digest(key, base64.b64decode(parts[5]))
+        if parts[0] == "pbkdf2_sha256" and len(parts) == 4:
+            key = _pbkdf2(password, base64.b64decode(parts[2]), int(parts[1]))
+            return hmac.compare_digest(key, base64.b64decode(parts[3]))
+    except (ValueError, TypeError) as e:
+        logger.error(f"Unreadable password hash: {e}")
+        return False
+    logger.error("Unknown password hash format")
+    return False
+
+
+def needs_rehash(stored):
+    """True when a stored hash is legacy or below the configured cost"""
+    if _is_legacy_md5(stored):
+        return True
+    parts = stored.split("$")
+    if HAS_SCRYPT:
+        return parts[0] != "scrypt" or parts[1:4] != [
+            str(AppConfig.PASSWORD_SCRYPT_N), str(AppConfig.PASSWORD_SCRYPT_R), str(AppConfig.PASSWORD_SCRYPT_P)
+        ]
+    return parts[0] != "pbkdf2_sha256" or int(parts[1]) < AppConfig.PASSWORD_PBKDF2_ITERATIONS
+
+
+def _timed_ms(func, repeat=3):
+    best = None
+    for _ in range(repeat):
+        started = time.perf_counter()
+        func()
+        elapsed = (time.perf_counter() - started) * 1000
+        best = elapsed if best is None else min(best, elapsed)
+    return best
+
+
+def calibrate(target_ms=AppConfig.LOGIN_TARGET_MS):
+    """Highest cost whose hash time on this machine stays under ``target_ms``
+
+    Returns (setting name, value, measured ms) for the available algorithm.
+    """
+    salt = os.urandom(SALT_BYTES)
+    if HAS_SCRYPT:
+        r, p = AppConfig.PASSWORD_SCRYPT_R, AppConfig.PASSWORD_SCRYPT_P
+        n, best = 2 ** 10, None
+        while n <= 2 ** 20:
+            elapsed = _timed_ms(lambda: _scrypt("calibration", salt, n, r, p))
+            if elapsed > target_ms:
+                break
+            best = (n, elapsed)
+            n *= 2
+        best = best or (2 ** 10, elapsed)
+        return "PASSWORD_SCRYPT_N", best[0], round(best[1], 1)
+
+    iterations, best = 50_000, None
+    while iterations <= 10_000_000:
+        elapsed = _timed_ms(lambda: _pbkdf2("calibration", salt, iterations))
+        if elapsed > target_ms:
+            break
+        best = (iterations, elapsed)
+        iterations *= 2
+    best = best or (50_000, elapsed)
+    return "PASSWORD_PBKDF2_ITERATIONS", best[0], round(best[1], 1)
+
+
+if __name__ == "__main__":
+    import argparse
+
+    parser = argparse.ArgumentParser(description="Measure password hashing cost on this machine")
+    parser.add_argument("--calibrate", action="store_true", help="find the cost for the target login time")
+    parser.add_argument("--target-ms", type=float, default=AppConfig.LOGIN_TARGET_MS)
+    args = parser.parse_args()
+
+    current = _timed_ms(lambda: hash_password("benchmark"))
+    print(f"Current setting: {'scrypt' if HAS_SCRYPT else 'pbkdf2_sha256'} hash takes {current:.1f} ms")
+    if args.calibrate:
+        setting, value, elapsed = calibrate(args.target_ms)
+        print(f"Set AppConfig.{setting} = {value} ({elapsed} ms, target {args.target_ms:g} ms)")
@@ -0,0 +1,146 @@
+"""
+Role permissions and PIN elevation
+What each role may do, and the PINs that guard sensitive actions, live in
+the database (role_permissions and access_pins, PINs hashed like
+passwords). Both are loaded once per login into a PermissionCache, so a
+check is a set or dict lookup. A correct PIN elevates the session for
+PIN_SESSION_SECONDS, during which that PIN is not asked for again.
+
+Change a PIN: python permissions.py --set-pin admin [--db boutique_management.db]
+"""
+import time
+import secrets
+import logging
+from datetime import datetime
+from config import AppConfig
+import password_hashing
+
+logger = logging.getLogger(__name__)
+
+# Permission -> PIN scope that must also be entered (None: the role is enough)
+PERMISSIONS = {
+    "billing.checkout": "billing",
+    "stock.manage": "admin",
+    "stock.add": "admin",
+    "search.view": None,
+    "reports.view": None,
+    "settings.manage": "admin",
+}
+
+# Permission needed to open a frame; frames not listed are open to everyone
+FRAME_PERMISSIONS = {
+    "stock": "stock.manage",
+    "new_stock": "stock.add",
+    "search": "search.view",
+    "reports": "reports.view",
+    "settings": "settings.manage",
+}
+
+DEFAULT_ROLE_PERMISSIONS = {
+    "admin": tuple(PERMISSIONS),
+    # Stock screens stay reachable on a counter login once a manager enters the admin PIN
+    "staff": ("billing.checkout", "search.view", "reports.view", "stock.manage", "stock.add"),
+}
+
+DEFAULT_PINS = {
+    "admin": AppConfig.DEFAULT_ADMIN_PIN,
+    "billing": AppConfig.DEFAULT_BILLING_PIN,
+}
+
+
+def seed_access(conn):
+    """Default role permissions and hashed PINs, keeping anything already set"""
+    conn.executemany(
+        "INSERT OR IGNORE INTO role_permissions (role, permission) VALUES (?, ?)",
+        [(role, permission) for role, permissions in DEFAULT_ROLE_PERMISSIONS.items()
+         for permission in permissions]
+    )
+    now = datetime.now().isoformat()
+    for scope, pin in DEFAULT_PINS.items():
+        if not conn.execute("SELECT 1 FROM access_pins WHERE scope = ?", (scope,)).fetchone():
+            conn.execute(
+                "INSERT INTO access_pins (scope, pin_hash, updated_at) VALUES (?, ?, ?)",
+                (scope, password_hashing.hash_password(pin), now)
+            )
+
+
+def set_pin(db, scope, pin):
+    """Store a new hashed PIN for ``scope``"""
+    if not pin.isdigit() or len(pin) < 4:
+        raise ValueError("PIN must be at least 4 digits!")
+    db.execute_query(
+        '''
+        INSERT INTO access_pins (scope, pin_hash, updated_at) VALUES (?, ?, ?)
+        ON CONFLICT (scope) DO UPDATE SET pin_hash = excluded.pin_hash, updated_at = excluded.updated_at
+        ''',
+        (scope, password_hashing.hash_password(pin), datetime.now().isoformat())
+    )
+    logger.info(f"PIN for {scope} changed")
+
+
+class PermissionCache:
+    """One login's permissions, PIN hashes and PIN elevations"""
+
+    def __init__(self, db, role, elevation_seconds=AppConfig.PIN_SESSION_SECONDS):
+        self.role = role
+        self.elevation_seconds = elevation_seconds
+        with db.get_connection() as conn:
+            self.permissions = {
+                row['permission'] for row in conn.execute(
+                    "SELECT permission FROM role_permissions WHERE role = ?", (role,)
+                )
+            }
+            self._pin_hashes = {
+                row['scope']: row['pin_hash']
+                for row in conn.execute("SELECT scope, pin_hash FROM access_pins")
+            }
+        # scope -> (token, monotonic expiry)
+        self._elevations = {}
+
+    def can(self, permission):
+        """Whether the role has ``permission`` at all"""
+        return permission in self.permissions
+
+    def session_token(self, scope):
+        """Token of a still-valid elevation for ``scope``, else None"""
+        elevation = self._elevations.get(scope)
+        if elevation and time.monotonic() < elevation[1]:
+            return elevation[0]
+        self._elevations.pop(scope, None)
+        return None
+
+    def check(self, permission):
+        """'allowed', 'pin' (allowed once the PIN is entered) or 'denied'"""
+        if permission not in self.permissions:
+            return "denied"
+        scope = PERMISSIONS.get(permission)
+        if scope is None or self.session_token(scope):
+            return "allowed"
+        return "pin"
+
+    def elevate(self, scope, pin):
+        """Verify a PIN against its cached hash and open an elevation"""
+        if not password_hashing.verify_password(pin, self._pin_hashes.get(scope)):
+            return False
+        self._elevations[scope] = (secrets.token_hex(16), time.monotonic() + self.elevation_seconds)
+        return True
+
+    def clear(self):
+        self._elevations.clear()
+
+
+if __name__ == "__main__":
+    import argparse
+    import getpass
+    from database import Database
+
+    parser = argparse.ArgumentParser(description="Change an access PIN")
+    parser.add_argument("--set-pin", choices=sorted(DEFAULT_PINS), required=True, help="PIN scope")
+    parser.add_argument("--db", default=AppConfig.DB_NAME, help="database file")
+    args = parser.parse_args()
+
+    logging.basicConfig(level=logging.INFO, format="%(levelname)s %(message)s")
+    new_pin = getpass.getpass(f"New {args.set_pin} PIN: ")
+    if new_pin != getpass.getpass("Repeat PIN: "):
+        raise SystemExit("PINs do not match")
+    set_pin(Database(args.db), args.set_pin, new_pin)
@@ -0,0 +1,133 @@
+"""
+Opt-in profiling of UI actions
+Spans wrap user-visible actions such as frame switches, bill generation,
+stock loads, searches and chart updates. Each span records its wall time and
+the SQL, Tk render and PDF time spent inside it. Finished actions feed the
+live overlay, and all events can be written as Chrome trace JSON for
+chrome://tracing or Perfetto.
+
+Enable with BOUTIQUE_PROFILE=1, or toggle with Ctrl+Shift+P in the app.
+"""
+import os
+import json
+import time
+import logging
+import threading
+from collections import deque
+from contextlib import contextmanager
+from functools import wraps
+from config import AppConfig
+
+logger = logging.getLogger(__name__)
+
+# Span categories whose time is also added up in every enclosing span
+TIMED_CATEGORIES = ("sql", "render", "pdf")
+
+
+class Profiler:
+    """Collect nested spans per thread and export them as trace events"""
+
+    def __init__(self, enabled=False, max_events=AppConfig.PROFILE_MAX_EVENTS):
+        self.enabled = enabled
+        self._events = deque(maxlen=max_events)
+        self.recent = deque(maxlen=AppConfig.PROFILE_OVERLAY_ACTIONS)
+        self._local = threading.local()
+        self._origin = time.perf_counter()
+
+    def _stack(self):
+        stack = getattr(self._local, "stack", None)
+        if stack is None:
+            stack = self._local.stack = []
+        return stack
+
+    def _emit(self, name, category, started, ended, args):
+        self._events.append({
+            "name": name,
+            "cat": category,
+            "ph": "X",
+            "ts": round((started - self._origin) * 1e6),
+            "dur": round((ended - started) * 1e6),
+            "pid": os.getpid(),
+            "tid": threading.get_ident(),
+            "args": args,
+        })
+
+    def record(self, category, name, started, ended, **args):
+        """Add an already-timed leaf event (e.g. one SQL statement)"""
+        if not self.enabled:
+            return
+        self.add_time(category, (ended - started) * 1000)
+        self._emit(name, category, started, ended, args)
+
+    def add_time(self, category, duration_ms):
+        """Count time measured elsewhere (e.g. on the writer thread) in this thread's open spans"""
+        if not self.enabled or category not in TIMED_CATEGORIES:
+            return
+        for frame in self._stack():
+            frame["totals"][category] += duration_ms
+
+    @contextmanager
+    def span(self, name, category="ui", **args):
+        """Time a block; SQL/render/PDF time inside it is attributed to it
+
+        Yields the span's running ``{category: ms}`` totals, or None while
+        profiling is disabled.
+        """
+        if not self.enabled:
+            yield None
+            return
+        stack = self._stack()
+        frame = {"totals": dict.fromkeys(TIMED_CATEGORIES, 0.0)}
+        stack.append(frame)
+        started = time.perf_counter()
+        try:
+            yield frame["totals"]
+        finally:
+            ended = time.perf_counter()
+            stack.pop()
+            wall_ms = (ended - started) * 1000
+            if category in TIMED_CATEGORIES:
+                for parent in stack:
+                    parent["totals"][category] += wall_ms
+            totals = {f"{key}_ms": round(value, 2) for key, value in frame["totals"].items()}
+            self._emit(name, category, started, ended, dict(args, **totals))
+            if category == "ui" and not stack:
+                self.recent.append(dict(totals, name=name, wall_ms=round(wall_ms, 2)))
+
+    def measure_render(self, widget):
+        """Flush pending Tk geometry and redraw work so it is timed as render"""
+        if not self.enabled:
+            return
+        with self.span("render", category="render"):
+            widget.update_idletasks()
+
+    def write_trace(self, path=AppConfig.PROFILE_TRACE_FILE):
+        """Write collected events in Chrome trace format"""
+        events = list(self._events)
+        with open(path, "w", encoding="utf-8") as f:
+            json.dump({"traceEvents": events, "displayTimeUnit": "ms"}, f)
+        logger.info(f"Wrote {len(events)} profile events to {path}")
+        return path
+
+    def clear(self):
+        self._events.clear()
+        self.recent.clear()
+
+
+def traced(name=None, category="ui"):
+    """Decorator running a function inside a profiler span"""
+    def decorator(func):
+        span_name = name or func.__qualname__
+
+        @wraps(func)
+        def wrapper(*args, **kwargs):
+            if not profiler.enabled:
+                return func(*args, **kwargs)
+            with profiler.span(span_name, category):
+                return func(*args, **kwargs)
+        return wrapper
+    return decorator
+
+
+# Shared instance used across the application
+profiler = Profiler(enabled=os.environ.get("BOUTIQUE_PROFILE") == "1")
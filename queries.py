@@ -0,0 +1,233 @@
+"""
+Named query registry and per-query timing
+Frequently run SQL lives here under stable names so it can be found, reviewed
+and measured in one place. Every query that goes through
+``Database.execute_query`` is timed; slow ones are logged once with their
+EXPLAIN QUERY PLAN, and ``QueryStats.report()`` gives call counts, latency
+percentiles and rows returned per query.
+"""
+import re
+import logging
+import threading
+from collections import deque
+from config import AppConfig
+from reservations import RESERVED_BY_OTHERS_SQL
+
+logger = logging.getLogger(__name__)
+
+QUERIES = {
+    # Dashboard
+    "stock.low_stock": '''
+        SELECT * FROM stock
+        WHERE quantity <= min_stock_level
+        AND is_active = 1
+        ORDER BY quantity ASC
+    ''',
+    "sales.today_totals": '''
+        SELECT SUM(total_amount) as total_sales, COUNT(*) as transaction_count
+        FROM sales
+        WHERE DATE(created_at) = DATE('now')
+    ''',
+    "sales.recent": '''
+        SELECT invoice_number, customer_name, total_amount, created_at
+        FROM sales
+        ORDER BY created_at DESC
+        LIMIT ?
+    ''',
+    "sales.month_totals": '''
+        SELECT SUM(total_amount) as total, COUNT(*) as count
+        FROM sales
+        WHERE strftime('%Y-%m', created_at) = strftime('%Y-%m', 'now')
+    ''',
+
+    # Global search (bills run against the all_sales view, archives included)
+    "search.bills": '''
+        SELECT invoice_number, customer_name, customer_phone,
+               total_amount, created_at, items
+        FROM all_sales
+        WHERE invoice_number LIKE ?
+           OR customer_name LIKE ?
+           OR customer_phone LIKE ?
+        ORDER BY created_at DESC
+    ''',
+    "search.customers": '''
+        SELECT id, name, phone, email, total_purchases, last_purchase_date
+        FROM customers
+        WHERE name LIKE ? OR phone LIKE ? OR email LIKE ?
+        ORDER BY name
+    ''',
+    "search.stock": '''
+        SELECT sku, name, category, material, color, quantity, selling_price
+        FROM stock
+        WHERE is_active = 1
+          AND (sku LIKE ? OR name LIKE ? OR category LIKE ? OR material LIKE ?)
+        ORDER BY name
+    ''',
+
+    # Billing
+    "billing.available_stock": f'''
+        SELECT * FROM (
+            SELECT s.id, s.sku, s.name, s.category, s.material, s.color,
+                   s.quantity - {RESERVED_BY_OTHERS_SQL} AS quantity,
+                   s.selling_price
+            FROM stock s
+            WHERE s.is_active = 1 AND s.quantity > 0
+        )
+        WHERE quantity > 0
+        ORDER BY name
+    ''',
+    "stock.for_sale": f'''
+        SELECT s.id, s.sku, s.name, s.category, s.selling_price,
+               s.quantity - {RESERVED_BY_OTHERS_SQL} AS available
+        FROM stock s
+        WHERE s.id = ? AND s.is_active = 1
+    ''',
+    "reservations.release_cart": "DELETE FROM stock_reservations WHERE cart_id = ?",
+    "customers.by_phone": "SELECT id FROM customers WHERE phone = ?",
+    "customers.by_id": "SELECT * FROM customers WHERE id = ?",
+
+    # Customer purchase history (run against all_sales, archives included)
+    "customers.lifetime": '''
+        SELECT COUNT(*) AS bills, COALESCE(SUM(total_amount), 0) AS spent,
+               COALESCE(AVG(total_amount), 0) AS average_bill,
+               MIN(created_at) AS first_purchase, MAX(created_at) AS last_purchase
+        FROM all_sales
+        WHERE customer_id = ?
+    ''',
+    "customers.history": '''
+        SELECT id, invoice_number, created_at, total_amount, discount,
+               payment_method, items
+        FROM all_sales
+        WHERE customer_id = ?
+        ORDER BY created_at DESC
+        LIMIT ? OFFSET ?
+    ''',
+    # RFM inputs per customer; recency arrives as fractional days so only numbers cross into Python
+    "customers.rfm": '''
+        SELECT c.id, julianday(?) - julianday(f.last_purchase), f.bills,
+               COALESCE(c.total_purchases, 0)
+        FROM customers c
+        JOIN (
+            SELECT customer_id, COUNT(*) AS bills, MAX(created_at) AS last_purchase
+            FROM all_sales
+            WHERE customer_id IS NOT NULL
+            GROUP BY customer_id
+        ) f ON f.customer_id = c.id
+        ORDER BY c.id
+    ''',
+    "customers.add_purchase": '''
+        UPDATE customers
+        SET total_purchases = total_purchases + ?,
+            last_purchase_date = ?
+        WHERE id = ?
+    ''',
+    "customers.insert": '''
+        INSERT INTO customers (name, phone, total_purchases, last_purchase_date)
+        VALUES (?, ?, ?, ?)
+    ''',
+    "sales.insert": '''
+        INSERT INTO sales (
+            invoice_number, customer_id, customer_name, customer_phone,
+            items, subtotal, discount, gst_amount, total_amount,
+            payment_method, payment_status, sold_by, created_at
+        ) VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?)
+    ''',
+    "stock.decrement": '''
+        UPDATE stock
+        SET quantity = quantity - ?,
+            last_updated = ?
+        WHERE id = ?
+    ''',
+
+    # Login
+    "users.by_username": "SELECT * FROM users WHERE username = ?",
+    "users.set_password_hash": "UPDATE users SET password_hash = ? WHERE id = ?",
+    "users.touch_login": "UPDATE users SET last_login = ? WHERE id = ?",
+}
+
+
+def query_key(query):
+    """Stats key for ad-hoc SQL: the statement with whitespace collapsed"""
+    return re.sub(r"\s+", " ", query).strip()[:120]
+
+
+class QueryStats:
+    """Thread-safe per-query call counts, latency samples and row counts"""
+
+    def __init__(self, slow_ms=AppConfig.SLOW_QUERY_MS, samples=AppConfig.QUERY_STATS_SAMPLES):
+        self.slow_ms = slow_ms
+        self.samples = samples
+        self._stats = {}
+        self._explained = set()
+        self._lock = threading.Lock()
+
+    def record(self, name, duration_ms, rows):
+        with self._lock:
+            entry = self._stats.get(name)
+            if entry is None:
+                entry = self._stats[name] = {
+                    "calls": 0, "total_ms": 0.0, "max_ms": 0.0, "rows": 0,
+                    "latencies": deque(maxlen=self.samples),
+                }
+            entry["calls"] += 1
+            entry["total_ms"] += duration_ms
+            entry["max_ms"] = max(entry["max_ms"], duration_ms)
+            entry["rows"] += rows
+            entry["latencies"].append(duration_ms)
+
+    def check_slow(self, conn, name, query, params, duration_ms):
+        """Log a slow query, with its plan the first time it is seen"""
+        if duration_ms < self.slow_ms:
+            return
+        with self._lock:
+            first = name not in self._explained
+            self._explained.add(name)
+        if not first:
+            logger.warning(f"Slow query {name}: {duration_ms:.0f} ms")
+            return
+        try:
+            plan = conn.execute(f"EXPLAIN QUERY PLAN {query}", params).fetchall()
+            plan_text = "\n".join(f"  {row[3]}" for row in plan)
+        except Exception as e:
+            plan_text = f"  (no plan: {e})"
+        logger.warning(f"Slow query {name}: {duration_ms:.0f} ms\n{plan_text}")
+
+    @staticmethod
+    def _percentile(ordered, fraction):
+        index = min(len(ordered) - 1, int(round(fraction * (len(ordered) - 1))))
+        return ordered[index]
+
+    def report(self):
+        """Per-query summary, most total time first"""
+        with self._lock:
+            snapshot = {name: dict(entry, latencies=sorted(entry["latencies"]))
+                        for name, entry in self._stats.items()}
+        rows = []
+        for name, entry in snapshot.items():
+            ordered = entry["latencies"]
+            rows.append({
+                "query": name,
+                "calls": entry["calls"],
+                "total_ms": round(entry["total_ms"], 1),
+                "p50_ms": round(self._percentile(ordered, 0.50), 2),
+                "p95_ms": round(self._percentile(ordered, 0.95), 2),
+                "p99_ms": round(self._percentile(ordered, 0.99), 2),
+                "max_ms": round(entry["max_ms"], 2),
+                "rows": entry["rows"],
+            })
+        return sorted(rows, key=lambda row: row["total_ms"], reverse=True)
+
+    def format_report(self):
+        """Plain-text table of ``report()``"""
+        lines = [f"{'calls':>7} {'total ms':>10} {'p50':>8} {'p95':>8} {'p99':>8} {'max':>8} {'rows':>8}  query"]
+        for row in self.report():
+            lines.append(
+                f"{row['calls']:>7} {row['total_ms']:>10.1f} {row['p50_ms']:>8.2f} {row['p95_ms']:>8.2f} "
+                f"{row['p99_ms']:>8.2f} {row['max_ms']:>8.2f} {row['rows']:>8}  {row['query']}"
+            )
+        return "\n".join(lines)
+
+    def reset(self):
+        with self._lock:
+            self._stats.clear()
+            self._explained.clear()
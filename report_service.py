@@ -0,0 +1,37 @@
+"""
+Report data without the UI
+Everything the Reports screen and the dashboard cards show, as plain
+Python values, so reports can also be produced by background jobs.
+"""
+from analytics import SalesAnalytics, period_range
+from sales_rollups import SalesRollups
+
+
+class ReportService:
+    """Period reports and dashboard metrics"""
+
+    def __init__(self, db):
+        self.db = db
+        self.analytics = SalesAnalytics(db)
+        self.rollups = SalesRollups(db)
+
+    def period_report(self, period="week", top_n=10):
+        """Summary metrics, trend and top items for a named period"""
+        report = self.analytics.summary(period, top_n=top_n)
+        start, end = period_range(period)
+        # Top sellers come from the daily aggregates rather than grouping line items
+        report['top_items'] = [dict(row) for row in self.rollups.top_items(start, end, limit=top_n)]
+        return report
+
+    def dashboard_metrics(self, recent_limit=8):
+        """Today's and this month's totals, low stock count and recent sales"""
+        today = self.db.get_today_sales()
+        month = self.db.run_query("sales.month_totals", fetch_one=True)
+        return {
+            'today_sales': today['total_sales'] or 0,
+            'today_transactions': today['transaction_count'] or 0,
+            'month_total': month['total'] or 0,
+            'month_transactions': month['count'] or 0,
+            'low_stock_count': len(self.db.get_low_stock_items()),
+            'recent_transactions': self.db.get_recent_transactions(recent_limit),
+        }
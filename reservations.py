@@ -0,0 +1,108 @@
+"""
+Soft stock reservations for open billing carts
+Items added to a cart are held for a limited time so another counter
+cannot sell the same pieces while a long session is still in progress.
+"""
+import uuid
+import logging
+from datetime import datetime, timedelta
+from config import AppConfig
+
+logger = logging.getLogger(__name__)
+
+# Active reserved quantity for the stock row aliased as ``s``, excluding one cart.
+# Resolved entirely from the covering index idx_reservations_stock.
+RESERVED_BY_OTHERS_SQL = '''
+    COALESCE((
+        SELECT SUM(r.quantity) FROM stock_reservations r
+        WHERE r.stock_id = s.id AND r.expires_at > ? AND r.cart_id != ?
+    ), 0)
+'''
+
+
+class ReservationManager:
+    """Reserve, release and expire stock held by billing carts"""
+
+    def __init__(self, db, ttl_minutes=AppConfig.RESERVATION_TTL_MINUTES):
+        self.db = db
+        self.ttl = timedelta(minutes=ttl_minutes)
+
+    @staticmethod
+    def new_cart_id():
+        """Generate an identifier for a new billing cart"""
+        return uuid.uuid4().hex
+
+    def _now(self):
+        return datetime.now().isoformat()
+
+    def _expiry(self):
+        return (datetime.now() + self.ttl).isoformat()
+
+    def available_quantity(self, stock_id, cart_id=""):
+        """Quantity of an item that the given cart may still take"""
+        query = f'''
+            SELECT s.quantity - {RESERVED_BY_OTHERS_SQL} AS available
+            FROM stock s WHERE s.id = ?
+        '''
+        row = self.db.execute_query(query, (self._now(), cart_id, stock_id), fetch_one=True)
+        return max(row['available'], 0) if row else 0
+
+    def reserve(self, cart_id, stock_id, quantity):
+        """Set the cart's reservation for an item to ``quantity``
+
+        Returns False without changing anything when other carts already
+        hold too much of the item.
+        """
+        now = self._now()
+        with self.db.get_connection() as conn:
+            # Serialise the check-and-set against other counters
+            conn.execute("BEGIN IMMEDIATE")
+            row = conn.execute(
+                f'''SELECT s.quantity - {RESERVED_BY_OTHERS_SQL} AS available
+                    FROM stock s WHERE s.id = ?''',
+                (now, cart_id, stock_id)
+            ).fetchone()
+            if not row or quantity > row['available']:
+                return False
+
+            conn.execute('''
+                INSERT INTO stock_reservations (stock_id, cart_id, quantity, expires_at)
+                VALUES (?, ?, ?, ?)
+                ON CONFLICT (cart_id, stock_id)
+                DO UPDATE SET quantity = excluded.quantity, expires_at = excluded.expires_at
+            ''', (stock_id, cart_id, quantity, self._expiry()))
+            # Any activity on the cart keeps the whole cart alive
+            conn.execute(
+                "UPDATE stock_reservations SET expires_at = ? WHERE cart_id = ?",
+                (self._expiry(), cart_id)
+            )
+        return True
+
+    def release(self, cart_id, stock_id=None):
+        """Release one item, or the whole cart when ``stock_id`` is None"""
+        if stock_id is None:
+            self.db.execute_query(
+                "DELETE FROM stock_reservations WHERE cart_id = ?", (cart_id,)
+            )
+        else:
+            self.db.execute_query(
+                "DELETE FROM stock_reservations WHERE cart_id = ? AND stock_id = ?",
+                (cart_id, stock_id)
+            )
+
+    def touch(self, cart_id):
+        """Extend the expiry of every reservation held by a cart"""
+        self.db.execute_query(
+            "UPDATE stock_reservations SET expires_at = ? WHERE cart_id = ?",
+            (self._expiry(), cart_id)
+        )
+
+    def sweep_expired(self):
+        """Delete expired reservations; returns the number removed"""
+        with self.db.get_connection() as conn:
+            removed = conn.execute(
+                "DELETE FROM stock_reservations WHERE expires_at <= ?", (self._now(),)
+            ).rowcount
+        if removed:
+            logger.info(f"Swept {removed} expired stock reservation(s)")
+        return removed
@@ -0,0 +1,295 @@
+"""
+Offline sale journal for each billing terminal
+When the shared database is locked or unreachable, completed sales are
+appended to a local JSONL journal (fsync'd before the bill is confirmed)
+instead of being lost. A replayer later writes them to the database in
+batches. Replays are idempotent: every entry carries a journal id that is
+recorded in ``journal_replays`` in the same transaction as the sale.
+
+Stock sold offline may since have been sold or adjusted elsewhere. Such
+lines are still recorded (the goods have left the shop); stock is clamped
+at zero and the shortfall is kept in ``journal_replays.conflicts`` for the
+stock count to follow up.
+
+Usage:
+    python sale_journal.py [--db boutique_management.db] [--journal sale_journal.jsonl]
+    python sale_journal.py --benchmark [--sales 10000] [--entries 5000]
+"""
+import os
+import json
+import time
+import uuid
+import logging
+import sqlite3
+import threading
+from datetime import datetime
+from config import AppConfig
+
+logger = logging.getLogger(__name__)
+
+# SQLite result codes meaning the database could not be reached or written right now
+UNAVAILABLE_CODES = {5, 6, 14}  # SQLITE_BUSY, SQLITE_LOCKED, SQLITE_CANTOPEN
+UNAVAILABLE_MESSAGES = ("database is locked", "database table is locked", "busy", "unable to open")
+
+
+def is_unavailable(error):
+    """True for errors that mean "try again later", not bugs in the SQL or schema"""
+    if not isinstance(error, sqlite3.OperationalError):
+        return False
+    code = getattr(error, "sqlite_errorcode", None)
+    if code is not None:
+        # Extended codes carry the primary code in the low byte
+        return (code & 0xFF) in UNAVAILABLE_CODES
+    message = str(error).lower()
+    return any(text in message for text in UNAVAILABLE_MESSAGES)
+
+
+class SaleJournal:
+    """Append-only JSONL journal of sales not yet written to the database"""
+
+    def __init__(self, path=AppConfig.SALE_JOURNAL_FILE):
+        self.path = path
+        self._lock = threading.Lock()
+
+    def append(self, sale_data, cart, cart_id=None):
+        """Durably record one prepared sale; returns its journal id"""
+        entry = {
+            "journal_id": uuid.uuid4().hex,
+            "journaled_at": datetime.now().isoformat(),
+            "cart_id": cart_id,
+            "sale": sale_data,
+            "cart": cart,
+        }
+        line = json.dumps(entry, separators=(",", ":")) + "\n"
+        with self._lock:
+            with open(self.path, "a", encoding="utf-8") as f:
+                f.write(line)
+                f.flush()
+                os.fsync(f.fileno())
+        logger.warning(f"Sale {sale_data['invoice_number']} journaled offline ({entry['journal_id']})")
+        return entry["journal_id"]
+
+    def entries(self):
+        """Every complete entry in the journal, oldest first"""
+        if not os.path.exists(self.path):
+            return []
+        entries = []
+        with self._lock, open(self.path, encoding="utf-8") as f:
+            for number, line in enumerate(f, 1):
+                try:
+                    entries.append(json.loads(line))
+                except ValueError:
+                    # A torn final line was never fsync'd, so its bill was never confirmed
+                    logger.warning(f"Skipping unreadable line {number} of {self.path}")
+        return entries
+
+    def pending_count(self):
+        return len(self.entries())
+
+    def _compact(self, done_ids):
+        """Drop replayed entries, keeping anything appended meanwhile"""
+        with self._lock:
+            with open(self.path, encoding="utf-8") as f:
+                keep = [line for line in f if line.strip() and not self._is_done(line, done_ids)]
+            if not keep:
+                os.remove(self.path)
+                return
+            temp_path = self.path + ".tmp"
+            with open(temp_path, "w", encoding="utf-8") as f:
+                f.writelines(keep)
+                f.flush()
+                os.fsync(f.fileno())
+            os.replace(temp_path, self.path)
+
+    @staticmethod
+    def _is_done(line, done_ids):
+        try:
+            return json.loads(line)["journal_id"] in done_ids
+        except (ValueError, KeyError):
+            return True
+
+    def replay(self, db, batch_size=AppConfig.JOURNAL_REPLAY_BATCH):
+        """Write journaled sales to ``db`` in batches; returns a summary
+
+        Stops at the first batch the database refuses with an availability
+        error, leaving that batch and the rest in the journal for next time.
+        """
+        from sales_service import SalesService
+
+        sales = SalesService(db)
+        entries = self.entries()
+        summary = {"replayed": 0, "skipped": 0, "failed": 0, "conflicts": 0, "pending": len(entries)}
+        done = set()
+        started = time.perf_counter()
+        try:
+            for offset in range(0, len(entries), batch_size):
+                batch = entries[offset:offset + batch_size]
+                # Counted only once the batch has committed; a rolled back batch is retried
+                batch_done, batch_counts = [], {}
+                try:
+                    with db.get_connection() as conn:
+                        conn.execute("BEGIN IMMEDIATE")
+                        for entry in batch:
+                            conn.execute("SAVEPOINT entry")
+                            try:
+                                outcome = self._replay_entry(conn, sales, entry)
+                                conn.execute("RELEASE entry")
+                            except Exception as e:
+                                if is_unavailable(e):
+                                    raise
+                                # Left in the journal; a bad entry must not block the rest
+                                conn.execute("ROLLBACK TO entry")
+                                conn.execute("RELEASE entry")
+                                logger.error(f"Journal entry {entry.get('journal_id')} failed to replay: {e}")
+                                outcome = "failed"
+                            else:
+                                batch_done.append(entry["journal_id"])
+                            batch_counts[outcome] = batch_counts.get(outcome, 0) + 1
+                except sqlite3.OperationalError as e:
+                    if not is_unavailable(e):
+                        raise
+                    logger.warning(f"Database still unavailable, journal replay paused: {e}")
+                    break
+                done.update(batch_done)
+                for outcome, count in batch_counts.items():
+                    summary[outcome] += count
+        finally:
+            # Only entries from committed batches are dropped
+            if done:
+                self._compact(done)
+        summary["pending"] = len(entries) - len(done)
+        summary["seconds"] = round(time.perf_counter() - started, 3)
+        if done:
+            logger.info(f"Journal replay: {summary}")
+        return summary
+
+    def _replay_entry(self, conn, sales, entry):
+        """Record one entry; returns the summary key it counts towards"""
+        journal_id = entry["journal_id"]
+        if conn.execute("SELECT 1 FROM journal_replays WHERE journal_id = ?", (journal_id,)).fetchone():
+            # Replayed before, but the journal was not compacted afterwards
+            return "skipped"
+
+        sale_data, cart = entry["sale"], entry["cart"]
+        conflicts = []
+        for item in cart:
+            row = conn.execute("SELECT quantity FROM stock WHERE id = ?", (item["id"],)).fetchone()
+            available = row["quantity"] if row else 0
+            if available < item["quantity"]:
+                conflicts.append({"sku": item["sku"], "sold": item["quantity"], "in_stock": available})
+
+        invoice_number = sale_data["invoice_number"]
+        sales.record(conn, sale_data, cart, entry.get("cart_id"), check_stock=False)
+        if sale_data["invoice_number"] != invoice_number:
+            conflicts.append({"invoice_renumbered": invoice_number, "as": sale_data["invoice_number"]})
+        if conflicts:
+            conn.executemany(
+                "UPDATE stock SET quantity = 0 WHERE id = ? AND quantity < 0",
+                [(item["id"],) for item in cart]
+            )
+            logger.warning(f"Journaled sale {invoice_number} replayed with conflicts: {conflicts}")
+
+        conn.execute(
+            "INSERT INTO journal_replays (journal_id, sale_id, invoice_number, replayed_at, conflicts) "
+            "VALUES (?, ?, ?, ?, ?)",
+            (journal_id, sale_data["id"], sale_data["invoice_number"], datetime.now().isoformat(),
+             json.dumps(conflicts) if conflicts else None)
+        )
+        return "conflicts" if conflicts else "replayed"
+
+
+class JournalSyncScheduler:
+    """Periodically replay the journal on a worker thread while entries are pending"""
+
+    def __init__(self, root, journal, db, interval_ms=AppConfig.JOURNAL_SYNC_INTERVAL_MS):
+        self.root = root
+        self.journal = journal
+        self.db = db
+        self.interval_ms = interval_ms
+        self._worker = None
+        self._after_id = root.after(interval_ms, self._tick)
+
+    def _tick(self):
+        busy = self._worker is not None and self._worker.is_alive()
+        if not busy and os.path.exists(self.journal.path):
+            self._worker = threading.Thread(target=self._run, daemon=True)
+            self._worker.start()
+        self._after_id = self.root.after(self.interval_ms, self._tick)
+
+    def _run(self):
+        try:
+            self.journal.replay(self.db)
+        except Exception as e:
+            logger.error(f"Journal replay failed: {e}")
+
+    def stop(self):
+        """Stop scheduling further replays"""
+        if self._after_id:
+            self.root.after_cancel(self._after_id)
+            self._after_id = None
+
+
+def benchmark(sales=10_000, entries=5000, batch_size=AppConfig.JOURNAL_REPLAY_BATCH, seed=42):
+    """Journal append rate (fsync per sale) and replay throughput into a generated dataset"""
+    import random
+    import shutil
+    import tempfile
+    from database import Database
+    from generate_data import generate
+    from sales_service import SalesService
+
+    work_dir = tempfile.mkdtemp(prefix="boutique_journal_")
+    try:
+        db_path = os.path.join(work_dir, "bench.db")
+        generate(db_path, sales, seed)
+        db = Database(db_path)
+        service = SalesService(db)
+        stock = [dict(row) for row in db.execute_query(
+            "SELECT id, sku, name, category, selling_price FROM stock", fetch_all=True)]
+        journal = SaleJournal(os.path.join(work_dir, "journal.jsonl"))
+
+        rng = random.Random(seed)
+        started = time.perf_counter()
+        for _ in range(entries):
+            cart = [{"id": item["id"], "sku": item["sku"], "name": item["name"],
+                     "category": item["category"], "price": item["selling_price"],
+                     "quantity": 1, "total": item["selling_price"]}
+                    for item in rng.sample(stock, rng.randint(1, 3))]
+            journal.append(service.prepare(cart, "benchmark"), cart)
+        append_seconds = time.perf_counter() - started
+
+        summary = journal.replay(db, batch_size)
+        # A second pass retries failures; replayed entries are not written twice
+        again = journal.replay(db, batch_size)
+        return {
+            "entries": entries,
+            "appends_per_second": round(entries / append_seconds, 1),
+            "replayed": summary["replayed"] + summary["conflicts"],
+            "conflicts": summary["conflicts"],
+            "failed": summary["failed"],
+            "replay_per_second": round((summary["replayed"] + summary["conflicts"]) / summary["seconds"], 1),
+            "pending_after": again["pending"],
+        }
+    finally:
+        shutil.rmtree(work_dir, ignore_errors=True)
+
+
+if __name__ == "__main__":
+    import argparse
+
+    parser = argparse.ArgumentParser(description="Replay the offline sale journal into the database")
+    parser.add_argument("--db", default=AppConfig.DB_NAME, help="database file")
+    parser.add_argument("--journal", default=AppConfig.SALE_JOURNAL_FILE, help="journal file")
+    parser.add_argument("--benchmark", action="store_true", help="measure append and replay throughput")
+    parser.add_argument("--sales", type=int, default=10_000, help="benchmark dataset size")
+    parser.add_argument("--entries", type=int, default=5000, help="journal entries to benchmark")
+    args = parser.parse_args()
+
+    logging.basicConfig(level=logging.INFO, format="%(levelname)s %(message)s")
+    if args.benchmark:
+        logging.getLogger().setLevel(logging.ERROR)
+        print(json.dumps(benchmark(args.sales, args.entries), indent=2))
+    else:
+        from database import Database
+
+        print(json.dumps(SaleJournal(args.journal).replay(Database(args.db)), indent=2))
@@ -0,0 +1,254 @@
+"""
+Columnar export of sales history for offline analysis
+Streams sales and sale_items into year/month partitioned files under the
+export directory (Parquet with zstd when pyarrow is installed, gzip CSV
+otherwise). Rows without a usable timestamp go to an 'unknown' partition.
+Each run only exports rows added since the previous one.
+
+Usage: python sales_export.py [--db boutique_management.db] [--out exports] [--full]
+"""
+import os
+import csv
+import gzip
+import json
+import shutil
+import logging
+from datetime import datetime
+from config import AppConfig
+
+try:
+    import pyarrow as pa
+    import pyarrow.parquet as pq
+except ImportError:  # Optional dependency; fall back to gzip CSV
+    pa = None
+    pq = None
+
+logger = logging.getLogger(__name__)
+
+STATE_FILE = "export_state.json"
+
+# Partition for rows whose timestamp is missing or not a YYYY-MM-... date
+UNKNOWN_PARTITION = "unknown"
+
+def partition_key(value):
+    """'YYYY-MM' for a timestamp, or UNKNOWN_PARTITION when it is NULL or malformed"""
+    if value is None:
+        return UNKNOWN_PARTITION
+    key = str(value)[:7]
+    year, _, month = key.partition("-")
+    if len(year) != 4 or len(month) != 2 or not (year + month).isdigit():
+        return UNKNOWN_PARTITION
+    return key
+
+
+# table -> (query returning rows with id > watermark in id order, columns, timestamp column)
+EXPORT_TABLES = {
+    "sales": (
+        '''
+        SELECT id, invoice_number, customer_id, customer_name, customer_phone,
+               subtotal, discount, gst_amount, total_amount, payment_method,
+               payment_status, sold_by, created_at
+        FROM sales
+        WHERE id > ? AND id <= ?
+        ORDER BY id
+        ''',
+        [
+            ("id", "int64"), ("invoice_number", "string"), ("customer_id", "int64"),
+            ("customer_name", "string"), ("customer_phone", "string"),
+            ("subtotal", "float64"), ("discount", "float64"), ("gst_amount", "float64"),
+            ("total_amount", "float64"), ("payment_method", "string"),
+            ("payment_status", "string"), ("sold_by", "string"), ("created_at", "timestamp"),
+        ],
+        "created_at",
+    ),
+    "sale_items": (
+        '''
+        SELECT si.id, si.sale_id, si.stock_id, si.sku, si.item_name, si.category,
+               si.quantity, si.unit_price, si.total_price, s.created_at AS sold_at
+        FROM sale_items si JOIN sales s ON s.id = si.sale_id
+        WHERE si.id > ? AND si.id <= ?
+        ORDER BY si.id
+        ''',
+        [
+            ("id", "int64"), ("sale_id", "int64"), ("stock_id", "int64"), ("sku", "string"),
+            ("item_name", "string"), ("category", "string"), ("quantity", "int64"),
+            ("unit_price", "float64"), ("total_price", "float64"), ("sold_at", "timestamp"),
+        ],
+        "sold_at",
+    ),
+}
+
+
+def _parse_timestamp(value):
+    return datetime.fromisoformat(value) if value else None
+
+
+class _ParquetPart:
+    """One Parquet part file, written incrementally row group by row group"""
+
+    extension = ".parquet"
+
+    def __init__(self, path, columns):
+        types = {"int64": pa.int64(), "float64": pa.float64(),
+                 "string": pa.string(), "timestamp": pa.timestamp("us")}
+        self.schema = pa.schema([pa.field(name, types[kind]) for name, kind in columns])
+        self.columns = columns
+        self.writer = pq.ParquetWriter(path, self.schema, compression="zstd")
+
+    def write(self, rows):
+        arrays = []
+        for index, (name, kind) in enumerate(self.columns):
+            values = [row[index] for row in rows]
+            if kind == "timestamp":
+                values = [_parse_timestamp(v) for v in values]
+            arrays.append(values)
+        self.writer.write_table(pa.Table.from_arrays(
+            [pa.array(values, type=field.type) for values, field in zip(arrays, self.schema)],
+            schema=self.schema
+        ))
+
+    def close(self):
+        self.writer.close()
+
+
+class _CsvPart:
+    """One gzip-compressed CSV part file"""
+
+    extension = ".csv.gz"
+
+    def __init__(self, path, columns):
+        self.file = gzip.open(path, "wt", compresslevel=6, newline="", encoding="utf-8")
+        self.writer = csv.writer(self.file)
+        self.writer.writerow([name for name, _ in columns])
+
+    def write(self, rows):
+        self.writer.writerows(rows)
+
+    def close(self):
+        self.file.close()
+
+
+class SalesExporter:
+    """Incremental, partitioned export of sales and sale_items"""
+
+    def __init__(self, db, output_dir=AppConfig.EXPORT_DIR,
+                 chunk_size=AppConfig.EXPORT_CHUNK_SIZE, use_parquet=None):
+        self.db = db
+        self.output_dir = output_dir
+        self.chunk_size = chunk_size
+        self.use_parquet = (pa is not None) if use_parquet is None else use_parquet
+        if self.use_parquet and pa is None:
+            raise RuntimeError("pyarrow is required for Parquet export")
+        self.part_class = _ParquetPart if self.use_parquet else _CsvPart
+
+    # State ---------------------------------------------------------------
+
+    def _state_path(self):
+        return os.path.join(self.output_dir, STATE_FILE)
+
+    def load_state(self):
+        """Last exported id per table"""
+        try:
+            with open(self._state_path(), encoding="utf-8") as f:
+                return json.load(f)
+        except FileNotFoundError:
+            return {}
+
+    def _save_state(self, state):
+        tmp_path = self._state_path() + ".tmp"
+        with open(tmp_path, "w", encoding="utf-8") as f:
+            json.dump(state, f, indent=2)
+        os.replace(tmp_path, self._state_path())
+
+    def reset(self):
+        """Remove previous exports so the next run starts from the beginning"""
+        for table in EXPORT_TABLES:
+            shutil.rmtree(os.path.join(self.output_dir, table), ignore_errors=True)
+        if os.path.exists(self._state_path()):
+            os.remove(self._state_path())
+
+    # Export --------------------------------------------------------------
+
+    def export(self):
+        """Export new rows of every table; returns rows written per table"""
+        os.makedirs(self.output_dir, exist_ok=True)
+        state = self.load_state()
+        written = {}
+        with self.db.get_connection() as conn:
+            # One read transaction so sales and sale_items come from the same snapshot
+            conn.execute("BEGIN")
+            for table, (query, columns, time_column) in EXPORT_TABLES.items():
+                written[table] = self._export_table(conn, table, query, columns, time_column, state)
+        logger.info(f"Sales export finished: {written}")
+        return written
+
+    def _export_table(self, conn, table, query, columns, time_column, state):
+        upper = conn.execute(f"SELECT COALESCE(MAX(id), 0) FROM {table}").fetchone()[0]
+        watermark = state.get(table, 0)
+        if upper <= watermark:
+            return 0
+
+        time_index = [name for name, _ in columns].index(time_column)
+        cursor = conn.execute(query, (watermark, upper))
+        part, partition, part_paths, count = None, None, None, 0
+
+        def finish():
+            part.close()
+            os.replace(*part_paths)
+            # Persist progress per finished part so an interrupted run resumes cleanly
+            state[table] = last_id
+            self._save_state(state)
+
+        while True:
+            rows = cursor.fetchmany(self.chunk_size)
+            if not rows:
+                break
+            rows = [tuple(row) for row in rows]
+            # Rows arrive in id order, which follows time, so partitions are contiguous
+            start = 0
+            while start < len(rows):
+                key = partition_key(rows[start][time_index])
+                end = start
+                while end < len(rows) and partition_key(rows[end][time_index]) == key:
+                    end += 1
+                if key != partition:
+                    if part:
+                        finish()
+                    partition = key
+                    part_paths = self._part_paths(table, key, rows[start][0])
+                    part = self.part_class(part_paths[0], columns)
+                part.write(rows[start:end])
+                last_id = rows[end - 1][0]
+                count += end - start
+                start = end
+        if part:
+            finish()
+        return count
+
+    def _part_paths(self, table, year_month, first_id):
+        if year_month == UNKNOWN_PARTITION:
+            directory = os.path.join(self.output_dir, table, UNKNOWN_PARTITION)
+        else:
+            year, month = year_month.split("-")
+            directory = os.path.join(self.output_dir, table, f"year={year}", f"month={month}")
+        os.makedirs(directory, exist_ok=True)
+        path = os.path.join(directory, f"part-{first_id:010d}{self.part_class.extension}")
+        return path + ".tmp", path
+
+
+if __name__ == "__main__":
+    import argparse
+    from database import Database
+
+    parser = argparse.ArgumentParser(description="Export sales history to partitioned columnar files")
+    parser.add_argument("--db", default=AppConfig.DB_NAME, help="database file")
+    parser.add_argument("--out", default=AppConfig.EXPORT_DIR, help="export directory")
+    parser.add_argument("--full", action="store_true", help="discard previous exports and start over")
+    parser.add_argument("--csv", action="store_true", help="write gzip CSV even if pyarrow is installed")
+    args = parser.parse_args()
+
+    logging.basicConfig(level=logging.INFO, format="%(levelname)s %(message)s")
+    exporter = SalesExporter(Database(args.db), args.out, use_parquet=False if args.csv else None)
+    if args.full:
+        exporter.reset()
+    print(json.dumps(exporter.export(), indent=2))
@@ -0,0 +1,116 @@
+"""
+Materialized daily sales aggregates
+Per-day totals for every SKU and category are kept up to date at checkout,
+so top-N and category revenue for any period are small range scans over
+(sale_date, key) primary keys instead of a GROUP BY over every line item.
+"""
+import logging
+
+logger = logging.getLogger(__name__)
+
+SKU_UPSERT_SQL = '''
+    INSERT INTO daily_sku_sales (sale_date, sku, stock_id, item_name, category, quantity, revenue)
+    VALUES (?, ?, ?, ?, ?, ?, ?)
+    ON CONFLICT (sale_date, sku) DO UPDATE SET
+        stock_id = excluded.stock_id,
+        item_name = excluded.item_name,
+        category = excluded.category,
+        quantity = quantity + excluded.quantity,
+        revenue = revenue + excluded.revenue
+'''
+
+CATEGORY_UPSERT_SQL = '''
+    INSERT INTO daily_category_sales (sale_date, category, quantity, revenue)
+    VALUES (?, ?, ?, ?)
+    ON CONFLICT (sale_date, category) DO UPDATE SET
+        quantity = quantity + excluded.quantity,
+        revenue = revenue + excluded.revenue
+'''
+
+SKU_REBUILD_SQL = '''
+    INSERT INTO daily_sku_sales (sale_date, sku, stock_id, item_name, category, quantity, revenue)
+    SELECT substr(s.created_at, 1, 10), si.sku, MAX(si.stock_id), MAX(si.item_name),
+           COALESCE(MAX(si.category), 'Uncategorised'), SUM(si.quantity), SUM(si.total_price)
+    FROM sale_items si JOIN sales s ON s.id = si.sale_id
+    GROUP BY substr(s.created_at, 1, 10), si.sku
+'''
+
+CATEGORY_REBUILD_SQL = '''
+    INSERT INTO daily_category_sales (sale_date, category, quantity, revenue)
+    SELECT sale_date, category, SUM(quantity), SUM(revenue)
+    FROM daily_sku_sales
+    GROUP BY sale_date, category
+'''
+
+
+def rebuild_rollups(conn):
+    """Recompute both aggregate tables from sale_items"""
+    conn.execute("DELETE FROM daily_sku_sales")
+    conn.execute("DELETE FROM daily_category_sales")
+    conn.execute(SKU_REBUILD_SQL)
+    conn.execute(CATEGORY_REBUILD_SQL)
+
+
+class SalesRollups:
+    """Maintain and query the per-day SKU and category aggregates"""
+
+    def __init__(self, db):
+        self.db = db
+
+    @staticmethod
+    def record_sale(conn, created_at, items):
+        """Add a completed sale's cart lines to the aggregates
+
+        Runs on the caller's connection so the aggregates commit or roll
+        back together with the sale itself.
+        """
+        sale_date = str(created_at)[:10]
+        sku_rows = {}
+        category_rows = {}
+        for item in items:
+            category = item.get('category') or 'Uncategorised'
+            qty, revenue = item['quantity'], item['total']
+
+            row = sku_rows.setdefault(
+                item['sku'], [sale_date, item['sku'], item['id'], item['name'], category, 0, 0.0]
+            )
+            row[5] += qty
+            row[6] += revenue
+
+            totals = category_rows.setdefault(category, [sale_date, category, 0, 0.0])
+            totals[2] += qty
+            totals[3] += revenue
+
+        conn.executemany(SKU_UPSERT_SQL, sku_rows.values())
+        conn.executemany(CATEGORY_UPSERT_SQL, category_rows.values())
+
+    def top_items(self, start, end, limit=10):
+        """Best-selling SKUs by quantity for sale dates in [start, end)"""
+        query = '''
+            SELECT sku, MAX(item_name) AS name, SUM(quantity) AS quantity,
+                   SUM(revenue) AS revenue
+            FROM daily_sku_sales
+            WHERE sale_date >= ? AND sale_date < ?
+            GROUP BY sku
+            ORDER BY quantity DESC, revenue DESC
+            LIMIT ?
+        '''
+        return self.db.execute_query(query, (start, end, limit), fetch_all=True)
+
+    def top_categories(self, start, end, limit=5):
+        """Categories by revenue for sale dates in [start, end)"""
+        query = '''
+            SELECT category, SUM(quantity) AS quantity, SUM(revenue) AS revenue
+            FROM daily_category_sales
+            WHERE sale_date >= ? AND sale_date < ?
+            GROUP BY category
+            ORDER BY revenue DESC
+            LIMIT ?
+        '''
+        return self.db.execute_query(query, (start, end, limit), fetch_all=True)
+
+    def rebuild(self):
+        """Recompute the aggregates from scratch, e.g. after editing old sales"""
+        with self.db.get_connection() as conn:
+            rebuild_rollups(conn)
+        logger.info("Rebuilt daily sales aggregates")
@@ -0,0 +1,178 @@
+"""
+Time-bucketed sales series
+Builds a dense (label, total) series for hour/day/week/month buckets in a
+single SQLite query: a recursive CTE generates every bucket in the range and
+the per-bucket totals are left-joined onto it, so empty buckets come back as
+zero with their real date label.
+"""
+import time
+from datetime import datetime, timedelta
+
+# granularity: (bucket expression, next-bucket expression, key format, label format)
+GRANULARITIES = {
+    "hour": (
+        "strftime('%Y-%m-%d %H:00:00', {col})",
+        "strftime('%Y-%m-%d %H:00:00', bucket, '+1 hour')",
+        "%Y-%m-%d %H:00:00", "%H:00",
+    ),
+    "day": ("date({col})", "date(bucket, '+1 day')", "%Y-%m-%d", "%d %b"),
+    "week": ("date({col}, '-6 days', 'weekday 1')", "date(bucket, '+7 days')", "%Y-%m-%d", "%d %b"),
+    "month": ("date({col}, 'start of month')", "date(bucket, '+1 month')", "%Y-%m-%d", "%b %Y"),
+}
+
+# Report period -> granularity used to chart it
+PERIOD_GRANULARITY = {
+    "today": "hour",
+    "week": "day",
+    "month": "day",
+    "year": "month",
+}
+
+SERIES_SQL = '''
+    WITH RECURSIVE buckets(bucket) AS (
+        SELECT :first_bucket
+        UNION ALL
+        SELECT {next_bucket} FROM buckets
+        WHERE {next_bucket} < :end_bucket
+    ),
+    totals AS (
+        SELECT {bucket_expr} AS bucket, SUM({value}) AS total, COUNT(*) AS count
+        FROM {table}
+        WHERE {col} >= :range_start AND {col} < :range_end
+        GROUP BY bucket
+    )
+    SELECT b.bucket, COALESCE(t.total, 0) AS total, COALESCE(t.count, 0) AS count
+    FROM buckets b LEFT JOIN totals t ON t.bucket = b.bucket
+    ORDER BY b.bucket
+'''
+
+
+def align_bucket(granularity, value):
+    """Start of the bucket containing ``value`` (weeks start on Monday)"""
+    if granularity == "hour":
+        return value.replace(minute=0, second=0, microsecond=0)
+    day = value.replace(hour=0, minute=0, second=0, microsecond=0)
+    if granularity == "week":
+        return day - timedelta(days=day.weekday())
+    if granularity == "month":
+        return day.replace(day=1)
+    return day
+
+
+def bucket_series(conn, granularity, start, end, table="sales",
+                  time_column="created_at", value_column="total_amount"):
+    """Dense [(label, total, count)] for buckets from ``start`` up to ``end`` (exclusive)
+
+    ``start`` and ``end`` are datetimes; ``start`` is aligned down to its bucket.
+    The range filter compares whole-day strings so it can use an index on
+    ``time_column`` whether timestamps are stored with a 'T' or a space.
+    Sales are bucketed by the local time they were recorded at, ignoring any
+    UTC offset suffix.
+    """
+    if granularity not in GRANULARITIES:
+        raise ValueError(f"Unknown granularity: {granularity}")
+    bucket_expr, next_bucket, key_format, label_format = GRANULARITIES[granularity]
+
+    query = SERIES_SQL.format(
+        next_bucket=next_bucket,
+        # Wall-clock part only: SQLite shifts a timestamp carrying a UTC offset
+        # into UTC, which would move sales near midnight into another day
+        bucket_expr=bucket_expr.format(col=f"substr({time_column}, 1, 19)"),
+        value=value_column,
+        table=table,
+        col=time_column,
+    )
+    first = align_bucket(granularity, start)
+    last_day = align_bucket("day", end - timedelta(microseconds=1)) + timedelta(days=1)
+    params = {
+        "first_bucket": first.strftime(key_format),
+        "end_bucket": end.strftime(key_format),
+        "range_start": first.strftime("%Y-%m-%d"),
+        "range_end": last_day.strftime("%Y-%m-%d"),
+    }
+
+    return [
+        (datetime.strptime(key, key_format).strftime(label_format), total, count)
+        for key, total, count in conn.execute(query, params)
+    ]
+
+
+def period_bounds(period, now=None):
+    """(start, end) datetimes for a named report period; ``end`` is exclusive"""
+    now = now or datetime.now()
+    today = now.replace(hour=0, minute=0, second=0, microsecond=0)
+    if period == "today":
+        start = today
+    elif period == "week":
+        start = today - timedelta(days=6)
+    elif period == "month":
+        start = today.replace(day=1)
+    elif period == "year":
+        start = today.replace(month=1, day=1)
+    else:
+        raise ValueError(f"Unknown period: {period}")
+    return start, today + timedelta(days=1)
+
+
+def period_series(conn, period, now=None, **columns):
+    """Dense [(label, total)] series for a named report period"""
+    start, end = period_bounds(period, now)
+    series = bucket_series(conn, PERIOD_GRANULARITY[period], start, end, **columns)
+    return [(label, total) for label, total, _ in series]
+
+
+def benchmark(sales=1_000_000, db_path="series_benchmark.db", seed=7):
+    """Time each granularity over a year of synthetic sales"""
+    import os
+    import random
+    import sqlite3
+
+    if os.path.exists(db_path):
+        os.remove(db_path)
+    conn = sqlite3.connect(db_path)
+    conn.execute("CREATE TABLE sales (id INTEGER PRIMARY KEY, total_amount REAL, created_at TIMESTAMP)")
+    conn.execute("CREATE INDEX idx_sales_date_amount ON sales(created_at, total_amount)")
+
+    rng = random.Random(seed)
+    end = datetime.now().replace(hour=0, minute=0, second=0, microsecond=0) + timedelta(days=1)
+    start = end - timedelta(days=365)
+    span = int((end - start).total_seconds())
+    conn.executemany(
+        "INSERT INTO sales (total_amount, created_at) VALUES (?, ?)",
+        (
+            (float(rng.randrange(500, 50000)),
+             (start + timedelta(seconds=rng.randrange(span))).isoformat())
+            for _ in range(sales)
+        )
+    )
+    conn.commit()
+
+    ranges = {
+        "hour": (end - timedelta(days=1), end),
+        "day": (end - timedelta(days=30), end),
+        "week": (end - timedelta(weeks=12), end),
+        "month": (start, end),
+    }
+    timings = {}
+    for granularity, (range_start, range_end) in ranges.items():
+        t0 = time.perf_counter()
+        series = bucket_series(conn, granularity, range_start, range_end)
+        timings[granularity] = {
+            "buckets": len(series),
+            "sales": sum(count for _, _, count in series),
+            "ms": round((time.perf_counter() - t0) * 1000, 1),
+        }
+
+    conn.close()
+    os.remove(db_path)
+    return {"sales": sales, "timings": timings}
+
+
+if __name__ == "__main__":
+    import argparse
+    import json
+
+    parser = argparse.ArgumentParser(description="Benchmark the bucketed sales series")
+    parser.add_argument("--sales", type=int, default=1_000_000, help="number of sales rows")
+    args = parser.parse_args()
+    print(json.dumps(benchmark(args.sales), indent=2))
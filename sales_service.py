@@ -0,0 +1,214 @@
+"""
+Checkout without the UI
+Totals, customer upsert, the sale row, its line items, the daily aggregates
+and stock decrements for one completed sale. BillingSystem calls into this,
+and so can benchmarks, the API server and background jobs that have no display.
+"""
+import json
+import logging
+import sqlite3
+from datetime import datetime
+from config import AppConfig
+from utils import InvoiceGenerator, Validators
+from sales_rollups import SalesRollups
+from sale_journal import is_unavailable
+
+logger = logging.getLogger(__name__)
+
+INVOICE_NUMBER_ATTEMPTS = 10
+
+
+class SalesService:
+    """Record completed sales"""
+
+    def __init__(self, db, journal=None, customers=None):
+        self.db = db
+        self.journal = journal
+        # CustomerIndex to keep current with customers this service creates
+        self.customers = customers
+
+    @staticmethod
+    def calculate_totals(cart, discount=0):
+        """(subtotal, discount, gst_amount, total); the discount is capped at the subtotal"""
+        subtotal = sum(item['total'] for item in cart)
+        discount = min(max(discount, 0), subtotal)
+        taxable = subtotal - discount
+        gst_amount = taxable * (AppConfig.GST_RATE / 100)
+        return subtotal, discount, gst_amount, taxable + gst_amount
+
+    def price_cart(self, conn, lines, cart_id=""):
+        """Cart lines at current prices from ``[{'id': stock_id, 'quantity': n}, ...]``
+
+        Raises ValueError for unknown or inactive items and for quantities
+        beyond what is in stock and not held by other carts.
+        """
+        now = datetime.now().isoformat()
+        cart = []
+        for line in lines:
+            quantity = int(line.get('quantity', 0))
+            if quantity <= 0:
+                raise ValueError("Quantity must be at least 1!")
+            item = self.db.run_query_on(conn, "stock.for_sale", (now, cart_id, line.get('id')), fetch_one=True)
+            if not item:
+                raise ValueError(f"Item {line.get('id')} not found!")
+            if quantity > item['available']:
+                raise ValueError(f"Only {max(item['available'], 0)} of {item['sku']} available!")
+            cart.append({
+                'id': item['id'],
+                'sku': item['sku'],
+                'name': item['name'],
+                'category': item['category'],
+                'price': item['selling_price'],
+                'quantity': quantity,
+                'total': item['selling_price'] * quantity
+            })
+        return cart
+
+    def prepare(self, cart, sold_by, customer_name="Walk-in Customer", customer_phone=None,
+                discount=0, payment_method='Cash'):
+        """Validate a cart and build its sale data (no database access)
+
+        Cart lines are dicts with id, sku, name, category, price, quantity and
+        total, as built by the billing screen. Raises ValueError for an empty
+        cart or an invalid phone number.
+        """
+        if not cart:
+            raise ValueError("Cart is empty!")
+        if customer_phone and not Validators.validate_phone(customer_phone):
+            raise ValueError("Please enter a valid 10-digit phone number!")
+
+        subtotal, discount, gst_amount, total = self.calculate_totals(cart, discount)
+        return {
+            'invoice_number': InvoiceGenerator.generate_invoice_number(),
+            'customer_name': customer_name,
+            'customer_phone': customer_phone,
+            'items': json.dumps(cart),
+            'subtotal': subtotal,
+            'discount': discount,
+            'gst_amount': gst_amount,
+            'total_amount': total,
+            'payment_method': payment_method,
+            'payment_status': 'Completed',
+            'sold_by': sold_by,
+            'created_at': datetime.now().isoformat()
+        }
+
+    def check_stock(self, conn, cart, cart_id=None):
+        """Raise ValueError when a cart needs more than is in stock and not held by other carts
+
+        Run inside the sale's transaction: a cart whose holds expired may have
+        lost its stock to another counter since the items were added.
+        """
+        now = datetime.now().isoformat()
+        # stock id -> (sku, quantity across every line of the item)
+        wanted = {}
+        for item in cart:
+            sku, quantity = wanted.get(item['id'], (item['sku'], 0))
+            wanted[item['id']] = (sku, quantity + item['quantity'])
+        for stock_id, (sku, quantity) in wanted.items():
+            row = self.db.run_query_on(conn, "stock.for_sale", (now, cart_id or "", stock_id), fetch_one=True)
+            if not row:
+                raise ValueError(f"{sku} is no longer for sale!")
+            if quantity > row['available']:
+                raise ValueError(f"Only {max(row['available'], 0)} of {sku} left in stock!")
+
+    def record(self, conn, sale_data, cart, cart_id=None, check_stock=True):
+        """Write a prepared sale on the caller's connection; fills in its ids
+
+        Raises ValueError when stock ran out meanwhile, unless ``check_stock``
+        is False (journaled sales, whose goods have already left the shop).
+        """
+        if check_stock:
+            self.check_stock(conn, cart, cart_id)
+        created_at = sale_data['created_at']
+        total = sale_data['total_amount']
+        customer_phone = sale_data['customer_phone']
+
+        # Create the customer or add to their purchase history
+        customer_id = None
+        if customer_phone:
+            existing_customer = self.db.run_query_on(conn, "customers.by_phone", (customer_phone,), fetch_one=True)
+            if existing_customer:
+                customer_id = existing_customer['id']
+                self.db.run_query_on(conn, "customers.add_purchase", (total, created_at, customer_id))
+            else:
+                customer_id = self.db.run_query_on(
+                    conn, "customers.insert", (sale_data['customer_name'], customer_phone, total, created_at)
+                )
+        sale_data['customer_id'] = customer_id
+
+        # Invoice numbers end in four random digits, so busy days can collide
+        for attempt in range(INVOICE_NUMBER_ATTEMPTS):
+            try:
+                sale_data['id'] = self.db.run_query_on(
+                    conn, "sales.insert",
+                    (
+                        sale_data['invoice_number'], customer_id, sale_data['customer_name'], customer_phone,
+                        sale_data['items'], sale_data['subtotal'], sale_data['discount'],
+                        sale_data['gst_amount'], total, sale_data['payment_method'],
+                        sale_data['payment_status'], sale_data['sold_by'], created_at
+                    )
+                )
+                break
+            except sqlite3.IntegrityError as e:
+                if "invoice_number" not in str(e) or attempt == INVOICE_NUMBER_ATTEMPTS - 1:
+                    raise
+                sale_data['invoice_number'] = InvoiceGenerator.generate_invoice_number()
+
+        conn.executemany(
+            '''
+            INSERT INTO sale_items (
+                sale_id, stock_id, sku, item_name, category,
+                quantity, unit_price, total_price
+            ) VALUES (?, ?, ?, ?, ?, ?, ?, ?)
+            ''',
+            [
+                (sale_data['id'], item['id'], item['sku'], item['name'], item.get('category'),
+                 item['quantity'], item['price'], item['total'])
+                for item in cart
+            ]
+        )
+        SalesRollups.record_sale(conn, created_at, cart)
+
+        for item in cart:
+            self.db.run_query_on(conn, "stock.decrement", (item['quantity'], created_at, item['id']))
+
+        # Stock is now decremented, so the cart no longer needs to hold it
+        if cart_id:
+            self.db.run_query_on(conn, "reservations.release_cart", (cart_id,))
+        return sale_data
+
+    def checkout(self, cart, sold_by, customer_name="Walk-in Customer", customer_phone=None,
+                 discount=0, cart_id=None, payment_method='Cash'):
+        """Record ``cart`` as a completed sale and return its sale data
+
+        With a journal, a sale the database cannot take right now is kept
+        there instead and its sale data is marked ``offline``. Raises
+        ValueError when the stock was sold elsewhere after the cart's holds
+        expired.
+        """
+        sale_data = self.prepare(cart, sold_by, customer_name, customer_phone, discount, payment_method)
+
+        def work(conn):
+            self.record(conn, sale_data, cart, cart_id)
+            # The stored customer, not the name typed on the bill (often "Walk-in Customer")
+            if self.customers is not None and sale_data['customer_id']:
+                return self.db.run_query_on(conn, "customers.by_id", (sale_data['customer_id'],), fetch_one=True)
+            return None
+
+        try:
+            # Group committed with concurrent checkouts; returns once the sale is durable
+            customer = self.db.write(work)
+        except sqlite3.OperationalError as e:
+            if self.journal is None or not is_unavailable(e):
+                raise
+            logger.error(f"Database unavailable ({e}); journaling sale {sale_data['invoice_number']}")
+            self.journal.append(sale_data, cart, cart_id)
+            sale_data['offline'] = True
+            return sale_data
+
+        if customer is not None:
+            self.customers.upsert(customer['id'], customer['name'], customer['phone'])
+        logger.info(f"Sale {sale_data['invoice_number']} recorded: {len(cart)} line(s), "
+                    f"total {sale_data['total_amount']:.2f}")
+        return sale_data
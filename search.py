@@ -6,6 +6,9 @@ from tkinter import ttk, messagebox
 import json
 from config import Colors
 from utils import Formatters
+from archive import SalesArchive
+from profiler import traced
+from customer_view import CustomerProfileWindow
 
 class GlobalSearch(ctk.CTkFrame):
     """Global search interface"""
@@ -14,6 +17,7 @@ class GlobalSearch(ctk.CTkFrame):
         super().__init__(parent)
         self.parent = parent
         self.db = parent.db
+        self.archive = SalesArchive(self.db)
         
         self.setup_ui()
     
@@ -114,6 +118,9 @@ class GlobalSearch(ctk.CTkFrame):
         self.tree_scroll_y.configure(command=self.results_tree.yview)
         self.tree_scroll_x.configure(command=self.results_tree.xview)
         
+        # Double-click a customer to open their purchase history
+        self.results_tree.bind('<Double-1>', self.on_result_double_click)
+        
         # Status label
         self.status_label = ctk.CTkLabel(
             self,
@@ -123,6 +130,7 @@ class GlobalSearch(ctk.CTkFrame):
         )
         self.status_label.grid(row=3, column=0, sticky="w", pady=(10, 0))
     
+    @traced()
     def perform_search(self):
         """Perform search based on criteria"""
         search_term = self.search_var.get().strip()
@@ -152,22 +160,16 @@ class GlobalSearch(ctk.CTkFrame):
             text=f"Found {result_count} result(s) for '{search_term}' in {search_type}"
         )
     
+    def refresh(self):
+        """Re-run the current search when shown again after the data changed"""
+        if self.search_var.get().strip():
+            self.perform_search()
+    
     def search_bills(self, search_term):
-        """Search in sales/bills"""
-        query = '''
-            SELECT invoice_number, customer_name, customer_phone, 
-                   total_amount, created_at, items
-            FROM sales 
-            WHERE invoice_number LIKE ? 
-               OR customer_name LIKE ? 
-               OR customer_phone LIKE ?
-            ORDER BY created_at DESC
-        '''
-        
+        """Search in sales/bills, including archived fiscal years"""
         pattern = f'%{search_term}%'
-        results = self.db.execute_query(
-            query, (pattern, pattern, pattern), fetch_all=True
-        )
+        with self.archive.historical_connection() as conn:
+            results = self.db.run_query_on(conn, "search.bills", (pattern, pattern, pattern), fetch_all=True)
         
         # Add header for bills section
         if results:
@@ -192,16 +194,9 @@ class GlobalSearch(ctk.CTkFrame):
     
     def search_customers(self, search_term):
         """Search in customers"""
-        query = '''
-            SELECT name, phone, email, total_purchases, last_purchase_date
-            FROM customers 
-            WHERE name LIKE ? OR phone LIKE ? OR email LIKE ?
-            ORDER BY name
-        '''
-        
         pattern = f'%{search_term}%'
-        results = self.db.execute_query(
-            query, (pattern, pattern, pattern), fetch_all=True
+        results = self.db.run_query(
+            "search.customers", (pattern, pattern, pattern), fetch_all=True
         )
         
         # Add header for customers section
@@ -212,7 +207,7 @@ class GlobalSearch(ctk.CTkFrame):
             
             for result in results:
                 result = dict(result)
-                self.results_tree.insert("", "end", values=(
+                self.results_tree.insert("", "end", iid=f"customer-{result['id']}", values=(
                     result['name'],
                     result['phone'] or "",
                     result['email'] or "",
@@ -221,19 +216,17 @@ class GlobalSearch(ctk.CTkFrame):
                     ""
                 ), tags=('customer',))
     
+    def on_result_double_click(self, event):
+        """Open the purchase history of a double-clicked customer"""
+        selection = self.results_tree.selection()
+        if selection and selection[0].startswith("customer-"):
+            CustomerProfileWindow(self, self.db, int(selection[0].split("-", 1)[1]))
+    
     def search_stock(self, search_term):
         """Search in stock"""
-        query = '''
-            SELECT sku, name, category, material, color, quantity, selling_price
-            FROM stock 
-            WHERE is_active = 1 
-              AND (sku LIKE ? OR name LIKE ? OR category LIKE ? OR material LIKE ?)
-            ORDER BY name
-        '''
-        
         pattern = f'%{search_term}%'
-        results = self.db.execute_query(
-            query, (pattern, pattern, pattern, pattern), fetch_all=True
+        results = self.db.run_query(
+            "search.stock", (pattern, pattern, pattern, pattern), fetch_all=True
         )
         
         # Configure columns for stock
@@ -6,6 +6,8 @@ import customtkinter as ctk
 from tkinter import messagebox, filedialog
 from config import Colors, AppConfig
 from ui_components import ContentHeader, AnimatedButton
+from archive import SalesArchive, fiscal_year_label
+from maintenance import DatabaseMaintenance
 from datetime import datetime
 import shutil
 import os
@@ -154,6 +156,39 @@ class Settings(ctk.CTkFrame):
             height=45
         )
         restore_btn.pack(pady=10)
+        
+        # Archive button
+        archive_btn = AnimatedButton(
+            content,
+            text="🗄️ Archive Closed Years",
+            command=self.archive_old_sales,
+            width=200,
+            height=45,
+            fg_color=Colors.INFO
+        )
+        archive_btn.pack(pady=10)
+        
+        # One-time switch to incremental vacuuming for older database files
+        compact_btn = AnimatedButton(
+            content,
+            text="🧹 Enable Space Reclaim",
+            command=self.enable_incremental_vacuum,
+            width=200,
+            height=45,
+            fg_color=Colors.INFO
+        )
+        compact_btn.pack(pady=10)
+        
+        # Query statistics button
+        stats_btn = AnimatedButton(
+            content,
+            text="⏱️ Query Statistics",
+            command=self.save_query_report,
+            width=200,
+            height=45,
+            fg_color=Colors.INFO
+        )
+        stats_btn.pack(pady=10)
     
     def setup_print_settings_tab(self):
         """Setup print settings tab"""
@@ -198,6 +233,65 @@ class Settings(ctk.CTkFrame):
         except Exception as e:
             messagebox.showerror("Error", f"Failed to create backup:\n{str(e)}")
     
+    def archive_old_sales(self):
+        """Move closed fiscal years into yearly archive files"""
+        archive = SalesArchive(self.db)
+        years = archive.closed_years()
+        if not years:
+            messagebox.showinfo("Archive", "There are no closed fiscal years to archive.")
+            return
+        
+        labels = ", ".join(fiscal_year_label(year) for year in years)
+        if not messagebox.askyesno(
+            "Confirm Archive",
+            f"Move sales from {labels} into yearly archive files?\n\n"
+            "Archived bills remain available in Global Search."
+        ):
+            return
+        
+        try:
+            moved = archive.archive_closed_years()
+            messagebox.showinfo(
+                "Archive Complete",
+                f"Archived {sum(moved.values())} bills to:\n{os.path.abspath(archive.archive_dir)}"
+            )
+        except Exception as e:
+            messagebox.showerror("Error", f"Failed to archive sales:\n{str(e)}")
+    
+    def enable_incremental_vacuum(self):
+        """Rewrite the database once so idle maintenance can reclaim free space"""
+        maintenance = DatabaseMaintenance(self.db)
+        if not maintenance.needs_vacuum_conversion():
+            messagebox.showinfo("Space Reclaim", "Free space is already reclaimed automatically while idle.")
+            return
+        
+        if not messagebox.askyesno(
+            "Confirm",
+            "This rewrites the whole database once and locks it while it runs.\n\n"
+            "Close the application on every other counter first. Continue?"
+        ):
+            return
+        
+        try:
+            reclaimed = maintenance.enable_incremental_vacuum()
+            messagebox.showinfo(
+                "Space Reclaim",
+                f"Done. Reclaimed {reclaimed / 1024:.0f} KB; free space is now reclaimed while idle."
+            )
+        except Exception as e:
+            messagebox.showerror("Error", f"Failed to rewrite the database:\n{str(e)}")
+    
+    def save_query_report(self):
+        """Write per-query timings collected this session to a report file"""
+        try:
+            self.db.dump_query_report(AppConfig.QUERY_REPORT_FILE)
+            messagebox.showinfo(
+                "Query Statistics",
+                f"Query report saved to:\n{os.path.abspath(AppConfig.QUERY_REPORT_FILE)}"
+            )
+        except Exception as e:
+            messagebox.showerror("Error", f"Failed to save query report:\n{str(e)}")
+    
     def restore_backup(self):
         """Restore database from backup"""
         if not messagebox.askyesno(
@@ -3,9 +3,11 @@ Stock management module
 """
 import customtkinter as ctk
 from tkinter import ttk, messagebox
-from datetime import datetime
 from config import Colors, AppConfig
 from utils import Validators, Formatters
+from profiler import traced
+from inventory_service import InventoryService
+from ui_components import TreeviewSync
 
 class StockManagement(ctk.CTkFrame):
     """Stock management interface"""
@@ -14,6 +16,7 @@ class StockManagement(ctk.CTkFrame):
         super().__init__(parent)
         self.parent = parent
         self.db = parent.db
+        self.inventory = InventoryService(self.db)
         
         self.setup_ui()
         self.load_stock()
@@ -118,6 +121,8 @@ class StockManagement(ctk.CTkFrame):
             height=20
         )
         self.stock_tree.grid(row=0, column=0, sticky="nsew")
+        self.stock_rows = TreeviewSync(self.stock_tree)
+        self.stock_tree.tag_configure('low_stock', background='#fff3cd')
         
         self.tree_scroll_y.configure(command=self.stock_tree.yview)
         self.tree_scroll_x.configure(command=self.stock_tree.xview)
@@ -180,35 +185,16 @@ class StockManagement(ctk.CTkFrame):
         )
         update_stock_btn.grid(row=0, column=2, padx=5)
     
+    @traced()
     def load_stock(self):
-        """Load stock items into treeview"""
-        # Clear existing items
-        for item in self.stock_tree.get_children():
-            self.stock_tree.delete(item)
-        
-        # Build query based on filters
-        query = '''
-            SELECT * FROM stock WHERE is_active = 1
-        '''
-        params = []
-        
-        # Apply low stock filter
-        if self.low_stock_var.get():
-            query += ' AND quantity <= min_stock_level'
-        
-        # Apply search filter
-        search_term = self.search_var.get().strip()
-        if search_term:
-            query += ' AND (sku LIKE ? OR name LIKE ? OR category LIKE ? OR material LIKE ?)'
-            search_pattern = f'%{search_term}%'
-            params = [search_pattern, search_pattern, search_pattern, search_pattern]
-        
-        query += ' ORDER BY name'
-        
-        # Execute query
-        items = self.db.execute_query(query, params, fetch_all=True)
-        
-        # Add to treeview
+        """Load stock items into treeview, updating only rows that changed"""
+        # Filters are applied by the inventory service
+        items = self.inventory.list_items(
+            search_term=self.search_var.get().strip(),
+            low_stock_only=self.low_stock_var.get()
+        )
+        
+        rows = []
         for item in items:
             item = dict(item)
             
@@ -235,12 +221,15 @@ class StockManagement(ctk.CTkFrame):
                 arrival_date
             )
             
-            item_id = self.stock_tree.insert("", "end", values=values)
-            
             # Highlight low stock items
-            if item['quantity'] <= item['min_stock_level']:
-                self.stock_tree.item(item_id, tags=('low_stock',))
-                self.stock_tree.tag_configure('low_stock', background='#fff3cd')
+            tags = ('low_stock',) if item['quantity'] <= item['min_stock_level'] else ()
+            rows.append((item['id'], values, tags))
+        
+        self.stock_rows.sync(rows)
+    
+    def refresh(self):
+        """Reload stock when shown again after the data changed"""
+        self.load_stock()
     
     def on_item_double_click(self, event):
         """Handle double-click on item"""
@@ -266,8 +255,7 @@ class StockManagement(ctk.CTkFrame):
     def open_edit_dialog(self, item_id):
         """Open edit dialog for item"""
         # Get item details
-        query = "SELECT * FROM stock WHERE id = ?"
-        item = self.db.execute_query(query, (item_id,), fetch_one=True)
+        item = self.inventory.get_item(item_id)
         
         if not item:
             messagebox.showerror("Error", "Item not found!")
@@ -353,62 +341,33 @@ class StockManagement(ctk.CTkFrame):
             min_stock = int(self.edit_vars['min_stock_level'].get())
             purchase_price = float(self.edit_vars['purchase_price'].get())
             selling_price = float(self.edit_vars['selling_price'].get())
-            
-            if quantity < 0 or min_stock < 0:
-                messagebox.showwarning("Warning", "Quantity and min stock cannot be negative!")
-                return
-            
-            if purchase_price < 0 or selling_price < 0:
-                messagebox.showwarning("Warning", "Prices cannot be negative!")
-                return
-            
-            if selling_price < purchase_price:
-                messagebox.showwarning("Warning", "Selling price cannot be less than purchase price!")
-                return
-            
-            # Update database
-            update_query = '''
-                UPDATE stock SET
-                    sku = ?,
-                    name = ?,
-                    category = ?,
-                    material = ?,
-                    color = ?,
-                    size = ?,
-                    quantity = ?,
-                    min_stock_level = ?,
-                    purchase_price = ?,
-                    selling_price = ?,
-                    supplier_name = ?,
-                    last_updated = ?
-                WHERE id = ?
-            '''
-            
-            self.db.execute_query(
-                update_query,
-                (
-                    self.edit_vars['sku'].get(),
-                    self.edit_vars['name'].get(),
-                    self.edit_vars['category'].get(),
-                    self.edit_vars['material'].get() or None,
-                    self.edit_vars['color'].get() or None,
-                    self.edit_vars['size'].get() or None,
-                    quantity,
-                    min_stock,
-                    purchase_price,
-                    selling_price,
-                    self.edit_vars['supplier_name'].get() or None,
-                    datetime.now().isoformat(),
-                    item_id
-                )
-            )
-            
-            messagebox.showinfo("Success", "Item updated successfully!")
-            dialog.destroy()
-            self.load_stock()
-            
         except ValueError as e:
             messagebox.showerror("Error", f"Invalid input: {str(e)}")
+            return
+        
+        try:
+            self.inventory.update_item(
+                item_id,
+                sku=self.edit_vars['sku'].get(),
+                name=self.edit_vars['name'].get(),
+                category=self.edit_vars['category'].get(),
+                material=self.edit_vars['material'].get() or None,
+                color=self.edit_vars['color'].get() or None,
+                size=self.edit_vars['size'].get() or None,
+                quantity=quantity,
+                min_stock_level=min_stock,
+                purchase_price=purchase_price,
+                selling_price=selling_price,
+                supplier_name=self.edit_vars['supplier_name'].get() or None
+            )
+        except ValueError as e:
+            # Stock rules (negative values, selling below cost)
+            messagebox.showwarning("Warning", str(e))
+            return
+        
+        messagebox.showinfo("Success", "Item updated successfully!")
+        dialog.destroy()
+        self.load_stock()
     
     def delete_selected(self):
         """Delete selected items"""
@@ -420,15 +379,10 @@ class StockManagement(ctk.CTkFrame):
         if not messagebox.askyesno("Confirm", f"Delete {len(selection)} selected item(s)?"):
             return
         
-        for item in selection:
-            item_data = self.stock_tree.item(item)
-            item_id = item_data['values'][0]
-            
-            # Soft delete (mark as inactive)
-            self.db.execute_query(
-                "UPDATE stock SET is_active = 0 WHERE id = ?",
-                (item_id,)
-            )
+        # Soft delete (mark as inactive)
+        self.inventory.deactivate(
+            [self.stock_tree.item(item)['values'][0] for item in selection]
+        )
         
         messagebox.showinfo("Success", f"{len(selection)} item(s) deleted!")
         self.load_stock()
@@ -507,22 +461,19 @@ class StockManagement(ctk.CTkFrame):
         """Save quantity update"""
         try:
             new_qty = int(self.new_qty_var.get())
-            if new_qty < 0:
-                messagebox.showwarning("Warning", "Quantity cannot be negative!")
-                return
-            
-            # Update database
-            self.db.execute_query(
-                "UPDATE stock SET quantity = ?, last_updated = ? WHERE id = ?",
-                (new_qty, datetime.now().isoformat(), item_id)
-            )
-            
-            messagebox.showinfo("Success", "Quantity updated successfully!")
-            dialog.destroy()
-            self.load_stock()
-            
         except ValueError:
             messagebox.showerror("Error", "Please enter a valid number!")
+            return
+        
+        try:
+            self.inventory.set_quantity(item_id, new_qty)
+        except ValueError as e:
+            messagebox.showwarning("Warning", str(e))
+            return
+        
+        messagebox.showinfo("Success", "Quantity updated successfully!")
+        dialog.destroy()
+        self.load_stock()
     
     def export_stock(self):
         """Export stock to CSV (placeholder)"""
@@ -0,0 +1,112 @@
+"""
+Dense time-bucketed sales series (sales_series.bucket_series / period_series)
+"""
+import sqlite3
+from datetime import datetime
+
+import pytest
+
+from sales_series import bucket_series, period_bounds, period_series
+
+
+@pytest.fixture
+def conn():
+    conn = sqlite3.connect(":memory:")
+    conn.execute("CREATE TABLE sales (id INTEGER PRIMARY KEY, total_amount REAL, created_at TIMESTAMP)")
+    conn.execute("CREATE INDEX idx_sales_date_amount ON sales(created_at, total_amount)")
+    yield conn
+    conn.close()
+
+
+def add_sales(conn, *sales):
+    conn.executemany("INSERT INTO sales (created_at, total_amount) VALUES (?, ?)", sales)
+
+
+def test_empty_table_gives_one_zero_bucket_per_day(conn):
+    series = bucket_series(conn, "day", datetime(2026, 3, 1), datetime(2026, 3, 4))
+    assert series == [("01 Mar", 0, 0), ("02 Mar", 0, 0), ("03 Mar", 0, 0)]
+
+
+def test_empty_buckets_between_sales_are_kept(conn):
+    add_sales(conn, ("2026-03-01T10:00:00", 100.0), ("2026-03-04T10:00:00", 50.0))
+    series = bucket_series(conn, "day", datetime(2026, 3, 1), datetime(2026, 3, 5))
+    assert series == [
+        ("01 Mar", 100.0, 1),
+        ("02 Mar", 0, 0),
+        ("03 Mar", 0, 0),
+        ("04 Mar", 50.0, 1),
+    ]
+
+
+def test_midnight_belongs_to_the_day_it_starts(conn):
+    add_sales(
+        conn,
+        ("2026-03-01T23:59:59.999999", 1.0),
+        ("2026-03-02T00:00:00", 2.0),
+        ("2026-03-02T23:59:59", 4.0),
+        # Outside the range on both sides
+        ("2026-02-28T23:59:59", 8.0),
+        ("2026-03-03T00:00:00", 16.0),
+    )
+    series = bucket_series(conn, "day", datetime(2026, 3, 1), datetime(2026, 3, 3))
+    assert series == [("01 Mar", 1.0, 1), ("02 Mar", 6.0, 2)]
+
+
+def test_hour_buckets_at_the_day_edge(conn):
+    add_sales(conn, ("2026-03-01 22:59:59", 1.0), ("2026-03-01 23:00:00", 2.0), ("2026-03-02 00:00:00", 4.0))
+    series = bucket_series(conn, "hour", datetime(2026, 3, 1, 22), datetime(2026, 3, 2, 1))
+    assert series == [("22:00", 1.0, 1), ("23:00", 2.0, 1), ("00:00", 4.0, 1)]
+
+
+def test_space_and_t_separated_timestamps_bucket_alike(conn):
+    add_sales(conn, ("2026-03-01 12:00:00", 1.0), ("2026-03-01T12:00:00", 2.0))
+    series = bucket_series(conn, "day", datetime(2026, 3, 1), datetime(2026, 3, 2))
+    assert series == [("01 Mar", 3.0, 2)]
+
+
+def test_utc_offset_does_not_move_a_sale_to_another_day(conn):
+    # 00:30 in India is still the previous day in UTC; the sale belongs to 2 March
+    add_sales(conn, ("2026-03-02T00:30:00+05:30", 1.0), ("2026-03-01T23:30:00-05:00", 2.0))
+    series = bucket_series(conn, "day", datetime(2026, 3, 1), datetime(2026, 3, 3))
+    assert series == [("01 Mar", 2.0, 1), ("02 Mar", 1.0, 1)]
+
+
+def test_weeks_start_on_monday(conn):
+    # 8 March 2026 is a Sunday, 9 March a Monday
+    add_sales(conn, ("2026-03-08T23:59:59", 1.0), ("2026-03-09T00:00:00", 2.0))
+    series = bucket_series(conn, "week", datetime(2026, 3, 4), datetime(2026, 3, 16))
+    assert series == [("02 Mar", 1.0, 1), ("09 Mar", 2.0, 1)]
+
+
+def test_month_buckets_cross_leap_day_and_year_end(conn):
+    add_sales(conn, ("2027-12-31T23:59:59", 1.0), ("2028-01-01T00:00:00", 2.0), ("2028-02-29T12:00:00", 4.0))
+    series = bucket_series(conn, "month", datetime(2027, 12, 15), datetime(2028, 3, 1))
+    assert series == [("Dec 2027", 1.0, 1), ("Jan 2028", 2.0, 1), ("Feb 2028", 4.0, 1)]
+
+
+def test_start_is_aligned_down_to_its_bucket(conn):
+    add_sales(conn, ("2026-03-01T00:15:00", 1.0))
+    series = bucket_series(conn, "day", datetime(2026, 3, 1, 18, 30), datetime(2026, 3, 2))
+    assert series == [("01 Mar", 1.0, 1)]
+
+
+def test_unknown_granularity_is_rejected(conn):
+    with pytest.raises(ValueError):
+        bucket_series(conn, "quarter", datetime(2026, 3, 1), datetime(2026, 4, 1))
+
+
+def test_period_bounds_end_after_today():
+    now = datetime(2026, 3, 15, 18, 45)
+    assert period_bounds("today", now) == (datetime(2026, 3, 15), datetime(2026, 3, 16))
+    assert period_bounds("week", now) == (datetime(2026, 3, 9), datetime(2026, 3, 16))
+    assert period_bounds("month", now) == (datetime(2026, 3, 1), datetime(2026, 3, 16))
+    with pytest.raises(ValueError):
+        period_bounds("decade", now)
+
+
+def test_period_series_today_has_every_hour(conn):
+    add_sales(conn, ("2026-03-15T09:10:00", 5.0), ("2026-03-14T23:59:59", 7.0))
+    series = period_series(conn, "today", now=datetime(2026, 3, 15, 18, 45))
+    assert len(series) == 24
+    assert series[9] == ("09:00", 5.0)
+    assert sum(total for _, total in series) == 5.0
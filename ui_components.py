@@ -2,9 +2,12 @@
 Premium UI Components for Boutique Management System
 Modern, reusable components with animations and premium styling
 """
+import time
+import tkinter as tk
 import customtkinter as ctk
 from typing import Optional, Callable, List, Tuple
-from config import Colors
+from config import Colors, AppConfig
+from profiler import profiler
 from PIL import Image, ImageDraw, ImageFilter
 import io
 
@@ -326,6 +329,107 @@ class GlassCard(ctk.CTkFrame):
         )
 
 
+class TickScheduler:
+    """One Tk timer multiplexing every periodic UI update
+    
+    Each update is tied to a widget. Updates of destroyed widgets are
+    dropped, and updates of widgets that are not on screen (a hidden cached
+    screen, a minimized window) are skipped until the widget is visible
+    again. The timer only fires when the earliest update is due, and not at
+    all when nothing is registered.
+    """
+    
+    SLACK_SECONDS = 0.02
+    
+    def __init__(self, hidden_poll_ms=AppConfig.UI_HIDDEN_POLL_MS):
+        self.hidden_poll_ms = hidden_poll_ms
+        self._entries = {}
+        self._next_handle = 0
+        self._root = None
+        self._after_id = None
+        # name -> [calls, total ms, max ms]
+        self.stats = {}
+    
+    def every(self, widget, interval_ms, callback, name=None, visible_only=True):
+        """Call ``callback()`` every ``interval_ms`` while ``widget`` exists; returns a handle"""
+        self._next_handle += 1
+        self._entries[self._next_handle] = {
+            "widget": widget,
+            "interval": interval_ms / 1000,
+            "callback": callback,
+            "name": name or getattr(callback, "__qualname__", repr(callback)),
+            "visible_only": visible_only,
+            "due": time.monotonic() + interval_ms / 1000,
+        }
+        if self._root is None:
+            self._root = widget._root()
+        self._schedule()
+        return self._next_handle
+    
+    def cancel(self, handle):
+        self._entries.pop(handle, None)
+    
+    def _schedule(self):
+        if self._after_id is not None:
+            self._root.after_cancel(self._after_id)
+            self._after_id = None
+        if self._entries:
+            delay = min(entry["due"] for entry in self._entries.values()) - time.monotonic()
+            self._after_id = self._root.after(max(int(delay * 1000), 1), self._tick)
+    
+    def _tick(self):
+        self._after_id = None
+        now = time.monotonic()
+        for handle, entry in list(self._entries.items()):
+            # Updates due within the slack run now too, so they stay on one timer
+            if entry["due"] > now + self.SLACK_SECONDS:
+                continue
+            widget = entry["widget"]
+            try:
+                if not widget.winfo_exists():
+                    del self._entries[handle]
+                    continue
+                if entry["visible_only"] and not widget.winfo_viewable():
+                    # Look again soon, so the widget is current shortly after it reappears
+                    entry["due"] = now + min(entry["interval"], self.hidden_poll_ms / 1000)
+                    continue
+            except tk.TclError:
+                del self._entries[handle]
+                continue
+            
+            started = time.perf_counter()
+            try:
+                entry["callback"]()
+            except Exception as e:
+                print(f"Error in periodic update {entry['name']}: {e}")
+            ended = time.perf_counter()
+            self._record(entry["name"], started, ended)
+            # Keep to the original cadence unless the update fell behind
+            entry["due"] += entry["interval"]
+            if entry["due"] <= now:
+                entry["due"] = now + entry["interval"]
+        self._schedule()
+    
+    def _record(self, name, started, ended):
+        elapsed_ms = (ended - started) * 1000
+        stats = self.stats.setdefault(name, [0, 0.0, 0.0])
+        stats[0] += 1
+        stats[1] += elapsed_ms
+        stats[2] = max(stats[2], elapsed_ms)
+        profiler.record("ui", f"tick:{name}", started, ended)
+    
+    def format_report(self):
+        """Calls and cost of each periodic update, most expensive first"""
+        lines = [f"{'update':<40}{'calls':>8}{'total ms':>10}{'avg ms':>8}{'max ms':>8}"]
+        for name, (calls, total, worst) in sorted(self.stats.items(), key=lambda item: -item[1][1]):
+            lines.append(f"{name[:39]:<40}{calls:>8}{total:>10.1f}{total / calls:>8.2f}{worst:>8.2f}")
+        return "\n".join(lines)
+
+
+# Shared by every widget so all periodic updates run from one timer
+ticks = TickScheduler()
+
+
 class LiveClock(ctk.CTkLabel):
     """Real-time clock that updates every second"""
     
@@ -347,31 +451,30 @@ class LiveClock(ctk.CTkLabel):
         
         self.date_format = date_format
         self.show_date = show_date
-        self._update_active = True
+        self._text = ""
         self.update_time()
+        # Checked every second; the label is only redrawn when its text changes
+        self._tick = ticks.every(self, 1000, self.update_time, name="LiveClock")
     
     def update_time(self):
         """Update the displayed time"""
-        if not self._update_active:
-            return
-            
         from datetime import datetime
         now = datetime.now()
         
         if self.show_date:
             time_str = now.strftime(self.date_format)
             date_str = now.strftime("%d %B %Y")
-            self.configure(text=f"{time_str}\n{date_str}")
+            text = f"{time_str}\n{date_str}"
         else:
-            time_str = now.strftime(self.date_format)
-            self.configure(text=time_str)
+            text = now.strftime(self.date_format)
         
-        # Schedule next update (1000ms = 1 second)
-        self.after(1000, self.update_time)
+        if text != self._text:
+            self._text = text
+            self.configure(text=text)
     
     def stop(self):
-        """Stop the clock updates (call when destroying)"""
-        self._update_active = False
+        """Stop the clock updates"""
+        ticks.cancel(self._tick)
 
 
 class ContentHeader(ctk.CTkFrame):
@@ -429,3 +532,184 @@ class ContentHeader(ctk.CTkFrame):
         divider = ctk.CTkFrame(self, height=2, fg_color=Colors.BORDER_LIGHT)
         divider.grid(row=1, column=0, columnspan=2, sticky="ew", pady=(15, 0))
 
+
+class ProfilerOverlay(ctk.CTkFrame):
+    """Floating panel with the latest profiled actions and their time breakdown"""
+    
+    def __init__(self, parent, profiler, refresh_ms=500, **kwargs):
+        """
+        Args:
+            parent: Window the overlay floats over
+            profiler: Profiler whose recent actions are shown
+            refresh_ms: Refresh interval while visible
+            **kwargs: Additional CTkFrame arguments
+        """
+        super().__init__(parent, fg_color=Colors.TEXT_PRIMARY, corner_radius=8, **kwargs)
+        self.profiler = profiler
+        self.refresh_ms = refresh_ms
+        self._tick = None
+        
+        self.label = ctk.CTkLabel(
+            self,
+            text="",
+            font=ctk.CTkFont(family="Consolas", size=11),
+            text_color=Colors.TEXT_WHITE,
+            justify="left",
+            anchor="w"
+        )
+        self.label.pack(padx=10, pady=8)
+    
+    def show(self):
+        """Show in the bottom-right corner and start refreshing"""
+        self.place(relx=1.0, rely=1.0, x=-12, y=-12, anchor="se")
+        self.lift()
+        self._refresh()
+        if self._tick is None:
+            self._tick = ticks.every(self, self.refresh_ms, self._refresh, name="ProfilerOverlay")
+    
+    def hide(self):
+        """Stop refreshing and remove from view"""
+        if self._tick is not None:
+            ticks.cancel(self._tick)
+            self._tick = None
+        self.place_forget()
+    
+    def _refresh(self):
+        lines = [f"{'action (ms)':<36}{'wall':>8}{'sql':>8}{'render':>8}{'pdf':>8}"]
+        for action in reversed(self.profiler.recent):
+            lines.append(
+                f"{action['name'][:35]:<36}{action['wall_ms']:>8.1f}{action['sql_ms']:>8.1f}"
+                f"{action['render_ms']:>8.1f}{action['pdf_ms']:>8.1f}"
+            )
+        if len(lines) == 1:
+            lines.append("Profiling - use the app to record actions")
+        self.label.configure(text="\n".join(lines))
+        self.lift()
+
+
+class TreeviewSync:
+    """Keeps a ttk.Treeview in step with a list of rows, touching only rows that changed
+
+    Rows are (key, values, tags) tuples with a unique key. The last rows
+    shown are remembered, so reloading unchanged data makes no Tk calls.
+    """
+
+    def __init__(self, tree):
+        self.tree = tree
+        self._rows = {}
+        self._order = []
+
+    def sync(self, rows):
+        shown = {}
+        order = []
+        for key, values, tags in rows:
+            iid = str(key)
+            row = (tuple(values), tuple(tags))
+            shown[iid] = row
+            order.append(iid)
+            previous = self._rows.get(iid)
+            if previous is None:
+                self.tree.insert("", "end", iid=iid, values=row[0], tags=row[1])
+            elif previous != row:
+                self.tree.item(iid, values=row[0], tags=row[1])
+
+        removed = [iid for iid in self._rows if iid not in shown]
+        if removed:
+            self.tree.delete(*removed)
+        # New rows were inserted at the end; move rows only if that is not where they belong
+        expected = [iid for iid in self._order if iid in shown] + [iid for iid in order if iid not in self._rows]
+        if order != expected:
+            for index, iid in enumerate(order):
+                self.tree.move(iid, "", index)
+        self._rows = shown
+        self._order = order
+
+
+class SuggestionList:
+    """Dropdown of suggestions under an entry, filled as the user types
+
+    ``lookup(text)`` returns (label, value) pairs; choosing one with the
+    mouse or Down/Return calls ``on_pick(value)``.
+    """
+
+    IGNORED_KEYS = {"Up", "Down", "Return", "Escape", "Tab", "Shift_L", "Shift_R",
+                    "Control_L", "Control_R", "Alt_L", "Alt_R"}
+
+    def __init__(self, entry, lookup, on_pick, rows=6):
+        self.entry = entry
+        self.lookup = lookup
+        self.on_pick = on_pick
+        self.rows = rows
+        self._values = []
+        self.listbox = tk.Listbox(
+            entry.winfo_toplevel(),
+            activestyle="none",
+            exportselection=False,
+            relief="flat",
+            highlightthickness=1,
+            highlightbackground=Colors.BORDER_MEDIUM,
+            background=Colors.CARD_BG,
+            foreground=Colors.TEXT_PRIMARY,
+            selectbackground=Colors.PRIMARY_LIGHT,
+            selectforeground=Colors.TEXT_WHITE
+        )
+
+        entry.bind("<KeyRelease>", self._on_key, add="+")
+        entry.bind("<Down>", self._focus_list, add="+")
+        entry.bind("<Escape>", self._on_escape, add="+")
+        entry.bind("<FocusOut>", lambda event: entry.after(150, self._hide_unless_focused), add="+")
+        self.listbox.bind("<ButtonRelease-1>", self._pick)
+        self.listbox.bind("<Return>", self._pick)
+        self.listbox.bind("<Escape>", self._on_escape)
+
+    def visible(self):
+        return bool(self.listbox.winfo_ismapped())
+
+    def show(self, suggestions):
+        self._values = [value for _, value in suggestions]
+        self.listbox.delete(0, "end")
+        if not suggestions:
+            self.hide()
+            return
+        self.listbox.insert("end", *[label for label, _ in suggestions])
+        self.listbox.configure(height=min(len(suggestions), self.rows))
+        self.listbox.place(in_=self.entry, relx=0, rely=1, relwidth=1, y=2)
+        self.listbox.lift()
+
+    def hide(self):
+        self.listbox.place_forget()
+
+    def _on_key(self, event):
+        if event.keysym in self.IGNORED_KEYS:
+            return
+        self.show(self.lookup(self.entry.get()))
+
+    def _focus_list(self, event=None):
+        if not self.visible():
+            return
+        self.listbox.focus_set()
+        self.listbox.selection_clear(0, "end")
+        self.listbox.selection_set(0)
+        self.listbox.activate(0)
+        return "break"
+
+    def _on_escape(self, event=None):
+        # Only swallow Escape (which also leaves the screen) when it closes the list
+        if not self.visible():
+            return
+        self.hide()
+        self.entry.focus_set()
+        return "break"
+
+    def _hide_unless_focused(self):
+        if self.listbox.focus_get() is not self.listbox:
+            self.hide()
+
+    def _pick(self, event=None):
+        selection = self.listbox.curselection()
+        if not selection:
+            return
+        value = self._values[selection[0]]
+        self.hide()
+        self.entry.focus_set()
+        self.on_pick(value)
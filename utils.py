@@ -12,6 +12,7 @@ from reportlab.lib.styles import getSampleStyleSheet, ParagraphStyle
 from reportlab.lib.units import inch
 import logging
 from config import Colors, AppConfig
+from profiler import traced
 
 logger = logging.getLogger(__name__)
 
@@ -26,6 +27,7 @@ class InvoiceGenerator:
         return f"INV-{date_str}-{random_str}"
     
     @staticmethod
+    @traced("invoice_pdf", category="pdf")
     def generate_invoice(sale_data, customer_info, items, save_path=None):
         """Generate PDF invoice"""
         if save_path is None:
@@ -0,0 +1,111 @@
+"""
+Warm-up after login
+Once the dashboard has settled, a prioritized list of tasks loads what the
+first bill and the dashboard charts would otherwise load on demand, so the
+first bill of the day is as fast as the hundredth. Tasks run one at a time
+from a worker thread that first waits for the database to be quiet, giving
+way to anything the counter staff are doing. Tasks that build widgets are
+handed to the UI thread and run when it is idle.
+"""
+import time
+import logging
+import threading
+from config import AppConfig
+
+logger = logging.getLogger(__name__)
+
+
+class WarmupTask:
+    """One prefetch step; lower priority numbers run first"""
+
+    def __init__(self, priority, name, run, ui=False):
+        self.priority = priority
+        self.name = name
+        self.run = run
+        self.ui = ui
+
+
+def login_tasks(app):
+    """Warm-up tasks for a freshly logged in user of ``app``"""
+    return [
+        # Builds the billing screen hidden, including its stock snapshot
+        WarmupTask(0, "billing screen", lambda: app.prebuild_frame("billing"), ui=True),
+        # Returning-customer suggestions for the phone and name entries
+        WarmupTask(1, "customer index", app.customer_index.load),
+        WarmupTask(2, "sales trend", lambda: app.chart_data.sales_trend(30)),
+        WarmupTask(2, "sales trend (week)", lambda: app.chart_data.sales_trend(7)),
+        WarmupTask(3, "category mix", lambda: app.chart_data.category_distribution("month")),
+        WarmupTask(3, "category mix (week)", lambda: app.chart_data.category_distribution("week")),
+    ]
+
+
+class WarmupScheduler:
+    """Run warm-up tasks in priority order without competing with foreground work"""
+
+    def __init__(self, root, db, tasks, delay_ms=AppConfig.WARMUP_DELAY_MS,
+                 quiet_ms=AppConfig.WARMUP_QUIET_MS):
+        self.root = root
+        self.db = db
+        self.tasks = sorted(tasks, key=lambda task: task.priority)
+        self.quiet_seconds = quiet_ms / 1000
+        # task name -> milliseconds it took
+        self.timings = {}
+        self._stopped = threading.Event()
+        self._worker = None
+        self._after_id = root.after(delay_ms, self._start)
+
+    def _start(self):
+        self._after_id = None
+        self._worker = threading.Thread(target=self._run, name="warmup", daemon=True)
+        self._worker.start()
+
+    def _wait_for_quiet(self):
+        while not self._stopped.is_set() and not self.db.foreground_quiet(self.quiet_seconds):
+            self._stopped.wait(self.quiet_seconds / 2)
+        return not self._stopped.is_set()
+
+    def _run_on_ui(self, task):
+        done = threading.Event()
+        errors = []
+
+        def run():
+            try:
+                # Logging out cancels the warm-up; do not build screens for nobody
+                if not self._stopped.is_set():
+                    task.run()
+            except Exception as e:
+                errors.append(e)
+            finally:
+                done.set()
+
+        self.root.after_idle(run)
+        while not done.wait(self.quiet_seconds):
+            if self._stopped.is_set():
+                return
+        if errors:
+            raise errors[0]
+
+    def _run(self):
+        started = time.perf_counter()
+        with self.db.background_work():
+            for task in self.tasks:
+                if not self._wait_for_quiet():
+                    return
+                task_started = time.perf_counter()
+                try:
+                    if task.ui:
+                        self._run_on_ui(task)
+                    else:
+                        task.run()
+                except Exception as e:
+                    logger.error(f"Warm-up task {task.name} failed: {e}")
+                    continue
+                self.timings[task.name] = round((time.perf_counter() - task_started) * 1000, 1)
+        logger.info(f"Warm-up finished in {time.perf_counter() - started:.1f} s: {self.timings}")
+
+    def stop(self):
+        """Cancel warm-up; a task already running is allowed to finish"""
+        self._stopped.set()
+        if self._after_id:
+            self.root.after_cancel(self._after_id)
+            self._after_id = None
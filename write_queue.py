@@ -0,0 +1,216 @@
+"""
+Group commit for bursts of small writes
+A single writer thread takes units of work from a queue and commits every
+unit that arrives within a short window in one transaction, so a burst of
+checkouts pays for one fsync instead of one each. Every unit runs in its own
+savepoint: a failing unit is rolled back alone and the others still commit.
+A unit's Future is resolved only after COMMIT, so a result is a durable
+acknowledgement. It also carries ``sql_ms``, the unit's SQL time plus the
+COMMIT it waited for, so the submitting thread can count it in its own
+profiler spans.
+
+Benchmark: python write_queue.py [--sales 10000] [--threads 16] [--windows 0,1,2,5,10]
+"""
+import time
+import queue
+import logging
+import threading
+from concurrent.futures import Future
+from config import AppConfig
+from profiler import profiler
+
+logger = logging.getLogger(__name__)
+
+
+class WriteQueue:
+    """Single writer thread committing queued ``work(conn)`` callables in batches"""
+
+    def __init__(self, db, window_ms=AppConfig.WRITE_GROUP_COMMIT_MS, max_batch=AppConfig.WRITE_MAX_BATCH):
+        self.db = db
+        self.window_ms = window_ms
+        self.max_batch = max_batch
+        self.batches = 0
+        self.committed = 0
+        self._queue = queue.Queue()
+        self._stopped = False
+        self._stop_lock = threading.Lock()
+        self._thread = threading.Thread(target=self._run, name="write-queue", daemon=True)
+        self._thread.start()
+
+    def submit(self, work):
+        """Queue ``work(conn)``; returns a Future for its return value once committed
+
+        Raises RuntimeError once the queue has been stopped.
+        """
+        future = Future()
+        with self._stop_lock:
+            if self._stopped:
+                raise RuntimeError("Write queue has stopped")
+            self._queue.put((work, future))
+        return future
+
+    def pending(self):
+        return self._queue.qsize()
+
+    def stop(self):
+        """Commit whatever is queued, then stop the writer thread"""
+        with self._stop_lock:
+            if not self._stopped:
+                self._stopped = True
+                self._queue.put(None)
+        self._thread.join()
+
+    def _collect(self, first):
+        """The first unit plus whatever else arrives within the window; (batch, stopping)"""
+        batch = [first]
+        deadline = time.perf_counter() + self.window_ms / 1000
+        while len(batch) < self.max_batch:
+            remaining = deadline - time.perf_counter()
+            try:
+                # With no window left, still take units that are already waiting
+                entry = self._queue.get(timeout=remaining) if remaining > 0 else self._queue.get_nowait()
+            except queue.Empty:
+                break
+            if entry is None:
+                return batch, True
+            batch.append(entry)
+        return batch, False
+
+    def _run(self):
+        while True:
+            first = self._queue.get()
+            if first is None:
+                return
+            batch, stopping = self._collect(first)
+            self._commit(batch)
+            if stopping:
+                return
+
+    def _commit(self, batch):
+        started = time.perf_counter()
+        outcomes = []
+        try:
+            with self.db.get_connection() as conn:
+                conn.execute("BEGIN IMMEDIATE")
+                for work, future in batch:
+                    conn.execute("SAVEPOINT unit")
+                    with profiler.span("write unit", category="write") as totals:
+                        try:
+                            outcomes.append((future, work(conn), None))
+                            conn.execute("RELEASE unit")
+                        except Exception as e:
+                            conn.execute("ROLLBACK TO unit")
+                            conn.execute("RELEASE unit")
+                            outcomes.append((future, None, e))
+                    future.sql_ms = totals["sql"] if totals else 0.0
+                commit_started = time.perf_counter()
+        except Exception as e:
+            # The transaction itself failed, so nothing in the batch was committed
+            for _, future in batch:
+                future.set_exception(e)
+            return
+
+        # Every unit in the batch waited for the shared COMMIT
+        committed_at = time.perf_counter()
+        profiler.record("sql", "COMMIT", commit_started, committed_at, units=len(batch))
+        for _, future in batch:
+            future.sql_ms += (committed_at - commit_started) * 1000
+
+        self.batches += 1
+        self.committed += sum(1 for _, _, error in outcomes if error is None)
+        for future, result, error in outcomes:
+            if error is None:
+                future.set_result(result)
+            else:
+                future.set_exception(error)
+        logger.debug(f"Committed {len(batch)} write(s) in {(time.perf_counter() - started) * 1000:.1f} ms")
+
+
+def benchmark(sales=10_000, threads=16, checkouts=2000, windows=(0, 1, 2, 5, 10), seed=42):
+    """Bills per second for concurrent checkouts at each group commit window
+
+    The first result ("window_ms": None) commits every sale in its own
+    transaction, as checkouts did before the queue, for comparison.
+    """
+    import os
+    import random
+    import shutil
+    import tempfile
+    from concurrent.futures import ThreadPoolExecutor
+    from database import Database
+    from generate_data import generate
+    from sales_service import SalesService
+
+    work_dir = tempfile.mkdtemp(prefix="boutique_write_queue_")
+    try:
+        dataset = os.path.join(work_dir, "dataset.db")
+        generate(dataset, sales, seed)
+        results = []
+        for window_ms in (None, *windows):
+            db_path = os.path.join(work_dir, f"window_{window_ms}.db")
+            shutil.copyfile(dataset, db_path)
+            db = Database(db_path)
+            with db.get_connection() as conn:
+                # Generous stock so no checkout is refused for quantity
+                conn.execute("UPDATE stock SET quantity = 1000000")
+                stock = [dict(row) for row in conn.execute(
+                    "SELECT id, sku, name, category, selling_price FROM stock").fetchall()]
+            sales_service = SalesService(db)
+            if window_ms is None:
+                direct_commits = []
+
+                def checkout(cart):
+                    sale_data = sales_service.prepare(cart, "benchmark")
+                    with db.get_connection() as conn:
+                        conn.execute("BEGIN IMMEDIATE")
+                        sales_service.record(conn, sale_data, cart)
+                    direct_commits.append(1)
+            else:
+                db.write_queue().window_ms = window_ms
+
+                def checkout(cart):
+                    sales_service.checkout(cart, "benchmark")
+
+            def worker(index):
+                rng = random.Random(seed + index)
+                for _ in range(checkouts // threads):
+                    cart = [{"id": item["id"], "sku": item["sku"], "name": item["name"],
+                             "category": item["category"], "price": item["selling_price"],
+                             "quantity": 1, "total": item["selling_price"]}
+                            for item in rng.sample(stock, rng.randint(1, 3))]
+                    checkout(cart)
+
+            started = time.perf_counter()
+            with ThreadPoolExecutor(max_workers=threads) as pool:
+                list(pool.map(worker, range(threads)))
+            elapsed = time.perf_counter() - started
+            if window_ms is None:
+                committed = transactions = len(direct_commits)
+            else:
+                committed, transactions = db.write_queue().committed, db.write_queue().batches
+                db.close_writes()
+            results.append({
+                "window_ms": window_ms,
+                "bills_per_second": round(committed / elapsed, 1),
+                "transactions": transactions,
+                "bills_per_transaction": round(committed / transactions, 1),
+            })
+        return results
+    finally:
+        shutil.rmtree(work_dir, ignore_errors=True)
+
+
+if __name__ == "__main__":
+    import json
+    import argparse
+
+    parser = argparse.ArgumentParser(description="Benchmark checkout throughput against the group commit window")
+    parser.add_argument("--sales", type=int, default=10_000, help="size of the generated dataset")
+    parser.add_argument("--threads", type=int, default=16, help="concurrent checkout threads")
+    parser.add_argument("--checkouts", type=int, default=2000)
+    parser.add_argument("--windows", default="0,1,2,5,10", help="comma-separated windows in ms")
+    args = parser.parse_args()
+
+    logging.basicConfig(level=logging.WARNING, format="%(levelname)s %(message)s")
+    windows = [float(w) for w in args.windows.split(",")]
+    print(json.dumps(benchmark(args.sales, args.threads, args.checkouts, windows), indent=2))